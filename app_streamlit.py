@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
+from menu_index import get_menu_catalog
 
 # Configuração da página
 st.set_page_config(
@@ -48,11 +48,17 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_data(max_entries=2)
+def menu_frame(version):
+    """DataFrame do cardápio; só é refeito quando a versão do catálogo muda"""
+    return get_menu_catalog().to_dataframe()
+
 def load_menu():
-    """Carrega o cardápio do arquivo CSV"""
+    """Carrega o cardápio do catálogo compartilhado"""
     try:
-        df = pd.read_csv('cardapio.csv')
-        return df
+        catalog = get_menu_catalog()
+        catalog.current()
+        return menu_frame(catalog.version)
     except FileNotFoundError:
         st.error("Arquivo cardapio.csv não encontrado!")
         return None
@@ -0,0 +1,103 @@
+"""
+Motor de conversas do bot com asyncio: filas por cliente e envio em paralelo limitado
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import BOT_CONFIG
+
+FALLBACK_REPLY = "❌ Não foi possível processar sua mensagem. Tente novamente."
+
+
+class ConversationEngine:
+    """
+    Distribui as mensagens do transporte em filas por telefone.
+
+    Cada telefone com mensagens pendentes tem uma tarefa própria que processa
+    e responde uma mensagem por vez, então as respostas de um cliente saem
+    na ordem em que ele escreveu. Clientes diferentes andam em paralelo; os
+    envios (bloqueantes, como o do Selenium) rodam num pool de threads
+    limitado a `max_senders`, de modo que um envio lento não segura os demais.
+    Se o transporte tem `coalesce_replies`, as mensagens que chegaram de um
+    cliente enquanto a resposta anterior era enviada são respondidas juntas,
+    numa única mensagem.
+    """
+
+    def __init__(self, bot, transport, max_senders=None):
+        self.bot = bot
+        self.transport = transport
+        limit = transport.max_concurrent_sends
+        self.max_senders = max_senders or limit or BOT_CONFIG['max_concurrent_sends']
+        if limit:
+            self.max_senders = min(self.max_senders, limit)
+        self._queues = {}  # telefone -> asyncio.Queue com as mensagens pendentes
+
+    def run(self):
+        """Executa até o transporte encerrar (bloqueante)"""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._received_all = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_senders,
+                                            thread_name_prefix='bot-send')
+        # transport.receive() é um gerador bloqueante: roda numa thread própria
+        reader = threading.Thread(target=self._read_transport, daemon=True)
+        reader.start()
+        try:
+            await self._received_all.wait()
+            await self._idle.wait()
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def _read_transport(self):
+        try:
+            for phone, message in self.transport.receive():
+                self._loop.call_soon_threadsafe(self._dispatch, phone, message)
+        except Exception as e:
+            print(f"❌ Erro ao receber mensagens: {e}")
+        finally:
+            self._loop.call_soon_threadsafe(self._received_all.set)
+
+    def _dispatch(self, phone, message):
+        """Enfileira a mensagem; cria a tarefa do telefone se ela não existir"""
+        print(f"📱 Nova mensagem de {phone}: {message}")
+        pending = self._queues.get(phone)
+        if pending is None:
+            pending = self._queues[phone] = asyncio.Queue()
+            self._idle.clear()
+            asyncio.create_task(self._conversation(phone, pending))
+        pending.put_nowait(message)
+
+    async def _conversation(self, phone, pending):
+        while True:
+            responses = [self._reply(phone, await pending.get())]
+            if self.transport.coalesce_replies:
+                while not pending.empty():
+                    responses.append(self._reply(phone, pending.get_nowait()))
+            # Toda mensagem recebe exatamente uma resposta (agrupada, se for o caso)
+            await self._send(phone, "\n\n".join(responses))
+            if pending.empty():
+                # Nada mais deste cliente: a tarefa termina e a fila é descartada
+                del self._queues[phone]
+                if not self._queues:
+                    self._idle.set()
+                return
+
+    def _reply(self, phone, message):
+        try:
+            return self.bot.process_message(phone, message)
+        except Exception as e:
+            print(f"❌ Erro ao processar mensagem: {e}")
+            return FALLBACK_REPLY
+
+    async def _send(self, phone, response):
+        try:
+            await self._loop.run_in_executor(self._executor, self.transport.send, phone, response)
+        except Exception as e:
+            print(f"❌ Erro ao enviar resposta para {phone}: {e}")
@@ -0,0 +1,296 @@
+"""
+Transportes do bot: de onde chegam as mensagens e por onde saem as respostas
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+from config import WEBHOOK_CONFIG
+
+
+class Transport:
+    """
+    Interface entre o motor de pedidos (WhatsAppBot.process_message) e o canal.
+
+    `receive()` gera pares (telefone, mensagem) e `send()` entrega a resposta
+    de cada mensagem recebida. `max_concurrent_sends` limita quantos envios
+    o motor de conversas faz ao mesmo tempo (None = sem limite próprio) e
+    `coalesce_replies` permite juntar respostas pendentes do mesmo cliente.
+    """
+
+    max_concurrent_sends = None
+    coalesce_replies = False
+
+    def start(self):
+        """Prepara o canal; retorna False se não foi possível conectar"""
+        return True
+
+    def receive(self):
+        """Gera (telefone, mensagem) à medida que as mensagens chegam"""
+        raise NotImplementedError
+
+    def send(self, phone, message):
+        """Envia a resposta; retorna True se foi entregue"""
+        raise NotImplementedError
+
+    def stop(self):
+        """Libera os recursos do canal"""
+
+
+class SeleniumTransport(Transport):
+    """
+    WhatsApp Web controlado pelo Selenium (driver e envio ficam no próprio bot).
+
+    Há um único navegador, então envio e leitura se revezam no driver: a
+    espera por eventos usa um tempo curto para liberá-lo aos envios na fila.
+    Cada conversa é lida a partir do seu cursor (ReadCursors, salvo em
+    `cursor_file`): todas as mensagens novas, em ordem, e nenhuma repetida.
+    """
+
+    max_concurrent_sends = 1
+    coalesce_replies = True
+
+    def __init__(self, bot, wait_timeout=1, cursor_file=None):
+        from whatsapp_events import ReadCursors
+
+        self.bot = bot
+        self.wait_timeout = wait_timeout
+        self.cursors = ReadCursors(cursor_file)
+        self._driver_lock = threading.Lock()
+        self.startup = None
+
+    def start(self):
+        from driver_profiles import browser_rss
+
+        started = time.perf_counter()
+        if self.bot.setup_driver() is False:
+            print("❌ Falha ao configurar o driver")
+            return False
+        driver_ready = time.perf_counter()
+        if not self.bot.connect_whatsapp():
+            print("❌ Falha ao conectar ao WhatsApp")
+            return False
+        ready = time.perf_counter()
+
+        # Tempo até atender (inclui a espera pelo QR code, se houve) e memória do navegador
+        self.startup = {
+            'driver_seconds': driver_ready - started,
+            'whatsapp_seconds': ready - driver_ready,
+            'total_seconds': ready - started,
+            'browser_rss_mb': browser_rss(self.bot.driver),
+        }
+        report = (f"⏱️ Pronto para atender em {self.startup['total_seconds']:.1f}s "
+                  f"(Chrome {self.startup['driver_seconds']:.1f}s, "
+                  f"WhatsApp Web {self.startup['whatsapp_seconds']:.1f}s)")
+        if self.startup['browser_rss_mb'] is not None:
+            report += f" | 🧠 Navegador: {self.startup['browser_rss_mb']:.0f} MB"
+        print(report)
+        return True
+
+    def receive(self):
+        from whatsapp_events import WhatsAppEvents
+
+        events = WhatsAppEvents(self.bot.driver, cursors=self.cursors)
+        while True:
+            try:
+                with self._driver_lock:
+                    received = self._read_events(events)
+            except Exception as e:
+                print(f"❌ Erro no monitoramento: {e}")
+                time.sleep(10)
+                continue
+            # Entrega fora do lock, para os envios não esperarem o consumidor
+            yield from received
+
+    def _read_events(self, events):
+        # Bloqueia até o observer da página avisar sobre algo novo
+        batch = events.wait(self.wait_timeout)
+        # A conversa aberta é lida antes de abrir as não lidas, que a tirariam da tela
+        arrived = {}
+        for event in batch:
+            if event['type'] == 'message':
+                arrived[event['chat']] = arrived.get(event['chat'], 0) + 1
+        received = []
+        for chat, count in arrived.items():
+            received.extend(self._read_chat(events, chat, count))
+        for event in batch:
+            if event['type'] == 'unread':
+                received.extend(self._read_chat(events, event['chat']))
+        return received
+
+    def _read_chat(self, events, chat, expected=None):
+        """Mensagens novas de uma conversa; sem `expected`, abre a conversa não lida"""
+        try:
+            if expected is None:
+                chat, expected = events.open_chat(chat)
+                if chat is None:
+                    return []
+            return [(chat, text) for _, text in events.new_messages(chat, expected)]
+        except Exception as e:
+            print(f"❌ Erro ao ler mensagens de {chat}: {e}")
+            return []
+
+    def send(self, phone, message):
+        with self._driver_lock:
+            return self.bot.send_message(phone, message)
+
+    def stop(self):
+        sender = self.bot.sender
+        if sender is not None and sender.latencies:
+            stats = sender.latency_percentiles()
+            print(f"📊 {len(sender.latencies)} envios ({sender.reused} na conversa aberta): "
+                  f"p50 {stats['p50']:.0f} ms | p95 {stats['p95']:.0f} ms | p99 {stats['p99']:.0f} ms")
+        self.cursors.close()
+        if self.bot.driver:
+            self.bot.driver.quit()
+
+
+class WebhookTransport(Transport):
+    """
+    Recebe mensagens por HTTP e devolve a resposta do bot no corpo da resposta.
+
+    POST /messages com {"phone": "...", "message": "..."} retorna
+    {"phone": "...", "reply": "..."}. As requisições (atendidas em paralelo
+    pelo Flask) entram numa fila única e o ConversationEngine as distribui
+    por telefone: as mensagens de um mesmo cliente são processadas em ordem,
+    e clientes diferentes são atendidos em paralelo.
+    """
+
+    def __init__(self, host=None, port=None, reply_timeout=None):
+        from flask import Flask
+
+        self.host = host or WEBHOOK_CONFIG['host']
+        self.port = WEBHOOK_CONFIG['port'] if port is None else port
+        self.reply_timeout = reply_timeout or WEBHOOK_CONFIG['reply_timeout_seconds']
+        self._incoming = queue.Queue()
+        self._pending = {}  # telefone -> respostas aguardadas, em ordem de chegada
+        self._lock = threading.Lock()
+        self._server = None
+        self.app = Flask(__name__)
+        self.app.add_url_rule('/messages', 'messages', self._handle_message, methods=['POST'])
+        self.app.add_url_rule('/health', 'health', lambda: {'status': 'ok'})
+
+    def _handle_message(self):
+        from flask import jsonify, request
+
+        data = request.get_json(silent=True) or {}
+        phone, message = data.get('phone'), data.get('message')
+        if not phone or not isinstance(message, str):
+            return jsonify({'error': "Campos 'phone' e 'message' são obrigatórios"}), 400
+
+        slot = queue.Queue(maxsize=1)
+        with self._lock:
+            self._pending.setdefault(str(phone), deque()).append(slot)
+        self._incoming.put((str(phone), message))
+        try:
+            reply = slot.get(timeout=self.reply_timeout)
+        except queue.Empty:
+            return jsonify({'error': "Tempo esgotado aguardando a resposta"}), 504
+        return jsonify({'phone': phone, 'reply': reply})
+
+    def start(self):
+        from werkzeug.serving import make_server
+
+        self._server = make_server(self.host, self.port, self.app, threaded=True)
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"🌐 Webhook ouvindo em http://{self.host}:{self.port}/messages")
+        return True
+
+    def receive(self):
+        while True:
+            item = self._incoming.get()
+            if item is None:
+                return
+            yield item
+
+    def send(self, phone, message):
+        with self._lock:
+            pending = self._pending.get(phone)
+            if not pending:
+                return False
+            slot = pending.popleft()
+            if not pending:
+                del self._pending[phone]
+        # Se a requisição já desistiu, a resposta é descartada
+        slot.put(message)
+        return True
+
+    def stop(self):
+        self._incoming.put(None)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+class ReplayTransport(Transport):
+    """Reproduz uma lista de (telefone, mensagem) e guarda as respostas em `sent`"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+
+    def receive(self):
+        yield from self.messages
+
+    def send(self, phone, message):
+        self.sent.append((phone, message))
+        return True
+
+
+class QueueTransport(Transport):
+    """
+    Mensagens entregues por uma fila (ex.: multiprocessing.Queue de um roteador).
+
+    `inbox` recebe (telefone, mensagem) e None para encerrar; as respostas
+    vão para `outbox` como (telefone, resposta).
+    """
+
+    def __init__(self, inbox, outbox):
+        self.inbox = inbox
+        self.outbox = outbox
+
+    def receive(self):
+        while True:
+            item = self.inbox.get()
+            if item is None:
+                return
+            yield item
+
+    def send(self, phone, message):
+        self.outbox.put((phone, message))
+        return True
+
+
+class RecordingTransport(Transport):
+    """
+    Repassa para outro transporte gravando cada mensagem recebida em JSONL
+    ({"time": ..., "phone": ..., "message": ...}), para reproduzir depois
+    com `python load_test.py replay`.
+    """
+
+    def __init__(self, transport, path):
+        self.transport = transport
+        self.max_concurrent_sends = transport.max_concurrent_sends
+        self.coalesce_replies = transport.coalesce_replies
+        self.path = path
+
+    def start(self):
+        return self.transport.start()
+
+    def receive(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for phone, message in self.transport.receive():
+                f.write(json.dumps({'time': time.time(), 'phone': phone, 'message': message},
+                                   ensure_ascii=False) + '\n')
+                f.flush()
+                yield phone, message
+
+    def send(self, phone, message):
+        return self.transport.send(phone, message)
+
+    def stop(self):
+        self.transport.stop()
@@ -0,0 +1,345 @@
+"""
+Vários processos do bot (workers), cada um com sua sessão, e roteamento dos
+clientes por hash consistente do telefone
+"""
+
+import argparse
+import bisect
+import hashlib
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+
+from bot_transports import Transport
+from config import BOT_CONFIG, BOT_WORKERS_CONFIG, CONVERSATION_CONFIG, DRIVER_CONFIG
+from whatsapp_sender import percentiles
+
+
+class HashRing:
+    """
+    Anel de hash consistente: telefone -> worker.
+
+    Cada worker ocupa `replicas` pontos do anel e o telefone vai para o
+    primeiro ponto depois do seu hash. A escolha não depende de estado
+    (qualquer processo chega ao mesmo worker) e, ao mudar o número de
+    workers, só ~1/N dos clientes troca de worker.
+    """
+
+    def __init__(self, nodes, replicas=None):
+        self.replicas = replicas or BOT_WORKERS_CONFIG['ring_replicas']
+        self._ring = sorted(
+            (self._hash(f"{node}#{replica}"), node)
+            for node in nodes for replica in range(self.replicas)
+        )
+        self._keys = [key for key, _ in self._ring]
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+    def node_for(self, key):
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._ring[index][1]
+
+
+class MeteredTransport(Transport):
+    """
+    Repassa para outro transporte contando mensagens e respostas de um worker.
+
+    A latência vai da chegada da mensagem ao envio da sua resposta (com
+    respostas agrupadas, conta a mensagem mais antiga). A cada `interval`
+    segundos, e ao encerrar, um relatório é publicado na fila `reports`.
+    """
+
+    def __init__(self, transport, worker, reports, interval=None, history=1000):
+        self.transport = transport
+        self.max_concurrent_sends = transport.max_concurrent_sends
+        self.coalesce_replies = transport.coalesce_replies
+        self.worker = worker
+        self.reports = reports
+        self.interval = interval or BOT_WORKERS_CONFIG['report_interval_seconds']
+        self.received = 0
+        self.replied = 0
+        self.latencies = deque(maxlen=history)  # segundos por resposta
+        self._waiting = {}  # telefone -> instantes de chegada ainda sem resposta
+        self._lock = threading.Lock()
+        self._started = None
+        self._window = None  # (instante, respostas) do último relatório
+        self._stopped = threading.Event()
+
+    def start(self):
+        if not self.transport.start():
+            return False
+        self._started = time.monotonic()
+        self._window = (self._started, 0)
+        threading.Thread(target=self._report_loop, daemon=True).start()
+        return True
+
+    def receive(self):
+        for phone, message in self.transport.receive():
+            with self._lock:
+                self.received += 1
+                self._waiting.setdefault(phone, deque()).append(time.monotonic())
+            yield phone, message
+
+    def send(self, phone, message):
+        delivered = self.transport.send(phone, message)
+        now = time.monotonic()
+        with self._lock:
+            self.replied += 1
+            waiting = self._waiting.get(phone)
+            if waiting:
+                self.latencies.append(now - waiting.popleft())
+                if self.coalesce_replies:
+                    waiting.clear()
+                if not waiting:
+                    del self._waiting[phone]
+        return delivered
+
+    def report(self):
+        """Contadores, respostas por segundo desde o último relatório e percentis em ms"""
+        now = time.monotonic()
+        with self._lock:
+            since, replied_before = self._window
+            self._window = (now, self.replied)
+            report = {
+                'worker': self.worker,
+                'pid': os.getpid(),
+                'received': self.received,
+                'replied': self.replied,
+                'elapsed': now - self._started,
+                'per_second': (self.replied - replied_before) / (now - since) if now > since else 0.0,
+            }
+            report.update({name: value * 1000 for name, value in percentiles(self.latencies).items()})
+        return report
+
+    def _report_loop(self):
+        while not self._stopped.wait(self.interval):
+            self.reports.put(self.report())
+
+    def stop(self):
+        self._stopped.set()
+        self.transport.stop()
+        if self._started is not None:
+            report = self.report()
+            report['per_second'] = report['replied'] / report['elapsed'] if report['elapsed'] else 0.0
+            report['final'] = True
+            self.reports.put(report)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def worker_path(path, worker):
+    """Arquivo/diretório próprio do worker: whatsapp_session -> whatsapp_session-2"""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{worker}{ext}"
+
+
+def run_worker(worker, transport='selenium', profile=None, inbox=None, outbox=None,
+               reports=None, conversation_options=None, report_interval=None, storage_options=None):
+    """
+    Processo de um worker: um WhatsAppBot com sessão do navegador, snapshot
+    de conversas e imagem do QR code próprios. Os pedidos vão para o
+    armazenamento configurado (ou create_storage(**storage_options)),
+    compartilhado entre os processos.
+    """
+    from bot_transports import QueueTransport, SeleniumTransport
+    from conversation_store import create_conversation_store
+    from driver_profiles import get_driver_profile
+    from order_writer import OrderWriteQueue
+    from whatsapp_bot import QR_SCREENSHOT, WhatsAppBot
+
+    session_dir = DRIVER_CONFIG['session_dir']
+    options = dict(conversation_options or {})
+    snapshot_file = CONVERSATION_CONFIG['snapshot_file']
+    if CONVERSATION_CONFIG['store'] == 'memory' and snapshot_file:
+        options.setdefault('snapshot_file', worker_path(snapshot_file, worker))
+
+    bot = WhatsAppBot(
+        profile=get_driver_profile(profile, session_dir=worker_path(session_dir, worker) if session_dir else ''),
+        active_orders=create_conversation_store(**options)
+    )
+    bot.qr_screenshot = worker_path(QR_SCREENSHOT, worker)
+    if storage_options:
+        bot.order_queue = OrderWriteQueue(storage_options=storage_options)
+    # terminate() do processo principal encerra o bot como Ctrl+C (fecha o Chrome e grava os pedidos)
+    signal.signal(signal.SIGTERM, _interrupt)
+    if transport == 'webhook':
+        channel = QueueTransport(inbox, outbox)
+    else:
+        cursor_file = BOT_CONFIG['read_cursor_file']
+        channel = SeleniumTransport(bot, cursor_file=worker_path(cursor_file, worker) if cursor_file else '')
+    bot.run(MeteredTransport(channel, worker, reports, report_interval))
+
+
+class BotWorkerPool:
+    """
+    N processos do bot atendendo ao mesmo tempo.
+
+    - 'selenium': cada worker é um número de WhatsApp com sessão própria (o
+      QR code é escaneado uma vez por worker, em whatsapp_session-N); cada
+      cliente fica no número para o qual escreveu.
+    - 'webhook': este processo recebe POST /messages (como o WebhookTransport)
+      e o HashRing envia cada telefone sempre ao mesmo worker, então o
+      carrinho do cliente fica na memória de um único worker.
+
+    Os pedidos confirmados vão para o armazenamento de pedidos configurado
+    (ou o de `storage_options`, argumentos de create_storage), que já é
+    compartilhado entre processos (trava de arquivo ou SQLite).
+    Os relatórios de vazão de cada worker são impressos a cada
+    `report_interval_seconds` e ao encerrar.
+    """
+
+    def __init__(self, workers=None, transport=None, profile=None, host=None, port=None,
+                 conversation_options=None, report_interval=None, storage_options=None):
+        self.workers = workers or BOT_WORKERS_CONFIG['workers']
+        self.transport = transport or BOT_WORKERS_CONFIG['transport']
+        self.profile = profile
+        self.host = host
+        self.port = port
+        self.conversation_options = conversation_options
+        self.report_interval = report_interval
+        self.storage_options = storage_options
+        self.ring = HashRing(range(self.workers))
+        self.reports = {}  # worker -> último relatório
+        self.router = None
+        self._processes = []
+        self._threads = []
+
+    def start(self):
+        # spawn: o processo principal tem threads (servidor HTTP) e o Windows não tem fork
+        context = multiprocessing.get_context('spawn')
+        self._report_queue = context.Queue()
+        self._outbox = context.Queue()
+        self._inboxes = [context.Queue() for _ in range(self.workers)]
+
+        self._spawn_thread(self._print_reports)
+        for worker in range(self.workers):
+            process = context.Process(
+                target=run_worker, name=f'bot-worker-{worker}',
+                args=(worker, self.transport, self.profile, self._inboxes[worker], self._outbox,
+                      self._report_queue, self.conversation_options, self.report_interval,
+                      self.storage_options)
+            )
+            process.start()
+            self._processes.append(process)
+        print(f"🤖 {self.workers} workers do bot iniciados ({self.transport})")
+
+        if self.transport == 'webhook':
+            from bot_transports import WebhookTransport
+
+            self.router = WebhookTransport(host=self.host, port=self.port)
+            self.router.start()
+            self._spawn_thread(self._route_messages)
+            self._spawn_thread(self._deliver_replies)
+        return True
+
+    def _spawn_thread(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _route_messages(self):
+        for phone, message in self.router.receive():
+            self._inboxes[self.ring.node_for(phone)].put((phone, message))
+
+    def _deliver_replies(self):
+        while True:
+            item = self._outbox.get()
+            if item is None:
+                return
+            self.router.send(*item)
+
+    def _print_reports(self):
+        while True:
+            report = self._report_queue.get()
+            if report is None:
+                return
+            self.reports[report['worker']] = report
+            if not report.get('final'):
+                print(format_report(report))
+
+    def wait(self):
+        """Bloqueia enquanto houver workers rodando"""
+        while any(process.is_alive() for process in self._processes):
+            time.sleep(1)
+
+    def stop(self, timeout=30):
+        """Encerra os workers (gravando pedidos pendentes) e imprime o resumo de vazão"""
+        if self.router is not None:
+            self.router.stop()
+        for inbox, process in zip(self._inboxes, self._processes):
+            if not process.is_alive():
+                continue
+            if self.transport == 'webhook':
+                inbox.put(None)  # O worker responde o que já recebeu e encerra
+            else:
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                print(f"⚠️ Forçando parada do {process.name}...")
+                process.kill()
+                process.join()
+        self._outbox.put(None)
+        self._report_queue.put(None)
+        for thread in self._threads:
+            thread.join(5)
+        self._processes = []
+        self._threads = []
+        self.print_summary()
+
+    def print_summary(self):
+        if not self.reports:
+            return
+        print("\n📊 Vazão por worker:")
+        for worker in sorted(self.reports):
+            print(format_report(self.reports[worker]))
+        replied = sum(report['replied'] for report in self.reports.values())
+        per_second = sum(report['per_second'] for report in self.reports.values())
+        print(f"   Total: {replied} respostas, {per_second:.1f}/s")
+
+    def run(self):
+        """Inicia os workers e atende até Ctrl+C"""
+        self.start()
+        try:
+            self.wait()
+        except KeyboardInterrupt:
+            print("\n🛑 Parando workers...")
+        finally:
+            self.stop()
+
+
+def format_report(report):
+    return (f"   Worker {report['worker']} (pid {report['pid']}): {report['received']} mensagens, "
+            f"{report['replied']} respostas, {report['per_second']:.1f}/s | "
+            f"p50 {report['p50']:.0f} ms | p95 {report['p95']:.0f} ms | p99 {report['p99']:.0f} ms")
+
+
+def main():
+    """Linha de comando: python bot_workers.py [selenium|webhook] [--workers N] [--profile PERFIL]"""
+    from driver_profiles import DRIVER_PROFILES
+
+    parser = argparse.ArgumentParser(description="Vários workers do bot de pedidos")
+    parser.add_argument('transport', nargs='?', choices=['selenium', 'webhook'], default=None,
+                        help="selenium (um número de WhatsApp por worker) ou webhook (roteador HTTP)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="quantidade de workers (padrão: BOT_WORKERS_CONFIG['workers'])")
+    parser.add_argument('--profile', default=None, choices=['auto'] + list(DRIVER_PROFILES),
+                        help="perfil do driver (padrão: DRIVER_CONFIG['profile'])")
+    args = parser.parse_args()
+
+    # run_system.py encerra com terminate(): para os workers antes de sair
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    BotWorkerPool(workers=args.workers, transport=args.transport, profile=args.profile).run()
+
+
+if __name__ == "__main__":
+    main()
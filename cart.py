@@ -0,0 +1,204 @@
+"""
+Carrinho do bot por quantidade e leitura das mensagens de pedido
+"""
+
+import re
+
+from config import BOT_CONFIG
+from reply_templates import format_item_line
+
+MAX_DIGITS = 9  # Números maiores que isso não são itens nem quantidades plausíveis
+
+# Um único regex percorre a mensagem (maiúsculas ou minúsculas):
+#   REMOVER/TIRAR/RETIRAR  -> os números seguintes saem do carrinho
+#   2X1  -> 2 unidades do item 1        1*3 -> item 1, 3 unidades
+#   -3   -> remove uma unidade do item 3 (também -2X3 e -3*2), só no início
+#           da mensagem ou depois de espaço/vírgula sem número logo antes:
+#           "1, -3" remove, mas "1-3" e "1 - 3" são uma lista (itens 1 e 3)
+#   3    -> uma unidade do item 3
+TOKEN_RE = re.compile(r"""
+    (?P<remove>\b(?:REMOVER|TIRAR|RETIRAR)\b)
+  | (?P<minus>(?:^|(?<=[\s,;]))-\s*)?
+    (?: (?P<qty>\d+)\s*X\s*(?P<item>\d+)
+      | (?P<item_first>\d+)\s*\*\s*(?P<qty_last>\d+)
+      | (?P<single>\d+) )
+""", re.VERBOSE | re.IGNORECASE)
+
+
+def parse_order_message(message):
+    """
+    Lê as alterações pedidas numa mensagem: lista de (número do item, quantidade),
+    com quantidade negativa para remoções. Lista vazia se não há nenhum item.
+    """
+    changes = []
+    removing = False
+    for match in TOKEN_RE.finditer(message):
+        if match.group('remove'):
+            removing = True
+            continue
+        if match.group('single'):
+            number, quantity = _to_int(match.group('single')), 1
+        elif match.group('item'):
+            number, quantity = _to_int(match.group('item')), _to_int(match.group('qty'))
+        else:
+            number, quantity = _to_int(match.group('item_first')), _to_int(match.group('qty_last'))
+        if removing or (match.group('minus') and not _after_number(message, match.start())):
+            quantity = -quantity
+        if quantity:
+            changes.append((number, quantity))
+    return changes
+
+
+def _after_number(message, position):
+    """True se o último caractere antes de `position` (ignorando espaços) é um dígito"""
+    before = message[:position].rstrip()
+    return bool(before) and before[-1].isdigit()
+
+
+def _to_int(digits):
+    """Converte os dígitos sem custo proporcional ao tamanho ("99999...9" vira 10**9)"""
+    return int(digits) if len(digits) <= MAX_DIGITS else 10 ** MAX_DIGITS
+
+
+class CartLimitError(ValueError):
+    """Alteração deixaria um item ou o carrinho acima do limite de unidades"""
+
+
+class Cart:
+    """
+    Carrinho como número do item -> [quantidade, preço em centavos, minutos].
+
+    Total e maior tempo de preparo são mantidos a cada alteração, então o
+    custo de uma mensagem não depende de quantas unidades já há no carrinho.
+    O preço fica registrado no momento da inclusão (o cardápio pode ser
+    recarregado no meio do pedido). `to_dict()` é o que vai para o
+    armazenamento de conversas.
+
+    Cada item aceita até `max_quantity` unidades e o carrinho até
+    `max_units` (BOT_CONFIG), para que uma mensagem como "100000000x1" não
+    vire um pedido de gigabytes.
+    """
+
+    __slots__ = ('items', 'total_cents', 'max_time', 'units')
+
+    max_quantity = BOT_CONFIG['max_quantity_per_item']
+    max_units = BOT_CONFIG['max_units_per_order']
+
+    def __init__(self, items=None, total_cents=0, max_time=0):
+        self.items = items or {}
+        self.total_cents = total_cents
+        self.max_time = max_time
+        self.units = sum(entry[0] for entry in self.items.values())
+
+    @classmethod
+    def from_dict(cls, data):
+        if data is None:
+            return cls()
+        items = data['items']
+        if isinstance(items, list):
+            # Carrinho salvo no formato antigo: uma cópia do item por unidade
+            cart = cls()
+            for item in items:
+                cart._add(item['numero'], 1, round(item['preco'] * 100), item['tempo_estimado_minutos'])
+            return cart
+        return cls({int(number): entry for number, entry in items.items()},
+                   data['total_cents'], data['max_time'])
+
+    def to_dict(self):
+        return {
+            'items': {str(number): entry for number, entry in self.items.items()},
+            'total_cents': self.total_cents,
+            'max_time': self.max_time,
+            'state': 'ordering'
+        }
+
+    def __bool__(self):
+        return bool(self.items)
+
+    @property
+    def total(self):
+        return self.total_cents / 100
+
+    def add(self, menu_item, quantity=1):
+        """Inclui unidades de um item do cardápio (MenuItem)"""
+        self._add(menu_item.numero, quantity, round(menu_item.preco * 100),
+                  menu_item.tempo_estimado_minutos)
+
+    def _add(self, number, quantity, price_cents, minutes):
+        entry = self.items.get(number)
+        if entry is None:
+            self.items[number] = [quantity, price_cents, minutes]
+        else:
+            entry[0] += quantity
+            price_cents = entry[1]
+        self.units += quantity
+        self.total_cents += quantity * price_cents
+        self.max_time = max(self.max_time, minutes)
+
+    def remove(self, number, quantity=1):
+        """Retira até `quantity` unidades; retorna quantas saíram"""
+        entry = self.items.get(number)
+        if entry is None:
+            return 0
+        quantity = min(quantity, entry[0])
+        entry[0] -= quantity
+        self.units -= quantity
+        self.total_cents -= quantity * entry[1]
+        if not entry[0]:
+            del self.items[number]
+            if entry[2] == self.max_time:
+                # Só aqui é preciso olhar os demais itens (no máximo o tamanho do cardápio)
+                self.max_time = max((other[2] for other in self.items.values()), default=0)
+        return quantity
+
+    def check_limits(self, changes):
+        """CartLimitError se as alterações passariam dos limites (nada é alterado)"""
+        quantities = {}
+        units = self.units
+        for number, quantity in changes:
+            current = quantities.get(number)
+            if current is None:
+                entry = self.items.get(number)
+                current = entry[0] if entry is not None else 0
+            quantity = max(quantity, -current)
+            quantities[number] = current + quantity
+            units += quantity
+            if quantities[number] > self.max_quantity or units > self.max_units:
+                raise CartLimitError(number)
+
+    def apply(self, changes, menu):
+        """
+        Aplica (número, quantidade) de parse_order_message; retorna quantas
+        alterações valeram. Acima dos limites, levanta CartLimitError sem
+        alterar o carrinho.
+        """
+        self.check_limits(changes)
+        applied = 0
+        for number, quantity in changes:
+            if quantity < 0:
+                applied += bool(self.remove(number, -quantity))
+            else:
+                menu_item = menu.get(number)
+                if menu_item is not None:
+                    self.add(menu_item, quantity)
+                    applied += 1
+        return applied
+
+    def format_lines(self, menu):
+        """Linhas do resumo: uma por item, com a quantidade quando maior que 1"""
+        return "".join([format_item_line(menu, number, quantity, price_cents)
+                        for number, (quantity, price_cents, _) in self.items.items()])
+
+    def order_items(self, menu):
+        """Itens no formato dos pedidos gravados (uma entrada por item, com a quantidade)"""
+        items = []
+        for number, (quantity, price_cents, minutes) in self.items.items():
+            menu_item = menu.get(number)
+            items.append({
+                'numero': number,
+                'nome': menu_item.nome if menu_item is not None else f"Item {number}",
+                'preco': price_cents / 100,
+                'quantidade': quantity,
+                'tempo_estimado_minutos': minutes
+            })
+        return items
@@ -87,7 +87,35 @@ Digite mais números para adicionar itens ou envie 'ENVIAR' para finalizar.""",
 
     'pedido_vazio': "❌ Nenhum item no pedido. Digite os números dos pratos desejados.",
 
-    'erro_processamento': "❌ Erro ao processar pedido. Tente novamente ou entre em contato conosco."
+    'erro_processamento': "❌ Erro ao processar pedido. Tente novamente ou entre em contato conosco.",
+
+    'item_invalido': "❌ Nenhum item válido encontrado. Verifique os números e tente novamente.",
+
+    'limite_quantidade': "❌ Quantidade acima do permitido: até {maximo_item} unidades por item e {maximo_pedido} por pedido. Seu pedido não foi alterado.",
+
+    'boas_vindas': """🍽️ **Bem-vindo ao nosso restaurante!**
+
+Para fazer seu pedido, digite os números dos pratos desejados.
+Exemplo: 1, 3, 15
+Quantidades: 2x1 (duas unidades do item 1). Para retirar: remover 3
+
+Para ver o cardápio completo, acesse: [link do Streamlit]
+
+Digite 'ENVIAR' quando terminar seu pedido.""",
+
+    # Cartão de um pedido gravado (OrderManager.format_order_for_display)
+    'pedido_detalhes': """
+🍽️ **Pedido #{id}**
+📱 **Telefone:** {phone}
+🕒 **Criado em:** {criado_em}
+⏱️ **Tempo estimado:** {tempo} min
+🚚 **Entrega estimada:** {entrega}
+📊 **Status:** {status}
+
+**Itens:**
+{itens}
+💰 **Total: R$ {total:.2f}**
+"""
 }
 
 # Configurações de Log
@@ -97,12 +125,79 @@ LOG_CONFIG = {
     'file': 'sistema_restaurante.log'
 }
 
+# Configurações de Armazenamento dos Pedidos
+ORDERS_CONFIG = {
+    'storage': 'log',  # 'json' (reescreve o arquivo a cada pedido), 'log' (append-only), 'partitioned' ou 'sqlite'
+    'orders_file': 'orders.json',
+    'log_file': 'orders.log.jsonl',
+    'sqlite_file': 'orders.db',
+    'sqlite_change_log_size': 10000,  # Alterações guardadas para os outros processos aplicarem no refresh
+    'partition_dir': 'orders_partitions',
+    'partition_by': 'day',  # 'day' ou 'month'
+    'fsync_batch_size': 20,
+    'fsync_interval_seconds': 1.0,
+    'compact_every': 1000,
+    'group_commit_size': 50,  # Pedidos do bot gravados por lote na fila de gravação
+    'group_commit_wait_seconds': 0.01,  # Espera por mais pedidos antes de fechar o lote
+    'export_chunk_size': 10000  # Itens por bloco na exportação
+}
+
+# Configurações do Cardápio
+MENU_CONFIG = {
+    'menu_file': 'cardapio.csv',
+    'reload_check_seconds': 2  # Intervalo mínimo entre verificações de alteração do arquivo
+}
+
+# Configurações do Driver do Bot (python whatsapp_bot.py --profile PERFIL)
+DRIVER_CONFIG = {
+    'profile': 'auto',  # 'auto' (windows ou desktop), 'desktop', 'windows', 'headless' (produção) ou 'remote'
+    'remote_url': 'http://127.0.0.1:4444/wd/hub',  # Selenium Grid usado pelo perfil 'remote'
+    'session_dir': 'whatsapp_session'  # Login do WhatsApp Web salvo entre reinícios ('' desativa)
+}
+
+# Configurações do Bot
+BOT_CONFIG = {
+    'max_concurrent_sends': 4,  # Respostas enviadas em paralelo (o WhatsApp Web envia uma por vez)
+    'read_cursor_file': 'read_cursors.json',  # Última mensagem lida de cada conversa ('' = só em memória)
+    'read_cursor_ids': 5,  # data-ids guardados por conversa
+    'read_cursor_save_seconds': 1,
+    'max_messages_per_read': 50,  # Mensagens novas lidas de uma conversa de uma vez
+    'max_quantity_per_item': 50,  # Unidades de um mesmo item num pedido
+    'max_units_per_order': 200  # Unidades no pedido inteiro
+}
+
+# Configurações dos Workers do Bot (python bot_workers.py / python run_system.py bot N)
+BOT_WORKERS_CONFIG = {
+    'workers': 1,  # Processos do bot; com 'selenium', cada um é um número de WhatsApp com sessão própria
+    'transport': 'selenium',  # 'selenium' ou 'webhook' (roteador HTTP que distribui os clientes)
+    'ring_replicas': 100,  # Pontos de cada worker no anel de hash consistente
+    'report_interval_seconds': 60  # Intervalo dos relatórios de vazão por worker
+}
+
+# Configurações das Conversas (carrinhos em andamento no bot)
+CONVERSATION_CONFIG = {
+    'store': 'memory',  # 'memory' (com snapshot em arquivo) ou 'sqlite' (compartilhado entre workers)
+    'snapshot_file': 'conversations.json',  # '' desativa o snapshot
+    'sqlite_file': 'conversations.db',
+    'ttl_minutes': 120,  # Carrinhos sem alteração por mais tempo são descartados
+    'max_conversations': 50000,
+    'snapshot_interval_seconds': 30
+}
+
+# Configurações do Webhook (transporte HTTP do bot, sem navegador)
+WEBHOOK_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 5000,
+    'reply_timeout_seconds': 30
+}
+
 # Configurações de Backup
 BACKUP_CONFIG = {
     'auto_backup': True,
     'backup_interval_hours': 24,
     'backup_retention_days': 30,
-    'backup_folder': 'backups'
+    'backup_folder': 'backups',
+    'full_backup_every': 7  # Backups incrementais entre dois completos
 }
 
 def get_restaurante_info():
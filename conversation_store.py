@@ -0,0 +1,303 @@
+"""
+Estado das conversas do bot (carrinhos em andamento) com expiração e persistência
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import CONVERSATION_CONFIG
+from order_storage import atomic_write_json
+
+_MISSING = object()
+
+
+class ConversationStore:
+    """
+    Dicionário telefone -> carrinho, com expiração por inatividade.
+
+    Conversas sem alteração há mais de `ttl_minutes` são descartadas e, se
+    houver mais de `max_conversations`, as menos recentemente alteradas saem
+    primeiro. O estado lido com `get` é uma cópia de trabalho: alterações só
+    valem depois de gravadas de volta com `store[phone] = estado`.
+    """
+
+    def __init__(self, ttl_minutes=None, max_conversations=None):
+        ttl_minutes = CONVERSATION_CONFIG['ttl_minutes'] if ttl_minutes is None else ttl_minutes
+        self.ttl = ttl_minutes * 60
+        self.max_conversations = max_conversations or CONVERSATION_CONFIG['max_conversations']
+
+    def get(self, phone, default=None):
+        raise NotImplementedError
+
+    def __setitem__(self, phone, state):
+        raise NotImplementedError
+
+    def __delitem__(self, phone):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __getitem__(self, phone):
+        state = self.get(phone, _MISSING)
+        if state is _MISSING:
+            raise KeyError(phone)
+        return state
+
+    def __contains__(self, phone):
+        return self.get(phone, _MISSING) is not _MISSING
+
+    def pop(self, phone, default=None):
+        state = self.get(phone, _MISSING)
+        if state is _MISSING:
+            return default
+        del self[phone]
+        return state
+
+    def evict_expired(self):
+        """Remove as conversas expiradas; retorna quantas saíram"""
+        return 0
+
+    def close(self):
+        """Persiste o que estiver pendente"""
+
+
+class MemoryConversationStore(ConversationStore):
+    """
+    Conversas em memória, ordenadas da alteração mais antiga para a mais nova.
+
+    Como a ordem é a da última gravação, as expiradas e as candidatas a
+    despejo por LRU ficam sempre no início: a limpeza é proporcional ao que
+    sai, não ao total. Se `snapshot_file` estiver definido, o estado é salvo
+    por uma thread própria (no máximo a cada `snapshot_interval_seconds`, e
+    ao fechar) e recarregado na próxima inicialização; quem altera uma
+    conversa (o loop do motor de conversas) só marca que há o que salvar.
+    """
+
+    def __init__(self, snapshot_file=None, ttl_minutes=None, max_conversations=None,
+                 snapshot_interval=None):
+        super().__init__(ttl_minutes, max_conversations)
+        self.snapshot_file = (CONVERSATION_CONFIG['snapshot_file']
+                              if snapshot_file is None else snapshot_file)
+        self.snapshot_interval = (CONVERSATION_CONFIG['snapshot_interval_seconds']
+                                  if snapshot_interval is None else snapshot_interval)
+        self._items = OrderedDict()  # telefone -> [estado, alterado_em]
+        self._dirty = False
+        self._lock = threading.RLock()  # a thread do snapshot copia o estado sob a trava
+        self._writer = None
+        self._closed = threading.Event()
+        self._load()
+
+    def get(self, phone, default=None):
+        entry = self._items.get(phone)
+        if entry is None:
+            return default
+        if time.time() - entry[1] > self.ttl:
+            self.evict_expired()
+            return default
+        return entry[0]
+
+    def __setitem__(self, phone, state):
+        with self._lock:
+            self._items[phone] = [state, time.time()]
+            self._items.move_to_end(phone)
+            while len(self._items) > self.max_conversations:
+                self._items.popitem(last=False)
+            self._changed()
+
+    def __delitem__(self, phone):
+        with self._lock:
+            del self._items[phone]
+            self._changed()
+
+    def __len__(self):
+        return len(self._items)
+
+    def evict_expired(self):
+        cutoff = time.time() - self.ttl
+        evicted = 0
+        with self._lock:
+            while self._items:
+                phone, (state, updated_at) = next(iter(self._items.items()))
+                if updated_at > cutoff:
+                    break
+                del self._items[phone]
+                evicted += 1
+            if evicted:
+                self._dirty = True
+        return evicted
+
+    def _changed(self):
+        self._dirty = True
+        if self.snapshot_file and self._writer is None:
+            self._writer = threading.Thread(target=self._snapshot_loop, name='conversation-snapshot', daemon=True)
+            self._writer.start()
+
+    def _snapshot_loop(self):
+        while not self._closed.wait(max(self.snapshot_interval, 0.05)):
+            self.evict_expired()
+            self.save()
+
+    def save(self):
+        """Grava o snapshot (atômico) se algo mudou desde o último"""
+        if not self.snapshot_file:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = [[phone, state, updated_at] for phone, (state, updated_at) in self._items.items()]
+            self._dirty = False
+        # JSON e disco fora da trava: as conversas seguem sendo alteradas enquanto isso
+        atomic_write_json(self.snapshot_file, entries)
+
+    def _load(self):
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Snapshot de conversas ignorado: {e}")
+            return
+        cutoff = time.time() - self.ttl
+        for phone, state, updated_at in entries:
+            if updated_at > cutoff:
+                self._items[phone] = [state, updated_at]
+        while len(self._items) > self.max_conversations:
+            self._items.popitem(last=False)
+
+    def close(self):
+        self._closed.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.save()
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    Conversas num banco SQLite (modo WAL) compartilhado entre workers.
+
+    Cada leitura e gravação vai ao banco, então vários processos do bot
+    enxergam o mesmo carrinho. Expiradas e excedentes são apagados em lote,
+    no máximo a cada `evict_interval` segundos.
+    """
+
+    def __init__(self, db_file=None, ttl_minutes=None, max_conversations=None, evict_interval=None):
+        super().__init__(ttl_minutes, max_conversations)
+        self.db_file = db_file or CONVERSATION_CONFIG['sqlite_file']
+        self.evict_interval = (CONVERSATION_CONFIG['snapshot_interval_seconds']
+                               if evict_interval is None else evict_interval)
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversations (
+                    phone TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_conversations_updated_at ON conversations(updated_at)"
+            )
+        self._last_evict = time.monotonic()
+
+    def get(self, phone, default=None):
+        row = self.conn.execute(
+            "SELECT state FROM conversations WHERE phone = ? AND updated_at > ?",
+            (phone, time.time() - self.ttl)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def __setitem__(self, phone, state):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO conversations (phone, state, updated_at) VALUES (?, ?, ?)",
+                (phone, json.dumps(state, ensure_ascii=False), time.time())
+            )
+        if time.monotonic() - self._last_evict >= self.evict_interval:
+            self.evict_expired()
+
+    def __delitem__(self, phone):
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM conversations WHERE phone = ?", (phone,))
+        if not cursor.rowcount:
+            raise KeyError(phone)
+
+    def __len__(self):
+        (count,) = self.conn.execute(
+            "SELECT COUNT(*) FROM conversations WHERE updated_at > ?", (time.time() - self.ttl,)
+        ).fetchone()
+        return count
+
+    def evict_expired(self):
+        self._last_evict = time.monotonic()
+        with self.conn:
+            expired = self.conn.execute(
+                "DELETE FROM conversations WHERE updated_at <= ?", (time.time() - self.ttl,)
+            ).rowcount
+            excess = self.conn.execute("""
+                DELETE FROM conversations WHERE phone IN (
+                    SELECT phone FROM conversations ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_conversations,)).rowcount
+        return expired + excess
+
+    def close(self):
+        self.conn.close()
+
+
+CONVERSATION_BACKENDS = {
+    'memory': MemoryConversationStore,
+    'sqlite': SQLiteConversationStore,
+}
+
+
+def create_conversation_store(kind=None, **kwargs):
+    """Cria o armazenamento de conversas configurado em CONVERSATION_CONFIG"""
+    kind = kind or CONVERSATION_CONFIG['store']
+    if kind not in CONVERSATION_BACKENDS:
+        raise ValueError(f"Backend de conversas desconhecido: {kind}")
+    return CONVERSATION_BACKENDS[kind](**kwargs)
+
+
+def benchmark(conversations=100_000):
+    """Mede a memória de conversas ociosas (carrinho vazio) e o custo por acesso"""
+    import tempfile
+    import tracemalloc
+
+    tracemalloc.start()
+    store = MemoryConversationStore(snapshot_file='', max_conversations=conversations)
+    for phone in range(conversations):
+        store[f"5511{phone:09d}"] = {'items': [], 'total': 0, 'state': 'ordering'}
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"🧠 {conversations} conversas ociosas em memória: {used / 1024 / 1024:.1f} MB "
+          f"({used / conversations:.0f} bytes por conversa)")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store.snapshot_file = os.path.join(tmp_dir, 'conversations.json')
+        store._dirty = True
+        started = time.perf_counter()
+        store.save()
+        print(f"💾 Snapshot: {time.perf_counter() - started:.2f}s, "
+              f"{os.path.getsize(store.snapshot_file) / 1024 / 1024:.1f} MB")
+
+        sqlite_store = SQLiteConversationStore(db_file=os.path.join(tmp_dir, 'conversations.db'))
+        started = time.perf_counter()
+        for phone in range(10_000):
+            sqlite_store[f"5511{phone:09d}"] = {'items': [], 'total': 0, 'state': 'ordering'}
+            sqlite_store.get(f"5511{phone:09d}")
+        elapsed = time.perf_counter() - started
+        print(f"🗄️ SQLite: {elapsed / 10_000 * 1e6:.0f}µs por leitura + gravação")
+        sqlite_store.close()
+
+
+if __name__ == "__main__":
+    benchmark()
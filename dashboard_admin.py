@@ -46,8 +46,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
 def load_order_manager():
-    """Carrega o gerenciador de pedidos"""
+    """Carrega o gerenciador de pedidos (uma vez por processo do dashboard, compartilhado entre as sessões)"""
     return OrderManager()
 
 def main():
@@ -56,6 +57,8 @@ def main():
     
     # Carrega o gerenciador de pedidos
     order_manager = load_order_manager()
+    # Aplica só o que o bot gravou desde a última atualização da página
+    order_manager.refresh()
     
     # Sidebar para filtros
     st.sidebar.title("🔍 Filtros")
@@ -113,11 +116,8 @@ def main():
     
     with col1:
         # Gráfico de pedidos por status
-        if order_manager.orders:
-            status_counts = {}
-            for order in order_manager.orders:
-                status = order['status']
-                status_counts[status] = status_counts.get(status, 0) + 1
+        if order_manager.has_orders():
+            status_counts = order_manager.get_status_counts()
             
             if status_counts:
                 fig_status = px.pie(
@@ -129,26 +129,15 @@ def main():
     
     with col2:
         # Gráfico de receita por dia (últimos 7 dias)
-        if order_manager.orders:
-            # Agrupa pedidos por data
-            daily_revenue = {}
-            for order in order_manager.orders:
-                order_date = datetime.fromisoformat(order['created_at']).date()
-                if order_date not in daily_revenue:
-                    daily_revenue[order_date] = 0
-                daily_revenue[order_date] += order['total']
-            
-            # Últimos 7 dias
-            last_7_days = []
-            for i in range(7):
-                date = datetime.now().date() - timedelta(days=i)
-                last_7_days.append(date)
+        if order_manager.has_orders():
+            # Receita agrupada por dia na visão colunar (últimos 7 dias)
+            daily_revenue = order_manager.get_daily_revenue(days=7)
             
             revenue_data = []
-            for date in reversed(last_7_days):
+            for date, revenue in daily_revenue.items():
                 revenue_data.append({
                     'Data': date.strftime('%d/%m'),
-                    'Receita': daily_revenue.get(date, 0)
+                    'Receita': revenue
                 })
             
             if revenue_data:
@@ -189,8 +178,8 @@ def main():
     # Lista de pedidos
     st.subheader("📋 Pedidos Recentes")
     
-    # Filtra pedidos
-    filtered_orders = order_manager.orders.copy()
+    # Filtra por data (consulta indexada por dia)
+    filtered_orders = order_manager.get_orders_by_date(date_filter)
     
     if status_filter != "Todos":
         status_map = {
@@ -204,12 +193,6 @@ def main():
             if order['status'] == status_map[status_filter]
         ]
     
-    # Filtra por data
-    filtered_orders = [
-        order for order in filtered_orders
-        if datetime.fromisoformat(order['created_at']).date() == date_filter
-    ]
-    
     if filtered_orders:
         # Ordena por data de criação (mais recente primeiro)
         filtered_orders.sort(key=lambda x: x['created_at'], reverse=True)
@@ -221,7 +204,9 @@ def main():
                 with col1:
                     st.write("**Itens:**")
                     for item in order['items']:
-                        st.write(f"• #{item['numero']} - {item['nome']} - R$ {item['preco']:.2f}")
+                        quantity = item.get('quantidade', 1)
+                        prefix = f"{quantity}x " if quantity != 1 else ""
+                        st.write(f"• {prefix}#{item['numero']} - {item['nome']} - R$ {quantity * item['preco']:.2f}")
                 
                 with col2:
                     created_time = datetime.fromisoformat(order['created_at']).strftime("%d/%m %H:%M")
@@ -257,9 +242,31 @@ def main():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if st.button("📊 Exportar Pedidos (CSV)"):
-            if order_manager.export_orders_to_csv():
-                st.success("Pedidos exportados com sucesso!")
+        export_format = st.selectbox("Formato", ["CSV", "CSV (gzip)", "JSONL", "Parquet"])
+        export_period = st.date_input(
+            "Período",
+            value=(datetime.now().date() - timedelta(days=30), datetime.now().date()),
+            max_value=datetime.now().date()
+        )
+        if st.button("📊 Exportar Pedidos"):
+            export_files = {
+                "CSV": "orders_export.csv",
+                "CSV (gzip)": "orders_export.csv.gz",
+                "JSONL": "orders_export.jsonl",
+                "Parquet": "orders_export.parquet"
+            }
+            # Durante a seleção o date_input pode devolver só a data inicial
+            since = export_period[0] if export_period else None
+            until = export_period[-1] if export_period else None
+            progress_bar = st.progress(0.0, text="Exportando pedidos...")
+            
+            if order_manager.export_orders(
+                export_files[export_format],
+                since=since,
+                until=until,
+                progress=lambda done, total: progress_bar.progress(done / total)
+            ):
+                st.success(f"Pedidos exportados para {export_files[export_format]}!")
             else:
                 st.error("Erro ao exportar pedidos.")
     
@@ -0,0 +1,251 @@
+"""
+Perfis de driver do Chrome para o bot (desktop, Windows, headless e remoto)
+"""
+
+import os
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from config import DRIVER_CONFIG
+
+
+class DriverProfile:
+    """
+    Como criar o navegador do bot. O restante (conexão, leitura e envio de
+    mensagens) é o mesmo para todos os perfis e fica em whatsapp_bot.py.
+
+    Com `session_dir`, o Chrome guarda o login do WhatsApp Web num diretório
+    próprio: depois do primeiro QR code, reiniciar o bot só recarrega a página.
+    """
+
+    name = None
+    description = ""
+    window_size = "1920,1080"
+    headless = False
+    persistent_session = True
+    tips = [
+        "Certifique-se de que o Chrome está instalado",
+        "Reinstale o Chrome",
+    ]
+
+    def __init__(self, session_dir=None):
+        session_dir = DRIVER_CONFIG['session_dir'] if session_dir is None else session_dir
+        self.session_dir = os.path.abspath(session_dir) if session_dir and self.persistent_session else None
+
+    def chrome_options(self):
+        """Opções comuns a todos os perfis"""
+        options = Options()
+        if self.session_dir:
+            options.add_argument(f"--user-data-dir={self.session_dir}")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument(f"--window-size={self.window_size}")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        # Remove detecção de automação
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+        return options
+
+    def create_driver(self):
+        """Inicia o navegador; exceções são repassadas ao bot"""
+        print("📥 Baixando ChromeDriver...")
+        service = Service(ChromeDriverManager().install())
+        print("🚀 Iniciando Chrome...")
+        return webdriver.Chrome(service=service, options=self.chrome_options())
+
+
+class DesktopProfile(DriverProfile):
+    """Chrome visível, com as opções que garantem a exibição do QR code"""
+
+    name = 'desktop'
+    description = "Chrome com janela (Linux/macOS)"
+
+    def chrome_options(self):
+        options = super().chrome_options()
+        options.add_argument("--disable-web-security")
+        options.add_argument("--allow-running-insecure-content")
+        options.add_argument("--disable-features=VizDisplayCompositor")
+        return options
+
+
+class WindowsProfile(DesktopProfile):
+    """Chrome instalado no Windows, sem throttling da janela em segundo plano"""
+
+    name = 'windows'
+    description = "Chrome com janela no Windows"
+    window_size = "1200,800"
+    tips = [
+        "Execute como administrador",
+        "Desative temporariamente o antivírus",
+        "Reinstale o Chrome",
+        "Verifique se há atualizações do Windows",
+    ]
+
+    def chrome_paths(self):
+        return [
+            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+            r"C:\Users\{}\AppData\Local\Google\Chrome\Application\chrome.exe".format(os.getenv('USERNAME'))
+        ]
+
+    def chrome_options(self):
+        options = super().chrome_options()
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-plugins")
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.add_argument("--disable-field-trial-config")
+
+        # Tenta usar o Chrome instalado
+        for chrome_path in self.chrome_paths():
+            if os.path.exists(chrome_path):
+                options.binary_location = chrome_path
+                print(f"✅ Chrome encontrado em: {chrome_path}")
+                break
+        else:
+            print("⚠️ Chrome não encontrado nos caminhos padrão")
+        return options
+
+    def create_driver(self):
+        print("📥 Baixando ChromeDriver...")
+        try:
+            driver_path = ChromeDriverManager().install()
+            print(f"✅ ChromeDriver baixado: {driver_path}")
+        except Exception as e:
+            print(f"⚠️ Erro ao baixar ChromeDriver: {e}")
+            print("🔄 Tentando método alternativo...")
+            driver_path = ChromeDriverManager(version="latest").install()
+        print("🚀 Iniciando Chrome...")
+        return webdriver.Chrome(service=Service(driver_path), options=self.chrome_options())
+
+
+class HeadlessProfile(DriverProfile):
+    """
+    Chrome sem janela e enxuto, para produção em servidores Linux.
+
+    Não carrega imagens nem mídia (o QR code é um canvas e continua
+    aparecendo), desliga serviços de fundo do Chrome e usa uma janela menor.
+    O user agent é o de um Chrome comum, já que o WhatsApp Web recusa o
+    "HeadlessChrome".
+    """
+
+    name = 'headless'
+    description = "Chrome sem janela, sem imagens e com sessão salva (produção em Linux)"
+    window_size = "1280,800"
+    headless = True
+    user_agent = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    tips = [
+        "Instale o Chrome/Chromium no servidor",
+        "Na primeira execução, escaneie o QR code salvo em whatsapp_page.png",
+        "Se a sessão expirar, apague o diretório da sessão e escaneie de novo",
+    ]
+
+    def chrome_options(self):
+        options = super().chrome_options()
+        options.add_argument("--headless=new")
+        options.add_argument(f"--user-agent={self.user_agent}")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        for flag in ("--disable-extensions", "--disable-background-networking", "--disable-sync",
+                     "--disable-default-apps", "--disable-component-update", "--disable-notifications",
+                     "--no-first-run", "--no-default-browser-check"):
+            options.add_argument(flag)
+        options.add_argument("--disable-features=Translate,MediaRouter,OptimizationHints")
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.media_stream': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+        return options
+
+
+class RemoteProfile(DriverProfile):
+    """Chrome num Selenium Grid/standalone em `DRIVER_CONFIG['remote_url']`"""
+
+    name = 'remote'
+    description = "Chrome remoto (Selenium Grid)"
+    persistent_session = False  # O diretório da sessão ficaria na máquina remota
+    tips = [
+        "Verifique se o Selenium Grid está no ar em DRIVER_CONFIG['remote_url']",
+    ]
+
+    def __init__(self, remote_url=None, session_dir=None):
+        super().__init__(session_dir)
+        self.remote_url = remote_url or DRIVER_CONFIG['remote_url']
+
+    def create_driver(self):
+        print(f"🌐 Conectando ao Chrome remoto em {self.remote_url}...")
+        return webdriver.Remote(command_executor=self.remote_url, options=self.chrome_options())
+
+
+DRIVER_PROFILES = {
+    profile.name: profile
+    for profile in (DesktopProfile, WindowsProfile, HeadlessProfile, RemoteProfile)
+}
+
+
+def browser_rss(driver):
+    """
+    Memória residente (MB) do chromedriver e dos processos do Chrome abertos
+    por ele; None quando não há como medir (driver remoto, sem /proc e sem psutil).
+    """
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is None:
+        return None
+    try:
+        import psutil
+    except ImportError:
+        return _proc_tree_rss(process.pid)
+    try:
+        root = psutil.Process(process.pid)
+        tree = [root] + root.children(recursive=True)
+        return sum(proc.memory_info().rss for proc in tree) / 1024 / 1024
+    except psutil.Error:
+        return None
+
+
+def _proc_tree_rss(root_pid):
+    """Soma o RSS da árvore de processos lendo /proc (Linux)"""
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                # O nome do processo (entre parênteses) pode conter espaços
+                fields = f.read().rsplit(b')', 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            continue
+        pending.extend(children.get(pid, []))
+    return total / 1024 / 1024
+
+
+def get_driver_profile(name=None, **kwargs):
+    """Cria o perfil pelo nome ('auto' escolhe windows ou desktop pelo sistema)"""
+    name = name or DRIVER_CONFIG['profile']
+    if name == 'auto':
+        name = 'windows' if os.name == 'nt' else 'desktop'
+    if name not in DRIVER_PROFILES:
+        raise ValueError(f"Perfil de driver desconhecido: {name} "
+                         f"(disponíveis: {', '.join(DRIVER_PROFILES)})")
+    return DRIVER_PROFILES[name](**kwargs)
@@ -0,0 +1,267 @@
+"""
+Teste de carga do motor de pedidos sem navegador: clientes simulados com o
+cardápio ou conversas gravadas reproduzidas N vezes mais rápido
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from bot_transports import Transport
+from whatsapp_sender import percentiles
+
+STAGES = {
+    'queue': "Espera na fila do cliente",
+    'process': "process_message",
+    'reply': "Chegada -> resposta enviada",
+    'order_write': "Pedido confirmado -> gravado",
+}
+
+
+def synthetic_traffic(customers=1000, rate=0, seed=None, menu=None):
+    """
+    Conversas simuladas: cada cliente manda de 1 a 4 mensagens com números
+    do cardápio (às vezes com quantidade, "2x3") e termina com ENVIAR.
+
+    As conversas são intercaladas, então todos os clientes ficam com pedido
+    em andamento ao mesmo tempo. Retorna [(instante, telefone, mensagem)],
+    com `rate` mensagens por segundo (0 = todas de uma vez).
+    """
+    if menu is None:
+        from menu_index import get_menu_catalog
+        menu = get_menu_catalog()
+    numbers = [item.numero for item in menu]
+    rng = random.Random(seed)
+
+    conversations = []
+    for customer in range(customers):
+        phone = f"5511{900000000 + customer}"
+        messages = []
+        for _ in range(rng.randint(1, 4)):
+            picks = []
+            for number in rng.sample(numbers, rng.randint(1, min(3, len(numbers)))):
+                quantity = rng.choice((1, 1, 1, 2, 3))
+                picks.append(f"{quantity}x{number}" if quantity > 1 else str(number))
+            messages.append(", ".join(picks))
+        messages.append("ENVIAR")
+        conversations.append((phone, messages))
+
+    traffic = []
+    step = 0
+    while conversations:
+        remaining = []
+        for phone, messages in conversations:
+            traffic.append((step / rate if rate else 0.0, phone, messages[0]))
+            step += 1
+            if len(messages) > 1:
+                remaining.append((phone, messages[1:]))
+        conversations = remaining
+    return traffic
+
+
+def recorded_traffic(path, speed=1.0):
+    """
+    Conversas gravadas em JSONL ({"time", "phone", "message"}, como as de
+    `python whatsapp_bot.py --record`), com os intervalos divididos por `speed`
+    (0 = todas de uma vez).
+    """
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            moment = entry['time']
+            if isinstance(moment, str):
+                moment = datetime.fromisoformat(moment).timestamp()
+            entries.append((moment, str(entry['phone']), entry['message']))
+    entries.sort(key=lambda entry: entry[0])
+    if not entries:
+        return []
+    first = entries[0][0]
+    return [((moment - first) / speed if speed else 0.0, phone, message)
+            for moment, phone, message in entries]
+
+
+class LoadTransport(Transport):
+    """
+    Entrega o tráfego nos instantes programados e mede cada etapa.
+
+    Cada telefone é atendido em ordem pelo motor de conversas, então os
+    instantes de chegada ficam numa fila por telefone e cada resposta (ou
+    início de processamento) corresponde à mais antiga ainda pendente.
+    """
+
+    def __init__(self, traffic):
+        self.traffic = traffic
+        self.samples = {stage: [] for stage in STAGES}
+        self.replies = 0
+        self._arrived = {}  # telefone -> chegadas ainda sem processamento
+        self._answered = {}  # telefone -> chegadas ainda sem resposta
+        self._lock = threading.Lock()
+        self.started = None
+
+    def receive(self):
+        self.started = time.perf_counter()
+        for offset, phone, message in self.traffic:
+            delay = self.started + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.perf_counter()
+            with self._lock:
+                self._arrived.setdefault(phone, deque()).append(now)
+                self._answered.setdefault(phone, deque()).append(now)
+            yield phone, message
+
+    def processing(self, phone):
+        """Chamado ao começar a processar a próxima mensagem do telefone"""
+        now = time.perf_counter()
+        with self._lock:
+            self.samples['queue'].append(now - self._arrived[phone].popleft())
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def send(self, phone, message):
+        now = time.perf_counter()
+        with self._lock:
+            self.samples['reply'].append(now - self._answered[phone].popleft())
+            self.replies += 1
+        return True
+
+
+def _temp_storage(kind, tmp_dir):
+    """Armazenamento de pedidos descartável, do mesmo tipo do configurado"""
+    from order_storage import create_storage
+
+    options = {
+        'json': {'orders_file': os.path.join(tmp_dir, 'orders.json')},
+        'log': {'orders_file': os.path.join(tmp_dir, 'orders.json'),
+                'log_file': os.path.join(tmp_dir, 'orders.log.jsonl')},
+        'partitioned': {'partition_dir': os.path.join(tmp_dir, 'orders_partitions')},
+        'sqlite': {'db_file': os.path.join(tmp_dir, 'orders.db')},
+    }
+    return create_storage(kind, **options[kind])
+
+
+def run_load(traffic, storage=None, verbose=False):
+    """
+    Passa o tráfego pelo WhatsAppBot e pelo motor de conversas, gravando os
+    pedidos num armazenamento temporário. Retorna o relatório (ver `report`).
+    """
+    from bot_engine import ConversationEngine
+    from config import ORDERS_CONFIG
+    from conversation_store import MemoryConversationStore
+    from order_manager import OrderManager
+    from order_writer import OrderWriteQueue
+    from whatsapp_bot import WhatsAppBot
+
+    transport = LoadTransport(traffic)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = OrderManager(storage=_temp_storage(storage or ORDERS_CONFIG['storage'], tmp_dir))
+        bot = WhatsAppBot(active_orders=MemoryConversationStore(snapshot_file=''))
+        bot.order_queue = OrderWriteQueue(manager=manager)
+
+        process_message = bot.process_message
+
+        def timed_process(phone, message):
+            transport.processing(phone)
+            started = time.perf_counter()
+            try:
+                return process_message(phone, message)
+            finally:
+                transport.record('process', time.perf_counter() - started)
+
+        submit = bot.order_queue.submit
+
+        def timed_submit(*args):
+            started = time.perf_counter()
+            future = submit(*args)
+            future.add_done_callback(
+                lambda _: transport.record('order_write', time.perf_counter() - started)
+            )
+            return future
+
+        bot.process_message = timed_process
+        bot.order_queue.submit = timed_submit
+
+        with contextlib.ExitStack() as stack:
+            if not verbose:
+                # As mensagens de cada pedido vão para o terminal no bot real; aqui só atrapalham a medida
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+            ConversationEngine(bot, transport).run()
+            replied = time.perf_counter()
+            bot.order_queue.close()
+        finished = time.perf_counter()
+        orders = manager.count_orders()
+        manager.storage.close()
+
+    return report(transport, replied - transport.started, finished - transport.started, orders)
+
+
+def report(transport, reply_seconds, total_seconds, orders):
+    """Vazão e percentis (ms) por etapa"""
+    stages = {}
+    for stage, samples in transport.samples.items():
+        stats = {name: value * 1000 for name, value in percentiles(samples).items()}
+        stats['count'] = len(samples)
+        stages[stage] = stats
+    return {
+        'messages': len(transport.traffic),
+        'replies': transport.replies,
+        'orders': orders,
+        'seconds': total_seconds,
+        'messages_per_second': transport.replies / reply_seconds if reply_seconds else 0.0,
+        'orders_per_second': orders / total_seconds if total_seconds else 0.0,
+        'stages': stages,
+    }
+
+
+def print_report(result):
+    print(f"📈 {result['replies']}/{result['messages']} mensagens respondidas e {result['orders']} pedidos "
+          f"gravados em {result['seconds']:.2f}s")
+    print(f"   {result['messages_per_second']:.0f} mensagens/s | {result['orders_per_second']:.0f} pedidos/s")
+    for stage, stats in result['stages'].items():
+        print(f"   {STAGES[stage]:<30} n={stats['count']:<7} p50 {stats['p50']:8.2f} ms | "
+              f"p95 {stats['p95']:8.2f} ms | p99 {stats['p99']:8.2f} ms")
+
+
+def main():
+    """Linha de comando: python load_test.py synthetic|replay ..."""
+    parser = argparse.ArgumentParser(description="Teste de carga do bot de pedidos (sem navegador)")
+    parser.add_argument('--storage', choices=['json', 'log', 'partitioned', 'sqlite'], default=None,
+                        help="backend dos pedidos (padrão: ORDERS_CONFIG['storage'], em pasta temporária)")
+    parser.add_argument('--verbose', action='store_true', help="mostra as mensagens do bot")
+    modes = parser.add_subparsers(dest='mode', required=True)
+
+    synthetic = modes.add_parser('synthetic', help="clientes simulados com o cardápio")
+    synthetic.add_argument('--customers', type=int, default=1000)
+    synthetic.add_argument('--rate', type=float, default=0,
+                           help="mensagens por segundo (padrão: todas de uma vez)")
+    synthetic.add_argument('--seed', type=int, default=None)
+
+    replay = modes.add_parser('replay', help="conversas gravadas (python whatsapp_bot.py --record)")
+    replay.add_argument('file')
+    replay.add_argument('--speed', type=float, default=1.0,
+                        help="fator de aceleração (10 = 10x mais rápido; 0 = sem pausas)")
+    args = parser.parse_args()
+
+    if args.mode == 'synthetic':
+        traffic = synthetic_traffic(args.customers, args.rate, args.seed)
+        print(f"🧪 {args.customers} clientes simulados, {len(traffic)} mensagens")
+    else:
+        traffic = recorded_traffic(args.file, args.speed)
+        print(f"🧪 Reproduzindo {len(traffic)} mensagens de {args.file} ({args.speed:g}x)")
+    print_report(run_load(traffic, storage=args.storage, verbose=args.verbose))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Índice compilado do cardápio (número do item -> registro imutável) e catálogo
+compartilhado que acompanha as alterações do cardapio.csv
+"""
+
+import csv
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+
+from config import MENU_CONFIG
+
+
+class MenuItem:
+    """Item do cardápio, imutável, com os textos de exibição já formatados"""
+
+    __slots__ = ('numero', 'nome', 'descricao', 'preco', 'tempo_estimado_minutos', 'line')
+
+    def __init__(self, numero, nome, descricao, preco, tempo_estimado_minutos):
+        values = {
+            'numero': numero,
+            'nome': nome,
+            'descricao': descricao,
+            'preco': preco,
+            'tempo_estimado_minutos': tempo_estimado_minutos,
+            # Linha usada nos resumos e confirmações de pedido
+            'line': f"• #{numero} - {nome} - R$ {preco:.2f}\n"
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MenuItem é imutável")
+
+    def __getitem__(self, key):
+        """Permite item['preco'], como nas linhas do DataFrame"""
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"MenuItem({self.numero}, {self.nome!r}, {self.preco:.2f})"
+
+    def to_dict(self):
+        """Cópia do item no formato gravado nos pedidos"""
+        return {
+            'numero': self.numero,
+            'nome': self.nome,
+            'descricao': self.descricao,
+            'preco': self.preco,
+            'tempo_estimado_minutos': self.tempo_estimado_minutos
+        }
+
+
+class MenuIndex:
+    """
+    Cardápio indexado por número do item.
+
+    Montado uma vez a partir do cardapio.csv; a busca por número é um acesso
+    a dicionário, sem máscaras de pandas no caminho de cada mensagem.
+    """
+
+    def __init__(self, items):
+        self._items = {item.numero: item for item in items}
+
+    @classmethod
+    def from_csv(cls, path='cardapio.csv'):
+        """Lê o cardápio do CSV"""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return cls.from_rows(csv.DictReader(f))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Monta o índice a partir das linhas do CSV (dicionários de texto)"""
+        return cls([
+            MenuItem(
+                int(row['numero']),
+                row['nome'],
+                row['descricao'],
+                float(row['preco']),
+                int(row['tempo_estimado_minutos'])
+            )
+            for row in rows
+        ])
+
+    def get(self, number):
+        """Busca um item pelo número (None se não existir)"""
+        return self._items.get(number)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __contains__(self, number):
+        return number in self._items
+
+    def format_items(self, items):
+        """Linhas '• #n - nome - R$ preço' dos itens de um pedido"""
+        lines = []
+        for item in items:
+            record = self._items.get(item['numero'])
+            if record is not None and record.nome == item['nome'] and record.preco == item['preco']:
+                lines.append(record.line)
+            else:
+                # Item gravado com dados diferentes do cardápio atual
+                lines.append(f"• #{item['numero']} - {item['nome']} - R$ {item['preco']:.2f}\n")
+        return "".join(lines)
+
+    def to_dataframe(self):
+        """DataFrame no formato do cardapio.csv"""
+        import pandas as pd
+
+        return pd.DataFrame([item.to_dict() for item in self])
+
+
+class MenuCatalog:
+    """
+    Cardápio compartilhado que se recarrega quando o arquivo muda.
+
+    No máximo a cada `check_interval` segundos um acesso confere mtime e
+    tamanho do arquivo; se mudaram, o conteúdo é lido e só é interpretado de
+    novo se o hash for diferente. O novo índice entra no lugar do antigo numa
+    única atribuição e `version` é incrementada, servindo de chave para quem
+    guarda dados derivados do cardápio. Um arquivo inválido (ex.: salvo pela
+    metade) é ignorado e o cardápio anterior continua valendo.
+    """
+
+    def __init__(self, path=None, check_interval=None):
+        self.path = path or MENU_CONFIG['menu_file']
+        self.check_interval = MENU_CONFIG['reload_check_seconds'] if check_interval is None else check_interval
+        self.version = 0
+        self._index = None
+        self._stamp = None
+        self._hash = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Relê o arquivo se ele mudou; retorna True se o cardápio foi trocado"""
+        with self._lock:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp == self._stamp:
+                return False
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            self._stamp = stamp
+            digest = hashlib.sha1(data).hexdigest()
+            if digest == self._hash:
+                return False
+
+            try:
+                index = MenuIndex.from_rows(csv.DictReader(io.StringIO(data.decode('utf-8'))))
+                if not len(index):
+                    raise ValueError("nenhum item no arquivo")
+            except (ValueError, KeyError, TypeError) as e:
+                if self._index is None:
+                    raise
+                print(f"❌ Cardápio inválido, mantendo a versão {self.version}: {e}")
+                return False
+
+            self._index = index
+            self._hash = digest
+            self.version += 1
+            if self.version > 1:
+                print(f"✅ Cardápio recarregado (versão {self.version}, {len(index)} itens)")
+            return True
+
+    def current(self):
+        """Índice vigente, verificando alterações do arquivo no máximo a cada intervalo"""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            try:
+                self.reload()
+            except OSError:
+                # Arquivo momentaneamente ausente durante a gravação pelo editor
+                pass
+        return self._index
+
+    def get(self, number):
+        """Busca um item pelo número no cardápio vigente"""
+        return self.current().get(number)
+
+    def format_items(self, items):
+        """Linhas dos itens de um pedido, com o cardápio vigente"""
+        return self.current().format_items(items)
+
+    def to_dataframe(self):
+        """DataFrame do cardápio vigente"""
+        return self.current().to_dataframe()
+
+    def __len__(self):
+        return len(self.current())
+
+    def __iter__(self):
+        return iter(self.current())
+
+    def __contains__(self, number):
+        return number in self.current()
+
+
+_catalogs = {}
+
+
+def get_menu_catalog(path=None):
+    """Catálogo do cardápio compartilhado por todos os módulos do processo"""
+    path = path or MENU_CONFIG['menu_file']
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        catalog = _catalogs[path] = MenuCatalog(path)
+    return catalog
+
+
+def benchmark(messages=20000):
+    """Compara a busca com máscara do pandas e o índice compilado por mensagem"""
+    import pandas as pd
+
+    menu_df = pd.read_csv('cardapio.csv')
+    index = MenuIndex.from_csv()
+    numbers = [[(i * 7 + j) % (len(index) + 2) + 1 for j in range(3)] for i in range(messages)]
+
+    def with_pandas(message_numbers):
+        items = []
+        for number in message_numbers:
+            item = menu_df[menu_df['numero'] == number]
+            if not item.empty:
+                items.append(item.iloc[0].to_dict())
+        summary = "".join(f"• #{item['numero']} - {item['nome']} - R$ {item['preco']:.2f}\n" for item in items)
+        return items, summary
+
+    def with_index(message_numbers):
+        items = []
+        for number in message_numbers:
+            item = index.get(number)
+            if item is not None:
+                items.append(item.to_dict())
+        return items, index.format_items(items)
+
+    for name, handler, count in (("pandas", with_pandas, min(messages, 2000)), ("índice", with_index, messages)):
+        started = time.perf_counter()
+        for message_numbers in numbers[:count]:
+            handler(message_numbers)
+        elapsed = time.perf_counter() - started
+        print(f"  {name:7s} {elapsed / count * 1e6:9.1f} µs por mensagem ({count} mensagens, 3 itens cada)")
+
+
+if __name__ == "__main__":
+    print("📋 Busca de itens do cardápio:")
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,242 @@
+"""
+Backups periódicos dos pedidos conforme BACKUP_CONFIG (completos e incrementais)
+"""
+
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config import BACKUP_CONFIG
+from order_storage import create_storage, fsync_dir, LogOrderStorage
+
+
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+
+class OrderBackup:
+    """
+    Gera backups comprimidos dos pedidos sem bloquear a criação de pedidos.
+
+    O primeiro backup (e depois a cada `full_every`) é completo; os demais são
+    incrementais e guardam apenas os pedidos criados, alterados ou removidos
+    desde o backup anterior. A restauração aplica o último backup completo e os
+    incrementais seguintes, em ordem. Backups mais antigos que
+    `backup_retention_days` são apagados, sem quebrar a cadeia de restauração.
+    """
+
+    def __init__(self, backup_folder=None, retention_days=None, full_every=None, storage_factory=None):
+        self.backup_folder = backup_folder or BACKUP_CONFIG['backup_folder']
+        self.retention_days = retention_days or BACKUP_CONFIG['backup_retention_days']
+        self.full_every = full_every or BACKUP_CONFIG['full_backup_every']
+        self.storage_factory = storage_factory or create_storage
+        self._last = None  # {id: pedido} no momento do último backup
+        self._since_full = 0
+
+    def _path(self, kind, stamp):
+        extension = 'json.gz' if kind == 'full' else 'jsonl.gz'
+        return os.path.join(self.backup_folder, f"orders-{kind}-{stamp}.{extension}")
+
+    def list_backups(self):
+        """Backups existentes como (timestamp, tipo, caminho), do mais antigo ao mais novo"""
+        if not os.path.isdir(self.backup_folder):
+            return []
+        backups = []
+        for name in os.listdir(self.backup_folder):
+            parts = name.split('.')[0].split('-', 2)
+            if name.startswith('orders-') and name.endswith('.gz') and len(parts) == 3:
+                backups.append((parts[2], parts[1], os.path.join(self.backup_folder, name)))
+        return sorted(backups)
+
+    def _read_orders(self):
+        """Lê o estado atual dos pedidos direto do disco, sem segurar a trava na leitura"""
+        storage = self.storage_factory()
+        try:
+            return storage.read_orders()
+        finally:
+            storage.close()
+
+    def _write_gzip(self, path, lines):
+        """Grava as linhas num arquivo gzip de forma atômica"""
+        os.makedirs(self.backup_folder, exist_ok=True)
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+                for line in lines:
+                    f.write(line.encode('utf-8'))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_file, path)
+        fsync_dir(self.backup_folder)
+
+    def backup_now(self, orders=None):
+        """Gera um backup (completo ou incremental) e aplica a retenção"""
+        orders = self._read_orders() if orders is None else orders
+        current = {order['id']: order for order in orders}
+        stamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+
+        if self._last is None or self._since_full >= self.full_every:
+            path = self._path('full', stamp)
+            self._write_gzip(path, [json.dumps(orders, ensure_ascii=False, separators=(',', ':'))])
+            self._since_full = 0
+        else:
+            changed = [order for order_id, order in current.items() if self._last.get(order_id) != order]
+            deleted = [order_id for order_id in self._last if order_id not in current]
+            records = [{'op': 'upsert', 'order': order} for order in changed]
+            if deleted:
+                records.append({'op': 'delete', 'ids': deleted})
+            path = self._path('incr', stamp)
+            self._write_gzip(path, (json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+            self._since_full += 1
+
+        self._last = current
+        self.apply_retention()
+        print(f"✅ Backup gravado em {path}")
+        return path
+
+    def apply_retention(self):
+        """Apaga backups fora da retenção, mantendo o completo que os mais novos usam"""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime(TIMESTAMP_FORMAT)
+        backups = self.list_backups()
+        old_fulls = [stamp for stamp, kind, _ in backups if kind == 'full' and stamp <= cutoff]
+        if not old_fulls:
+            return 0
+        keep_from = old_fulls[-1]
+        removed = 0
+        for stamp, _, path in backups:
+            if stamp < keep_from:
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def load_backup(self, until=None):
+        """Reconstrói os pedidos a partir do último completo e dos incrementais seguintes"""
+        backups = [b for b in self.list_backups() if until is None or b[0] <= until]
+        fulls = [i for i, (_, kind, _) in enumerate(backups) if kind == 'full']
+        if not fulls:
+            return None
+
+        with gzip.open(backups[fulls[-1]][2], 'rt', encoding='utf-8') as f:
+            orders = {order['id']: order for order in json.load(f)}
+        for _, _, path in backups[fulls[-1] + 1:]:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record['op'] == 'upsert':
+                        orders[record['order']['id']] = record['order']
+                    else:
+                        for order_id in record['ids']:
+                            orders.pop(order_id, None)
+        return sorted(orders.values(), key=lambda order: order['id'])
+
+    def restore(self, until=None, storage=None):
+        """Restaura os pedidos no backend configurado (ou no informado)"""
+        orders = self.load_backup(until)
+        if orders is None:
+            print("❌ Nenhum backup completo encontrado")
+            return None
+        storage = storage or self.storage_factory()
+        storage.load()
+        storage.replace_all(orders)
+        storage.close()
+        print(f"✅ {len(orders)} pedidos restaurados")
+        return len(orders)
+
+    def run(self, interval_hours=None, stop_event=None):
+        """Executa backups periódicos até `stop_event` ser sinalizado"""
+        interval = (interval_hours or BACKUP_CONFIG['backup_interval_hours']) * 3600
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.backup_now()
+            except Exception as e:
+                print(f"❌ Erro ao gerar backup: {e}")
+            stop_event.wait(interval)
+
+    def start(self, interval_hours=None):
+        """Inicia o agendador numa thread em segundo plano e retorna o evento de parada"""
+        stop_event = threading.Event()
+        thread = threading.Thread(target=self.run, args=(interval_hours, stop_event), daemon=True)
+        thread.start()
+        return stop_event
+
+
+def benchmark_restore(count=1_000_000):
+    """Mede backup e restauração de `count` pedidos sintéticos"""
+    import pandas as pd
+
+    menu = pd.read_csv('cardapio.csv').to_dict('records')
+    start_date = datetime.now() - timedelta(days=365)
+    orders = []
+    for order_id in range(1, count + 1):
+        items = random.sample(menu, random.randint(1, 4))
+        created_at = start_date + timedelta(seconds=order_id * 365 * 86400 // count)
+        orders.append({
+            'id': order_id,
+            'phone': f"119{random.randint(0, 99999999):08d}",
+            'items': [{k: item[k] for k in ('numero', 'nome', 'preco', 'tempo_estimado_minutos')} for item in items],
+            'total': round(sum(item['preco'] for item in items), 2),
+            'estimated_time': max(item['tempo_estimado_minutos'] for item in items),
+            'status': random.choice(['pending', 'preparing', 'completed', 'cancelled']),
+            'created_at': created_at.isoformat(),
+            'estimated_delivery': created_at.isoformat(),
+            'address': None,
+            'notes': None
+        })
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        backup = OrderBackup(backup_folder=os.path.join(tmp_dir, 'backups'), full_every=10**9)
+
+        started = time.perf_counter()
+        path = backup.backup_now(orders)
+        backup_seconds = time.perf_counter() - started
+        size_mb = os.path.getsize(path) / 1e6
+
+        for index in random.sample(range(count), max(1, count // 100)):
+            orders[index] = dict(orders[index], status='completed')
+        started = time.perf_counter()
+        incremental_path = backup.backup_now(orders)
+        incremental_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        storage = LogOrderStorage(orders_file=os.path.join(tmp_dir, 'orders.json'),
+                                  log_file=os.path.join(tmp_dir, 'orders.log.jsonl'))
+        restored = backup.restore(storage=storage)
+        restore_seconds = time.perf_counter() - started
+
+        print(f"📦 {count} pedidos")
+        print(f"  Backup completo:    {backup_seconds:.1f}s ({size_mb:.1f} MB)")
+        print(f"  Backup incremental: {incremental_seconds:.1f}s ({os.path.getsize(incremental_path) / 1e6:.2f} MB)")
+        print(f"  Restauração:        {restore_seconds:.1f}s ({restored} pedidos)")
+
+
+if __name__ == "__main__":
+    option = sys.argv[1].lower() if len(sys.argv) > 1 else "help"
+    backup = OrderBackup()
+
+    if option == "run":
+        if not BACKUP_CONFIG['auto_backup']:
+            print("⚠️ Backup automático desativado em BACKUP_CONFIG")
+        else:
+            print(f"💾 Backup a cada {BACKUP_CONFIG['backup_interval_hours']}h em {backup.backup_folder}/")
+            try:
+                backup.run()
+            except KeyboardInterrupt:
+                print("\n✅ Backups parados!")
+    elif option == "now":
+        backup.backup_now()
+    elif option == "restore":
+        backup.restore(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif option == "benchmark":
+        benchmark_restore(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    else:
+        print("💾 Backup de pedidos - Opções:")
+        print("  python order_backup.py run                      # Backups periódicos (BACKUP_CONFIG)")
+        print("  python order_backup.py now                      # Backup imediato")
+        print("  python order_backup.py restore [AAAAMMDD-HHMMSS] # Restaura o último backup (ou até a data)")
+        print("  python order_backup.py benchmark [pedidos]      # Mede backup/restauração")
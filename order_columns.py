@@ -0,0 +1,265 @@
+"""
+Visão colunar (NumPy/pandas) dos pedidos para as análises do dashboard
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import STATUS_PEDIDOS
+
+
+class _Categories:
+    """Dicionário valor -> código, como as categorias de um pd.Categorical"""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        """Código da categoria, criando-a se for nova"""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def categorical(self, codes):
+        """Monta um pd.Categorical a partir dos códigos"""
+        return pd.Categorical.from_codes(codes, categories=self.values)
+
+
+class _ColumnBuffer:
+    """Colunas NumPy com crescimento amortizado (a capacidade dobra quando enche)"""
+
+    def __init__(self, dtypes, capacity=16):
+        self.size = 0
+        self.arrays = {name: np.empty(capacity, dtype) for name, dtype in dtypes.items()}
+
+    def append(self, row):
+        """Acrescenta uma linha e retorna sua posição"""
+        capacity = len(next(iter(self.arrays.values())))
+        if self.size == capacity:
+            for name, array in self.arrays.items():
+                grown = np.empty(capacity * 2, array.dtype)
+                grown[:capacity] = array
+                self.arrays[name] = grown
+        for name, value in row.items():
+            self.arrays[name][self.size] = value
+        self.size += 1
+        return self.size - 1
+
+    def __getitem__(self, name):
+        return self.arrays[name][:self.size]
+
+
+ORDER_DTYPES = {
+    'id': np.int64,
+    'phone': np.int32,
+    'status': np.int32,
+    'total': np.float64,
+    'created_at': 'datetime64[us]',
+    'estimated_time': np.int32,
+    'alive': np.bool_
+}
+
+ITEM_DTYPES = {
+    'row': np.int64,  # posição do pedido nas colunas de pedidos
+    'numero': np.int32,
+    'nome': np.int32,
+    'preco': np.float64,
+    'quantidade': np.int32
+}
+
+
+class OrderColumns:
+    """
+    Pedidos e itens de pedido em colunas NumPy, atualizados incrementalmente.
+
+    Novos pedidos são acrescentados ao fim das colunas, mudanças de status
+    alteram uma única posição e remoções apenas marcam a linha como morta
+    (a visão é reconstruída quando mais da metade das linhas está morta).
+    A construção é preguiçosa: nada é montado até a primeira consulta.
+    """
+
+    def __init__(self, source):
+        self._source = source  # função que retorna a lista completa de pedidos
+        self._built = False
+
+    def rebuild(self, orders=None):
+        """Reconstrói as colunas a partir da lista de pedidos"""
+        orders = self._source() if orders is None else orders
+        self.phones = _Categories()
+        self.statuses = _Categories(STATUS_PEDIDOS)
+        self.names = _Categories()
+        self._orders = _ColumnBuffer(ORDER_DTYPES, capacity=max(16, len(orders)))
+        self._items = _ColumnBuffer(ITEM_DTYPES, capacity=max(16, 4 * len(orders)))
+        self._row_of = {}
+        self._dead = 0
+        self._built = True
+        for order in orders:
+            self._append(order)
+
+    def invalidate(self):
+        """Descarta as colunas; serão reconstruídas na próxima consulta"""
+        self._built = False
+
+    def _ensure_built(self):
+        if not self._built:
+            self.rebuild()
+
+    def _append(self, order):
+        """Acrescenta um pedido e seus itens às colunas"""
+        row = self._orders.append({
+            'id': order['id'],
+            'phone': self.phones.code(order['phone']),
+            'status': self.statuses.code(order['status']),
+            'total': order['total'],
+            'created_at': np.datetime64(order['created_at'], 'us'),
+            'estimated_time': order['estimated_time'],
+            'alive': True
+        })
+        self._row_of[order['id']] = row
+        for item in order['items']:
+            self._items.append({
+                'row': row,
+                'numero': item['numero'],
+                'nome': self.names.code(item['nome']),
+                'preco': item['preco'],
+                'quantidade': item.get('quantidade', 1)
+            })
+
+    def apply(self, old_order, new_order):
+        """Listener do storage: aplica criação, alteração ou remoção"""
+        if not self._built:
+            return
+        if old_order is None:
+            self._append(new_order)
+            return
+
+        row = self._row_of.get(old_order['id'])
+        if row is None:
+            return
+        if new_order is None:
+            self._orders.arrays['alive'][row] = False
+            del self._row_of[old_order['id']]
+            self._dead += 1
+            if self._dead > self._orders.size // 2:
+                # Muitas linhas mortas: reconstrói na próxima consulta
+                self.invalidate()
+            return
+
+        self._orders.arrays['status'][row] = self.statuses.code(new_order['status'])
+        self._orders.arrays['phone'][row] = self.phones.code(new_order['phone'])
+        self._orders.arrays['total'][row] = new_order['total']
+        self._orders.arrays['estimated_time'][row] = new_order['estimated_time']
+        self._orders.arrays['created_at'][row] = np.datetime64(new_order['created_at'], 'us')
+
+    def orders_frame(self):
+        """DataFrame com um pedido por linha (status e telefone categóricos)"""
+        self._ensure_built()
+        alive = self._orders['alive']
+        return pd.DataFrame({
+            'id': self._orders['id'][alive],
+            'phone': self.phones.categorical(self._orders['phone'][alive]),
+            'status': self.statuses.categorical(self._orders['status'][alive]),
+            'total': self._orders['total'][alive],
+            'created_at': self._orders['created_at'][alive],
+            'estimated_time': self._orders['estimated_time'][alive]
+        })
+
+    def items_frame(self, start=0, stop=None, since=None, until=None):
+        """
+        DataFrame com um item de pedido por linha (colunas da exportação CSV).
+
+        `start`/`stop` recortam as posições dos itens; `since`/`until` (datas,
+        inclusivas) filtram pela data de criação do pedido.
+        """
+        self._ensure_built()
+        rows = self._items['row'][start:stop]
+        keep = self._orders['alive'][rows]
+        if since is not None:
+            keep &= self._orders['created_at'][rows] >= np.datetime64(since, 'D')
+        if until is not None:
+            keep &= self._orders['created_at'][rows] < np.datetime64(until + timedelta(days=1), 'D')
+        rows = rows[keep]
+        return pd.DataFrame({
+            'order_id': self._orders['id'][rows],
+            'phone': self.phones.categorical(self._orders['phone'][rows]),
+            'item_number': self._items['numero'][start:stop][keep],
+            'item_name': self.names.categorical(self._items['nome'][start:stop][keep]),
+            'item_price': self._items['preco'][start:stop][keep],
+            'item_quantity': self._items['quantidade'][start:stop][keep],
+            'order_total': self._orders['total'][rows],
+            'status': self.statuses.categorical(self._orders['status'][rows]),
+            'created_at': np.datetime_as_string(self._orders['created_at'][rows], unit='us'),
+            'estimated_time': self._orders['estimated_time'][rows]
+        })
+
+    def iter_items_chunks(self, chunk_size, since=None, until=None):
+        """
+        Gera blocos de até `chunk_size` itens como (DataFrame, processados, total).
+
+        Só um bloco é materializado por vez, então a memória usada não depende
+        do tamanho do histórico.
+        """
+        self._ensure_built()
+        total = self._items.size
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            yield self.items_frame(start, stop, since, until), stop, total
+
+    @staticmethod
+    def iter_stored_items_chunks(storage, chunk_size, since=None, until=None):
+        """
+        Como `iter_items_chunks`, mas lendo os pedidos do banco por faixa de
+        criação (storage.iter_between), sem montar as colunas do histórico
+        inteiro. O progresso é contado em pedidos.
+        """
+        total = storage.count_between(since, until)
+        done = 0
+        batch, items = [], 0
+        for orders in storage.iter_between(since, until, chunk_size):
+            for order in orders:
+                batch.append(order)
+                items += len(order['items'])
+                done += 1
+                if items >= chunk_size:
+                    yield OrderColumns._stored_items_frame(batch), done, total
+                    batch, items = [], 0
+        if batch or not done:
+            yield OrderColumns._stored_items_frame(batch), done, total
+
+    @staticmethod
+    def _stored_items_frame(orders):
+        """Itens de um lote de pedidos, com texto no lugar das categorias"""
+        columns = OrderColumns(None)
+        columns.rebuild(orders)
+        frame = columns.items_frame()
+        # Categorias próprias de cada lote mudariam o esquema do Parquet de um bloco para outro
+        for name in frame.select_dtypes('category'):
+            frame[name] = frame[name].astype(object)
+        return frame
+
+    def status_counts(self):
+        """Quantidade de pedidos por status"""
+        self._ensure_built()
+        alive = self._orders['alive']
+        counts = np.bincount(self._orders['status'][alive], minlength=len(self.statuses.values))
+        return {status: int(count) for status, count in zip(self.statuses.values, counts) if count}
+
+    def daily_revenue(self, days=7, end=None):
+        """Receita por dia nos últimos `days` dias (do mais antigo ao mais recente)"""
+        self._ensure_built()
+        end = end or datetime.now().date()
+        start = end - timedelta(days=days - 1)
+        alive = self._orders['alive']
+        day_offsets = (
+            self._orders['created_at'][alive].astype('datetime64[D]') - np.datetime64(start, 'D')
+        ).astype(np.int64)
+        in_range = (day_offsets >= 0) & (day_offsets < days)
+        revenue = np.bincount(day_offsets[in_range], weights=self._orders['total'][alive][in_range], minlength=days)
+        return pd.Series(revenue, index=[start + timedelta(days=i) for i in range(days)])
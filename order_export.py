@@ -0,0 +1,83 @@
+"""
+Exportação em blocos dos itens de pedidos (CSV, JSONL e Parquet)
+"""
+
+import gzip
+
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def detect_format(filename):
+    """Deduz (formato, gzip) pela extensão: .csv, .jsonl, .parquet, com .gz opcional"""
+    name = filename.lower()
+    compress = name.endswith('.gz')
+    if compress:
+        name = name[:-3]
+    fmt = name.rsplit('.', 1)[-1]
+    return (fmt if fmt in EXPORT_FORMATS else 'csv'), compress
+
+
+def _open_text(filename, compress):
+    """Abre o arquivo de saída em modo texto, com gzip se pedido"""
+    if compress:
+        return gzip.open(filename, 'wt', encoding='utf-8', newline='')
+    return open(filename, 'w', encoding='utf-8', newline='')
+
+
+def _report(progress, done, total):
+    if progress is not None:
+        progress(done, total)
+
+
+def write_csv(chunks, filename, compress=False, progress=None):
+    """Grava os blocos num CSV; o cabeçalho vem do primeiro bloco"""
+    rows = 0
+    header = True
+    with _open_text(filename, compress) as f:
+        for chunk, done, total in chunks:
+            chunk.to_csv(f, header=header, index=False)
+            header = False
+            rows += len(chunk)
+            _report(progress, done, total)
+    return rows
+
+
+def write_jsonl(chunks, filename, compress=False, progress=None):
+    """Grava os blocos como JSON Lines (um item por linha)"""
+    rows = 0
+    with _open_text(filename, compress) as f:
+        for chunk, done, total in chunks:
+            if len(chunk):
+                chunk.to_json(f, orient='records', lines=True, force_ascii=False)
+            rows += len(chunk)
+            _report(progress, done, total)
+    return rows
+
+
+def write_parquet(chunks, filename, compress=False, progress=None):
+    """Grava os blocos como row groups de um arquivo Parquet (requer pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for chunk, done, total in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(filename, table.schema, compression='gzip' if compress else 'snappy')
+            writer.write_table(table)
+            rows += len(chunk)
+            _report(progress, done, total)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+WRITERS = {
+    'csv': write_csv,
+    'jsonl': write_jsonl,
+    'parquet': write_parquet
+}
@@ -1,44 +1,120 @@
-import pandas as pd
-import json
 from datetime import datetime, timedelta
-import os
+import threading
+from functools import wraps
+from order_storage import create_storage
+from order_stats import OrderStats
+from order_columns import OrderColumns
+from order_export import WRITERS, detect_format
+from menu_index import get_menu_catalog
+from reply_templates import format_order_card
+from config import ORDERS_CONFIG
+
+def synchronized(method):
+    """Executa o método sob a trava do OrderManager"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class OrderManager:
-    def __init__(self):
-        self.orders_file = "orders.json"
-        self.orders = self.load_orders()
-        self.menu_df = self.load_menu()
+    """
+    Pedidos com agregados e visão colunar atualizados a cada alteração.
+    
+    Uma única instância pode ser compartilhada entre threads (as sessões do
+    dashboard no Streamlit): refresh(), alterações e leituras dos índices,
+    agregados e colunas passam pela mesma trava.
+    """
+    
+    def __init__(self, storage=None):
+        self._lock = threading.RLock()
+        self.storage = storage or create_storage()
+        self.orders_file = self.storage.orders_file
+        self.stats = OrderStats()
+        self.columns = OrderColumns(lambda: self.orders)
+        self.load_orders()
+        # A partir daqui os agregados são atualizados a cada alteração
+        self.storage.subscribe(self.stats.apply)
+        self.storage.subscribe(self.columns.apply)
+        self.storage.subscribe_reload(self._rebuild_views)
+        self.menu = self.load_menu()
+    
+    @property
+    def orders(self):
+        """Lista de pedidos mantida pelo backend de armazenamento"""
+        return self.storage.orders
+    
+    @synchronized
+    def count_orders(self):
+        """Quantidade de pedidos (no SQLite, sem ler os pedidos)"""
+        return self.storage.count()
+    
+    @synchronized
+    def has_orders(self):
+        """True se há algum pedido"""
+        return self.storage.exists()
     
     def load_menu(self):
-        """Carrega o cardápio do arquivo CSV"""
+        """Carrega o catálogo do cardápio (recarregado quando o CSV muda)"""
         try:
-            return pd.read_csv('cardapio.csv')
+            return get_menu_catalog()
         except FileNotFoundError:
             print("❌ Erro: Arquivo cardapio.csv não encontrado!")
             return None
     
     def load_orders(self):
-        """Carrega pedidos salvos do arquivo JSON"""
-        if os.path.exists(self.orders_file):
-            try:
-                with open(self.orders_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        """Carrega pedidos salvos pelo backend de armazenamento"""
+        orders = self.storage.load()
+        self._rebuild_views()
+        return orders
+    
+    def _rebuild_views(self):
+        """Recalcula agregados e visão colunar após uma releitura completa"""
+        self.stats.rebuild(self.orders)
+        self.columns.invalidate()
     
+    @synchronized
+    def refresh(self):
+        """Aplica os pedidos gravados por outros processos (bot, dashboard)"""
+        return self.storage.refresh()
+    
+    @synchronized
     def save_orders(self):
-        """Salva pedidos no arquivo JSON"""
-        try:
-            with open(self.orders_file, 'w', encoding='utf-8') as f:
-                json.dump(self.orders, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"❌ Erro ao salvar pedidos: {e}")
+        """Grava um snapshot completo dos pedidos"""
+        self.storage.save()
     
+    @synchronized
     def create_order(self, phone, items, total, estimated_time):
         """Cria um novo pedido"""
-        order = {
-            'id': len(self.orders) + 1,
+        # ID reservado e pedido gravado sob a mesma trava: outro processo
+        # não pode reservar o mesmo ID entre as duas etapas
+        with self.storage.locked():
+            order = self._new_order(phone, items, total, estimated_time)
+            self.storage.add(order)
+        
+        print(f"✅ Pedido #{order['id']} criado para {phone}")
+        return order
+    
+    @synchronized
+    def create_orders(self, entries):
+        """Cria vários pedidos (phone, items, total, estimated_time) com um único flush em disco"""
+        with self.storage.locked():
+            orders = []
+            for phone, items, total, estimated_time in entries:
+                order = self._new_order(phone, items, total, estimated_time)
+                self.storage.add(order)
+                orders.append(order)
+        # Group commit: um fsync (ou commit) para o lote inteiro
+        self.storage.flush()
+        
+        for order in orders:
+            print(f"✅ Pedido #{order['id']} criado para {order['phone']}")
+        return orders
+    
+    def _new_order(self, phone, items, total, estimated_time):
+        """Monta um pedido pendente com o próximo ID (chamar sob storage.locked())"""
+        return {
+            'id': self.storage.next_id(),
             'phone': phone,
             'items': items,
             'total': total,
@@ -49,158 +125,141 @@ class OrderManager:
             'address': None,
             'notes': None
         }
-        
-        self.orders.append(order)
-        self.save_orders()
-        
-        print(f"✅ Pedido #{order['id']} criado para {phone}")
-        return order
     
+    @synchronized
     def get_order(self, order_id):
         """Busca um pedido pelo ID"""
-        for order in self.orders:
-            if order['id'] == order_id:
-                return order
-        return None
+        return self.storage.get(order_id)
     
+    @synchronized
     def update_order_status(self, order_id, status):
         """Atualiza o status de um pedido"""
-        order = self.get_order(order_id)
-        if order:
-            order['status'] = status
-            self.save_orders()
-            print(f"✅ Status do pedido #{order_id} atualizado para: {status}")
-            return True
+        with self.storage.locked():
+            order = self.get_order(order_id)
+            if order:
+                self.storage.update(order_id, {'status': status})
+                print(f"✅ Status do pedido #{order_id} atualizado para: {status}")
+                return True
         return False
     
+    @synchronized
     def get_pending_orders(self):
         """Retorna todos os pedidos pendentes"""
-        return [order for order in self.orders if order['status'] == 'pending']
+        return self.storage.find_by_status('pending')
     
+    @synchronized
     def get_orders_by_phone(self, phone):
         """Retorna todos os pedidos de um telefone específico"""
-        return [order for order in self.orders if order['phone'] == phone]
+        return self.storage.find_by_phone(phone)
+    
+    @synchronized
+    def get_orders_by_status(self, status):
+        """Retorna todos os pedidos com um status específico"""
+        return self.storage.find_by_status(status)
+    
+    @synchronized
+    def get_orders_by_date(self, day):
+        """Retorna todos os pedidos criados numa data"""
+        return self.storage.find_by_date(day)
+    
+    @synchronized
+    def get_orders_between(self, since, until):
+        """Retorna todos os pedidos criados entre duas datas (inclusivas)"""
+        return self.storage.find_between(since, until)
+    
+    def get_recent_orders(self, days=7):
+        """Retorna os pedidos dos últimos X dias (incluindo hoje)"""
+        today = datetime.now().date()
+        return self.get_orders_between(today - timedelta(days=days - 1), today)
     
     def get_today_orders(self):
         """Retorna todos os pedidos de hoje"""
-        today = datetime.now().date()
-        today_orders = []
-        
-        for order in self.orders:
-            order_date = datetime.fromisoformat(order['created_at']).date()
-            if order_date == today:
-                today_orders.append(order)
-        
-        return today_orders
+        return self.get_orders_by_date(datetime.now().date())
     
+    @synchronized
     def get_order_summary(self):
         """Retorna um resumo dos pedidos"""
-        total_orders = len(self.orders)
-        pending_orders = len(self.get_pending_orders())
-        today_orders = len(self.get_today_orders())
-        
-        total_revenue = sum(order['total'] for order in self.orders)
-        today_revenue = sum(order['total'] for order in self.get_today_orders())
-        
-        return {
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'today_orders': today_orders,
-            'total_revenue': total_revenue,
-            'today_revenue': today_revenue
-        }
+        return self.stats.summary()
     
     def format_order_for_display(self, order):
         """Formata um pedido para exibição"""
-        items_text = ""
-        for item in order['items']:
-            items_text += f"• #{item['numero']} - {item['nome']} - R$ {item['preco']:.2f}\n"
-        
-        created_time = datetime.fromisoformat(order['created_at']).strftime("%d/%m/%Y %H:%M")
-        estimated_delivery = datetime.fromisoformat(order['estimated_delivery']).strftime("%d/%m/%Y %H:%M")
-        
-        return f"""
-🍽️ **Pedido #{order['id']}**
-📱 **Telefone:** {order['phone']}
-🕒 **Criado em:** {created_time}
-⏱️ **Tempo estimado:** {order['estimated_time']} min
-🚚 **Entrega estimada:** {estimated_delivery}
-📊 **Status:** {order['status'].upper()}
-
-**Itens:**
-{items_text}
-💰 **Total: R$ {order['total']:.2f}**
-"""
+        return format_order_card(order)
     
-    def export_orders_to_csv(self, filename="orders_export.csv"):
+    def export_orders_to_csv(self, filename="orders_export.csv", **kwargs):
         """Exporta todos os pedidos para CSV"""
-        if not self.orders:
+        return self.export_orders(filename, fmt='csv', **kwargs)
+    
+    @synchronized
+    def export_orders(self, filename, fmt=None, compress=None, since=None, until=None,
+                      chunk_size=None, progress=None):
+        """
+        Exporta os itens dos pedidos em blocos de tamanho fixo.
+        
+        fmt: 'csv', 'jsonl' ou 'parquet' (deduzido da extensão se omitido)
+        compress: gzip (padrão: se o nome termina em .gz)
+        since/until: datas inclusivas para filtrar pela criação do pedido
+        progress: callback(processados, total) chamado a cada bloco
+        """
+        if not self.has_orders():
             print("❌ Nenhum pedido para exportar")
             return False
         
+        detected_fmt, detected_compress = detect_format(filename)
+        fmt = fmt or detected_fmt
+        compress = detected_compress if compress is None else compress
+        chunk_size = chunk_size or ORDERS_CONFIG['export_chunk_size']
+        
         try:
-            # Prepara dados para exportação
-            export_data = []
-            for order in self.orders:
-                for item in order['items']:
-                    export_data.append({
-                        'order_id': order['id'],
-                        'phone': order['phone'],
-                        'item_number': item['numero'],
-                        'item_name': item['nome'],
-                        'item_price': item['preco'],
-                        'order_total': order['total'],
-                        'status': order['status'],
-                        'created_at': order['created_at'],
-                        'estimated_time': order['estimated_time']
-                    })
-            
-            df = pd.DataFrame(export_data)
-            df.to_csv(filename, index=False, encoding='utf-8')
-            print(f"✅ Pedidos exportados para {filename}")
+            if self.storage.in_memory:
+                chunks = self.columns.iter_items_chunks(chunk_size, since, until)
+            else:
+                # No SQLite, lê o banco em blocos em vez de carregar o histórico para as colunas
+                chunks = OrderColumns.iter_stored_items_chunks(self.storage, chunk_size, since, until)
+            rows = WRITERS[fmt](chunks, filename, compress, progress)
+            print(f"✅ {rows} itens de pedidos exportados para {filename}")
             return True
             
         except Exception as e:
             print(f"❌ Erro ao exportar pedidos: {e}")
             return False
     
+    @synchronized
+    def get_orders_frame(self):
+        """Retorna os pedidos como DataFrame (um pedido por linha)"""
+        return self.columns.orders_frame()
+    
+    @synchronized
+    def get_items_frame(self):
+        """Retorna os itens de todos os pedidos como DataFrame (um item por linha)"""
+        return self.columns.items_frame()
+    
+    @synchronized
+    def get_status_counts(self):
+        """Retorna a quantidade de pedidos por status"""
+        return self.columns.status_counts()
+    
+    @synchronized
+    def get_daily_revenue(self, days=7):
+        """Retorna a receita diária dos últimos dias (pd.Series indexada por data)"""
+        return self.columns.daily_revenue(days)
+    
+    @synchronized
     def get_menu_statistics(self):
         """Retorna estatísticas dos itens mais pedidos"""
-        if not self.orders:
-            return {}
-        
-        item_counts = {}
-        item_revenue = {}
-        
-        for order in self.orders:
-            for item in order['items']:
-                item_num = item['numero']
-                item_name = item['nome']
-                
-                if item_num not in item_counts:
-                    item_counts[item_num] = {'name': item_name, 'count': 0, 'revenue': 0}
-                
-                item_counts[item_num]['count'] += 1
-                item_counts[item_num]['revenue'] += item['preco']
-        
-        # Ordena por quantidade
-        sorted_items = sorted(item_counts.items(), key=lambda x: x[1]['count'], reverse=True)
-        
-        return dict(sorted_items)
+        return self.stats.menu_statistics()
+    
+    @synchronized
+    def verify_statistics(self):
+        """Confere os agregados incrementais contra um recálculo completo"""
+        return self.stats.snapshot() == OrderStats.from_orders(self.orders).snapshot()
     
+    @synchronized
     def cleanup_old_orders(self, days=30):
         """Remove pedidos antigos (mais de X dias)"""
         cutoff_date = datetime.now() - timedelta(days=days)
-        original_count = len(self.orders)
-        
-        self.orders = [
-            order for order in self.orders 
-            if datetime.fromisoformat(order['created_at']) > cutoff_date
-        ]
         
-        removed_count = original_count - len(self.orders)
+        removed_count = self.storage.remove_created_before(cutoff_date)
         if removed_count > 0:
-            self.save_orders()
             print(f"✅ {removed_count} pedidos antigos removidos")
         
         return removed_count
@@ -0,0 +1,119 @@
+"""
+Agregados dos pedidos mantidos incrementalmente pelo OrderManager
+"""
+
+from datetime import datetime
+
+
+def to_cents(value):
+    """Converte um valor em reais para centavos (evita acumular erro de float)"""
+    return round(value * 100)
+
+
+class OrderStats:
+    """
+    Contadores atualizados a cada alteração de pedido.
+
+    Receita é acumulada em centavos inteiros, de modo que somar e subtrair
+    pedidos nunca acumula erro de arredondamento e o resultado é idêntico ao
+    de um recálculo completo.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Zera todos os contadores"""
+        self.total_orders = 0
+        self.total_revenue_cents = 0
+        self.status_counts = {}
+        self.daily = {}  # 'AAAA-MM-DD' -> [pedidos, receita em centavos]
+        self.items = {}  # numero -> {'name', 'count', 'revenue_cents'}
+        self._menu_stats = None
+
+    @classmethod
+    def from_orders(cls, orders):
+        """Calcula os agregados do zero a partir de uma lista de pedidos"""
+        stats = cls()
+        stats.rebuild(orders)
+        return stats
+
+    def rebuild(self, orders):
+        """Recalcula todos os contadores"""
+        self.reset()
+        for order in orders:
+            self._add(order)
+
+    def apply(self, old_order, new_order):
+        """Listener do storage: remove o estado antigo e soma o novo"""
+        if old_order is not None:
+            self._remove(old_order)
+        if new_order is not None:
+            self._add(new_order)
+
+    def _add(self, order, sign=1):
+        """Soma (ou subtrai, com sign=-1) um pedido dos contadores"""
+        total_cents = to_cents(order['total'])
+        self.total_orders += sign
+        self.total_revenue_cents += sign * total_cents
+
+        status = order['status']
+        self.status_counts[status] = self.status_counts.get(status, 0) + sign
+        if not self.status_counts[status]:
+            del self.status_counts[status]
+
+        day = self.daily.setdefault(order['created_at'][:10], [0, 0])
+        day[0] += sign
+        day[1] += sign * total_cents
+        if not day[0]:
+            del self.daily[order['created_at'][:10]]
+
+        if order['items']:
+            self._menu_stats = None
+        for item in order['items']:
+            entry = self.items.setdefault(item['numero'], {'name': item['nome'], 'count': 0, 'revenue_cents': 0})
+            quantity = item.get('quantidade', 1)  # Pedidos antigos: uma entrada por unidade
+            entry['count'] += sign * quantity
+            entry['revenue_cents'] += sign * quantity * to_cents(item['preco'])
+            if not entry['count']:
+                del self.items[item['numero']]
+
+    def _remove(self, order):
+        """Subtrai um pedido dos contadores"""
+        self._add(order, sign=-1)
+
+    def summary(self, day=None):
+        """Resumo no formato de OrderManager.get_order_summary"""
+        day = day or datetime.now().date()
+        today_orders, today_cents = self.daily.get(day.isoformat(), (0, 0))
+        return {
+            'total_orders': self.total_orders,
+            'pending_orders': self.status_counts.get('pending', 0),
+            'today_orders': today_orders,
+            'total_revenue': self.total_revenue_cents / 100,
+            'today_revenue': today_cents / 100
+        }
+
+    def menu_statistics(self):
+        """Itens pedidos ordenados por quantidade (recalculado só quando muda)"""
+        if self._menu_stats is None:
+            ranked = sorted(self.items.items(), key=lambda x: x[1]['count'], reverse=True)
+            self._menu_stats = {
+                numero: {'name': entry['name'], 'count': entry['count'], 'revenue': entry['revenue_cents'] / 100}
+                for numero, entry in ranked
+            }
+        return self._menu_stats
+
+    def top_items(self, n=10):
+        """Os N itens mais pedidos"""
+        return list(self.menu_statistics().items())[:n]
+
+    def snapshot(self):
+        """Estado comparável dos contadores (usado na verificação de consistência)"""
+        return {
+            'total_orders': self.total_orders,
+            'total_revenue_cents': self.total_revenue_cents,
+            'status_counts': dict(self.status_counts),
+            'daily': {day: list(values) for day, values in self.daily.items()},
+            'items': {numero: dict(entry) for numero, entry in self.items.items()}
+        }
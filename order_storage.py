@@ -0,0 +1,1355 @@
+"""
+Backends de armazenamento dos pedidos usados pelo OrderManager
+"""
+
+import atexit
+import contextlib
+import gzip
+import json
+import os
+import queue
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from config import ORDERS_CONFIG, BACKUP_CONFIG
+
+
+def atomic_write_json(path, data, indent=None):
+    """
+    Grava JSON de forma atômica: arquivo temporário, fsync e rename.
+
+    Uma queda no meio da escrita deixa o arquivo anterior intacto.
+    """
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        # json.dumps usa o encoder em C; json.dump gravaria pedaço por pedaço em Python
+        f.write(json.dumps(data, ensure_ascii=False, indent=indent))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    fsync_dir(os.path.dirname(path))
+
+
+def fsync_dir(path):
+    """Persiste a entrada do diretório após um rename (não suportado no Windows)"""
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _lock_fd(fd):
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK desiste após ~10s; continua esperando
+                continue
+
+    def _unlock_fd(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class FileLock:
+    """
+    Trava consultiva entre processos num arquivo .lock (flock ou msvcrt).
+
+    É reentrante dentro do processo: chamadas aninhadas (e de outras threads
+    do mesmo processo) apenas aguardam/contam a profundidade.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.depth = 0
+        self._thread_lock = threading.RLock()
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self.depth == 0:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+            _lock_fd(self._fd)
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self.depth -= 1
+        if self.depth == 0:
+            _unlock_fd(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+
+def read_records(path, offset=0):
+    """Lê os registros JSONL a partir de um offset em bytes; retorna (registros, offset final)"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    return parse_records(data), offset + len(data)
+
+
+def parse_records(data):
+    """Converte bytes JSONL em registros, ignorando linhas vazias ou truncadas"""
+    records = []
+    for line in data.decode('utf-8', errors='replace').splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # Linha vazia ou truncada por uma queda no meio da escrita
+            continue
+    return records
+
+
+class OrderStorage:
+    """Base dos backends: notifica ouvintes a cada pedido criado, alterado ou removido"""
+
+    in_memory = True  # todos os pedidos ficam em memória; False se as consultas vão ao disco
+
+    def __init__(self):
+        self._listeners = []
+        self._reload_listeners = []
+
+    def subscribe(self, callback):
+        """Registra callback(pedido_antigo, pedido_novo); None indica criação/remoção"""
+        self._listeners.append(callback)
+
+    def subscribe_reload(self, callback):
+        """Registra callback() chamado quando os pedidos são recarregados por inteiro"""
+        self._reload_listeners.append(callback)
+
+    def _notify(self, old_order, new_order):
+        """Avisa os ouvintes sobre uma alteração"""
+        for callback in self._listeners:
+            callback(old_order, new_order)
+
+    def _notify_reload(self):
+        """Avisa os ouvintes de que devem recalcular tudo"""
+        for callback in self._reload_listeners:
+            callback()
+
+    def locked(self):
+        """Trava o armazenamento entre processos (sem efeito nos backends que não precisam)"""
+        return contextlib.nullcontext()
+
+    def refresh(self):
+        """Aplica alterações feitas por outros processos; retorna True se houve alguma"""
+        return False
+
+    def read_orders(self):
+        """
+        Lê os pedidos gravados para um backup. Os backends com trava a seguram
+        só para capturar um estado consistente do disco; a leitura e a
+        desserialização ficam fora dela, sem atrasar quem grava pedidos.
+        """
+        return list(self.load())
+
+    def count(self):
+        """Quantidade de pedidos"""
+        return len(self.orders)
+
+    def exists(self):
+        """True se há algum pedido"""
+        return self.count() > 0
+
+    def find_between(self, since, until):
+        """Retorna os pedidos criados entre duas datas (inclusivas)"""
+        orders = []
+        day = since
+        while day <= until:
+            orders.extend(self.find_by_date(day))
+            day += timedelta(days=1)
+        return orders
+
+    def remove_created_before(self, cutoff):
+        """Remove os pedidos criados até `cutoff` e retorna quantos foram removidos"""
+        with self.locked():
+            old_ids = [order['id'] for order in self.find_created_before(cutoff)]
+            self.remove(old_ids)
+        return len(old_ids)
+
+
+class JSONOrderStorage(OrderStorage):
+    """
+    Mantém os pedidos em memória e reescreve o orders.json inteiro a cada alteração.
+
+    Vários processos (bot, dashboard, backups) podem usar os mesmos arquivos:
+    toda alteração é feita sob uma trava de arquivo (`<arquivo>.lock`) e,
+    antes dela, o processo aplica o que os outros gravaram. `refresh()` compara
+    um carimbo barato do disco (tamanho, mtime, inode) e só relê quando muda.
+    """
+
+    def __init__(self, orders_file=None):
+        super().__init__()
+        self.orders_file = orders_file or ORDERS_CONFIG['orders_file']
+        # Contador de IDs persistido ao lado do snapshot (ex.: orders.seq.json)
+        self.seq_file = os.path.splitext(self.orders_file)[0] + '.seq.json'
+        self.orders = []
+        self._by_id = {}
+        # Índices secundários: chave -> {id: pedido}, em ordem de inserção
+        self._by_status = {}
+        self._by_phone = {}
+        self._by_day = {}
+        self._next_id = 1
+        self._lock = FileLock(self.orders_file + '.lock')
+        self._stamp = None
+
+    def load(self):
+        """Carrega pedidos salvos do arquivo JSON"""
+        with self._lock:
+            self._load_state()
+            self._stamp = self._disk_stamp()
+        return self.orders
+
+    def _load_state(self):
+        """Lê todo o estado do disco para a memória"""
+        self._set_orders(self._read_snapshot())
+
+    def _disk_stamp(self):
+        """Carimbo que muda sempre que outro processo grava os pedidos"""
+        try:
+            st = os.stat(self.orders_file)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read_deltas(self):
+        """Aplica só as alterações novas; False se for preciso recarregar tudo"""
+        return False
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Trava os arquivos entre processos, aplicando antes as alterações dos outros"""
+        with self._lock:
+            if self._lock.depth == 1:
+                self.refresh()
+            yield
+
+    def refresh(self):
+        """Aplica alterações feitas por outros processos; retorna True se houve alguma"""
+        with self._lock:
+            stamp = self._disk_stamp()
+            if stamp == self._stamp:
+                return False
+            if not self._read_deltas():
+                # Sem ouvintes durante a releitura: eles recalculam tudo no final
+                listeners, self._listeners = self._listeners, []
+                try:
+                    self._load_state()
+                finally:
+                    self._listeners = listeners
+                self._notify_reload()
+            self._stamp = self._disk_stamp()
+            return True
+
+    def _set_orders(self, orders):
+        """Substitui os pedidos em memória e reconstrói os índices"""
+        self.orders = orders
+        self._by_id = {}
+        self._by_status = {}
+        self._by_phone = {}
+        self._by_day = {}
+        for order in orders:
+            self._index(order)
+        self._next_id = max([self._read_seq()] + [order_id + 1 for order_id in self._by_id])
+
+    def _secondary_keys(self, order):
+        """Pares (índice, chave) em que o pedido aparece"""
+        # created_at é ISO 8601, então os 10 primeiros caracteres são a data
+        return (
+            (self._by_status, order['status']),
+            (self._by_phone, order['phone']),
+            (self._by_day, order['created_at'][:10])
+        )
+
+    def _index(self, order):
+        """Inclui o pedido em todos os índices"""
+        self._by_id[order['id']] = order
+        for index, key in self._secondary_keys(order):
+            index.setdefault(key, {})[order['id']] = order
+
+    def _unindex(self, order):
+        """Retira o pedido de todos os índices"""
+        del self._by_id[order['id']]
+        for index, key in self._secondary_keys(order):
+            bucket = index[key]
+            del bucket[order['id']]
+            if not bucket:
+                del index[key]
+
+    def _read_seq(self):
+        """Lê o próximo ID persistido"""
+        try:
+            with open(self.seq_file, 'r', encoding='utf-8') as f:
+                return json.load(f)['next_id']
+        except:
+            return 1
+
+    def _write_seq(self):
+        """Persiste o próximo ID"""
+        atomic_write_json(self.seq_file, {'next_id': self._next_id})
+
+    def next_id(self):
+        """Reserva um novo ID de pedido (nunca reutilizado, mesmo após limpezas)"""
+        order_id = self._next_id
+        self._next_id += 1
+        return order_id
+
+    def _read_snapshot(self):
+        """Lê o snapshot completo dos pedidos"""
+        return self._parse_snapshot(self._open_snapshot())
+
+    def _open_snapshot(self):
+        """Abre o snapshot (None se não existe)"""
+        try:
+            return open(self.orders_file, 'rb')
+        except OSError:
+            return None
+
+    def _parse_snapshot(self, f):
+        """Desserializa o snapshot aberto por `_open_snapshot` e fecha o arquivo"""
+        if f is None:
+            return []
+        with f:
+            try:
+                return json.load(f)
+            except ValueError:
+                return []
+
+    def read_orders(self):
+        with self._lock:
+            # O snapshot é trocado com os.replace: o arquivo já aberto continua neste estado
+            snapshot = self._open_snapshot()
+        self._set_orders(self._parse_snapshot(snapshot))
+        return list(self.orders)
+
+    def save(self):
+        """Salva todos os pedidos no arquivo JSON"""
+        try:
+            with self._lock:
+                atomic_write_json(self.orders_file, self.orders, indent=2)
+                self._write_seq()
+                self._stamp = self._disk_stamp()
+        except Exception as e:
+            print(f"❌ Erro ao salvar pedidos: {e}")
+
+    def _apply(self, record):
+        """Aplica uma alteração (create/update/delete) aos pedidos em memória"""
+        op = record['op']
+        if op == 'create':
+            order = record['order']
+            self.orders.append(order)
+            self._index(order)
+            self._next_id = max(self._next_id, order['id'] + 1)
+            self._notify(None, order)
+        elif op == 'update':
+            order = self._by_id.get(record['id'])
+            if order is not None:
+                old_order = dict(order)
+                old_keys = self._secondary_keys(order)
+                order.update(record['fields'])
+                # Só move o pedido nos índices cuja chave mudou
+                for (index, old_key), (_, new_key) in zip(old_keys, self._secondary_keys(order)):
+                    if old_key != new_key:
+                        bucket = index[old_key]
+                        del bucket[order['id']]
+                        if not bucket:
+                            del index[old_key]
+                        index.setdefault(new_key, {})[order['id']] = order
+                self._notify(old_order, order)
+        elif op == 'delete':
+            ids = {order_id for order_id in record['ids'] if order_id in self._by_id}
+            if ids:
+                self.orders = [order for order in self.orders if order['id'] not in ids]
+                for order_id in ids:
+                    order = self._by_id[order_id]
+                    self._unindex(order)
+                    self._notify(order, None)
+
+    def _commit(self, record):
+        """Aplica a alteração e persiste"""
+        with self.locked():
+            self._apply(record)
+            self.save()
+
+    def add(self, order):
+        """Adiciona um novo pedido"""
+        self._commit({'op': 'create', 'order': order})
+
+    def update(self, order_id, fields):
+        """Atualiza campos de um pedido existente"""
+        self._commit({'op': 'update', 'id': order_id, 'fields': fields})
+
+    def remove(self, order_ids):
+        """Remove pedidos pelos IDs"""
+        if order_ids:
+            self._commit({'op': 'delete', 'ids': list(order_ids)})
+
+    def get(self, order_id):
+        """Busca um pedido pelo ID"""
+        return self._by_id.get(order_id)
+
+    def find_by_phone(self, phone):
+        """Retorna os pedidos de um telefone"""
+        return list(self._by_phone.get(phone, {}).values())
+
+    def find_by_status(self, status):
+        """Retorna os pedidos com um determinado status"""
+        # Mudanças de status reinserem o pedido no fim do balde
+        return sorted(self._by_status.get(status, {}).values(), key=lambda order: order['id'])
+
+    def find_by_date(self, day):
+        """Retorna os pedidos criados numa data (datetime.date)"""
+        return list(self._by_day.get(day.isoformat(), {}).values())
+
+    def find_created_before(self, cutoff):
+        """Retorna os pedidos criados até o instante `cutoff` (datetime)"""
+        cutoff_iso = cutoff.isoformat()
+        cutoff_day = cutoff_iso[:10]
+        old_orders = []
+        for day, bucket in self._by_day.items():
+            if day < cutoff_day:
+                old_orders.extend(bucket.values())
+            elif day == cutoff_day:
+                old_orders.extend(order for order in bucket.values() if order['created_at'] <= cutoff_iso)
+        return old_orders
+
+    def replace_all(self, orders):
+        """Substitui todos os pedidos (usado na restauração de backups)"""
+        with self._lock:
+            self._set_orders(orders)
+            self.save()
+
+    def flush(self):
+        """Garante que as alterações pendentes estejam em disco"""
+
+    def close(self):
+        """Libera os recursos do backend"""
+        self.flush()
+
+
+class LogOrderStorage(JSONOrderStorage):
+    """
+    Registra cada alteração como uma linha num log JSONL (append-only).
+
+    O orders.json continua sendo o snapshot: na inicialização ele é lido e o
+    log é reaplicado por cima. A cada `compact_every` registros o estado é
+    consolidado num novo snapshot e o log é truncado. O fsync é feito em lotes
+    (a cada `fsync_batch_size` registros ou `fsync_interval_seconds`), então uma
+    queda do sistema operacional pode perder no máximo o último lote; uma queda
+    apenas do processo não perde nada, pois cada linha é enviada ao SO na hora.
+    O intervalo vale mesmo sem novos pedidos: uma thread própria faz o fsync
+    do que ficou pendente.
+    """
+
+    def __init__(self, orders_file=None, log_file=None, fsync_batch_size=None,
+                 fsync_interval=None, compact_every=None):
+        super().__init__(orders_file)
+        self.log_file = log_file or ORDERS_CONFIG['log_file']
+        self.fsync_batch_size = fsync_batch_size or ORDERS_CONFIG['fsync_batch_size']
+        self.fsync_interval = fsync_interval or ORDERS_CONFIG['fsync_interval_seconds']
+        self.compact_every = compact_every or ORDERS_CONFIG['compact_every']
+        self._log = None
+        self._log_offset = 0  # bytes do log já aplicados em memória
+        self._log_records = 0
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._syncer = None
+        self._closed = threading.Event()
+        atexit.register(self.close)
+
+    def load(self):
+        """Carrega o snapshot e reaplica o log de alterações"""
+        with self._lock:
+            self._load_state()
+            self._open_log()
+            if self._log_offset and self._log_needs_newline():
+                # Isola a linha truncada para não corromper o próximo registro
+                self._log.write("\n")
+                self._log.flush()
+                self._log_offset += 1
+            self._stamp = self._disk_stamp()
+        return self.orders
+
+    def _load_state(self):
+        """Lê o snapshot e reaplica o log inteiro"""
+        self._set_orders(self._read_snapshot())
+        self._log_records = 0
+        self._log_offset = 0
+        self._replay_log()
+
+    def _log_needs_newline(self):
+        """True se o log termina numa linha truncada"""
+        with open(self.log_file, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _disk_stamp(self):
+        """Carimbo do snapshot (muda na compactação) e tamanho do log (muda a cada registro)"""
+        try:
+            log_size = os.path.getsize(self.log_file)
+        except OSError:
+            log_size = 0
+        return (super()._disk_stamp(), log_size)
+
+    def _read_deltas(self):
+        """Aplica os registros novos do log, se o snapshot não foi trocado"""
+        if self._stamp is None or super()._disk_stamp() != self._stamp[0]:
+            return False
+        return self._replay_log()
+
+    def _replay_log(self):
+        """Aplica os registros acrescentados ao log desde a última leitura"""
+        if not os.path.exists(self.log_file):
+            return self._log_offset == 0
+        if os.path.getsize(self.log_file) < self._log_offset:
+            # Log truncado por uma compactação de outro processo
+            return False
+
+        records, self._log_offset = read_records(self.log_file, self._log_offset)
+        self._apply_log(records)
+        return True
+
+    def _apply_log(self, records):
+        """Aplica registros do log sobre o snapshot"""
+        for record in records:
+            # Pedidos já presentes no snapshot (queda entre a compactação
+            # e a limpeza do log) não devem ser recriados
+            if record['op'] == 'create' and record['order']['id'] in self._by_id:
+                continue
+            self._apply(record)
+            self._log_records += 1
+
+    def read_orders(self):
+        with self._lock:
+            snapshot = self._open_snapshot()
+            # A compactação trunca o log no lugar: copia os bytes dele enquanto a trava garante o par
+            try:
+                with open(self.log_file, 'rb') as f:
+                    log = f.read()
+            except OSError:
+                log = b""
+        self._set_orders(self._parse_snapshot(snapshot))
+        self._apply_log(parse_records(log))
+        return list(self.orders)
+
+    def _open_log(self):
+        """Abre o log para escrita no modo append"""
+        if self._log is None:
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+
+    def _commit(self, record):
+        """Aplica a alteração e acrescenta uma linha ao log"""
+        with self.locked():
+            self._apply(record)
+            self._open_log()
+            try:
+                self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._log.flush()
+            except Exception as e:
+                print(f"❌ Erro ao gravar log de pedidos: {e}")
+                return
+            # Sob a trava, o fim do arquivo é exatamente o que já está em memória
+            self._log_offset = os.fstat(self._log.fileno()).st_size
+
+            self._log_records += 1
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_batch_size or
+                    time.monotonic() - self._last_fsync >= self.fsync_interval):
+                self.flush()
+            elif self._syncer is None:
+                # Só quem grava precisa da thread (dashboard e backups apenas leem)
+                self._syncer = threading.Thread(target=self._fsync_loop, name='order-log-fsync', daemon=True)
+                self._syncer.start()
+
+            if self._log_records >= self.compact_every:
+                self.compact()
+
+    def _fsync_loop(self):
+        """Faz o fsync dos registros pendentes quando o intervalo vence"""
+        delay = self.fsync_interval
+        while not self._closed.wait(delay):
+            with self._lock:
+                delay = self.fsync_interval
+                if self._unsynced:
+                    remaining = self._last_fsync + self.fsync_interval - time.monotonic()
+                    if remaining > 0:
+                        delay = remaining
+                    else:
+                        self.flush()
+
+    def flush(self):
+        """Faz fsync do log se houver registros pendentes"""
+        if self._log is not None and self._unsynced:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def compact(self):
+        """Consolida o log num novo snapshot do orders.json e trunca o log"""
+        with self.locked():
+            try:
+                # Snapshot sem indentação: com indent o json não usa o encoder em C
+                atomic_write_json(self.orders_file, self.orders)
+                # Após truncar o log, o contador deixa de poder ser deduzido dele
+                self._write_seq()
+            except Exception as e:
+                print(f"❌ Erro ao compactar pedidos: {e}")
+                return
+
+            if self._log is not None:
+                self._log.close()
+            # Trunca e reabre em modo append: outros processos também gravam no log
+            open(self.log_file, 'w').close()
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+            self._log_offset = 0
+            self._log_records = 0
+            self._unsynced = 0
+            self._stamp = self._disk_stamp()
+
+    def save(self):
+        """Salva todos os pedidos (equivale a uma compactação)"""
+        self.compact()
+
+    def close(self):
+        """Faz o fsync final e fecha o log"""
+        # Sem isso o atexit manteria o backend (e todos os pedidos) vivo até o fim do processo
+        atexit.unregister(self.close)
+        self._closed.set()
+        if self._syncer is not None:
+            self._syncer.join()
+            self._syncer = None
+        if self._log is not None:
+            self.flush()
+            self._log.close()
+            self._log = None
+
+
+class PartitionedOrderStorage(JSONOrderStorage):
+    """
+    Pedidos particionados pela data de criação em arquivos JSONL por dia (ou mês).
+
+    Cada partição é um log append-only com as alterações dos pedidos criados
+    naquele período. A retenção descarta partições inteiras: elas saem da
+    memória na hora e são compactadas com gzip e movidas para a pasta de
+    backup (BACKUP_CONFIG['backup_folder']) por uma thread em segundo plano,
+    sem reescrever nenhum outro arquivo. Consultas a partições arquivadas
+    abrem apenas os arquivos do período pedido.
+    """
+
+    def __init__(self, partition_dir=None, partition_by=None, archive_dir=None, fsync_batch_size=None):
+        super().__init__(orders_file=partition_dir or ORDERS_CONFIG['partition_dir'])
+        self.partition_dir = self.orders_file
+        # Tamanho do prefixo de created_at que identifica a partição
+        self.key_length = 7 if (partition_by or ORDERS_CONFIG['partition_by']) == 'month' else 10
+        self.archive_dir = archive_dir or os.path.join(BACKUP_CONFIG['backup_folder'], 'orders')
+        self.fsync_batch_size = fsync_batch_size or ORDERS_CONFIG['fsync_batch_size']
+        self._files = {}
+        self._offsets = {}  # bytes já aplicados de cada partição
+        self._truncated = set()
+        self._unsynced = set()
+        self._pending_writes = 0
+        self._archive_queue = None
+        self._archiver = None
+        atexit.register(self.close)
+
+    def _partition_key(self, order):
+        return order['created_at'][:self.key_length]
+
+    def _partition_path(self, key):
+        return os.path.join(self.partition_dir, key + '.jsonl')
+
+    def _read_partition(self, path, opener=open):
+        """Lê os registros de um arquivo de partição, ignorando linhas truncadas"""
+        records = []
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    if not line.endswith("\n"):
+                        self._truncated.add(path)
+        return records
+
+    def load(self):
+        """Carrega as partições ativas e retoma arquivamentos interrompidos"""
+        os.makedirs(self.partition_dir, exist_ok=True)
+        with self._lock:
+            self._load_state()
+            for name in sorted(os.listdir(self.partition_dir)):
+                if name.endswith('.archiving'):
+                    self._archive_async(os.path.join(self.partition_dir, name))
+            self._stamp = self._disk_stamp()
+        return self.orders
+
+    def _load_state(self):
+        """Lê todas as partições ativas"""
+        # Partições podem ter sido arquivadas por outro processo
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        self._set_orders([])
+        self._offsets = {}
+        for path in self._partition_sizes():
+            for record in self._read_partition(path):
+                self._apply(record)
+            self._offsets[path] = os.path.getsize(path)
+
+    def read_orders(self):
+        if not os.path.isdir(self.partition_dir):
+            return []
+        with self._lock:
+            # Partições só crescem ou são trocadas por arquivos novos: basta abri-las e anotar o tamanho
+            partitions = [(open(path, 'rb'), size) for path, size in self._partition_sizes().items()]
+        self._set_orders([])
+        for f, size in partitions:
+            with f:
+                data = f.read(size)
+            for record in parse_records(data):
+                self._apply(record)
+        return list(self.orders)
+
+    def _partition_sizes(self):
+        """Tamanho de cada partição ativa, por caminho"""
+        sizes = {}
+        for name in sorted(os.listdir(self.partition_dir)):
+            if name.endswith('.jsonl'):
+                path = os.path.join(self.partition_dir, name)
+                sizes[path] = os.path.getsize(path)
+        return sizes
+
+    def _disk_stamp(self):
+        """Carimbo com o tamanho de todas as partições ativas"""
+        return tuple(self._partition_sizes().items())
+
+    def _read_deltas(self):
+        """Aplica os registros novos de cada partição; False se alguma sumiu ou encolheu"""
+        sizes = self._partition_sizes()
+        if any(sizes.get(path, -1) < offset for path, offset in self._offsets.items()):
+            return False
+        for path, size in sizes.items():
+            offset = self._offsets.get(path, 0)
+            if size > offset:
+                records, self._offsets[path] = read_records(path, offset)
+                for record in records:
+                    self._apply(record)
+        return True
+
+    def _partition_file(self, key):
+        """Arquivo da partição aberto para append (mantido aberto)"""
+        f = self._files.get(key)
+        if f is None:
+            path = self._partition_path(key)
+            f = self._files[key] = open(path, 'a', encoding='utf-8')
+            if path in self._truncated:
+                # Isola a linha truncada para não corromper o próximo registro
+                f.write("\n")
+                self._truncated.discard(path)
+        return f
+
+    def _write(self, key, record):
+        f = self._partition_file(key)
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        self._offsets[self._partition_path(key)] = os.fstat(f.fileno()).st_size
+        self._unsynced.add(key)
+        self._pending_writes += 1
+        if self._pending_writes >= self.fsync_batch_size:
+            self.flush()
+
+    def _commit(self, record):
+        """Aplica a alteração e a grava na partição do pedido"""
+        with self.locked():
+            op = record['op']
+            if op == 'delete':
+                by_partition = {}
+                for order_id in record['ids']:
+                    order = self._by_id.get(order_id)
+                    if order is not None:
+                        by_partition.setdefault(self._partition_key(order), []).append(order_id)
+                self._apply(record)
+                for key, ids in by_partition.items():
+                    self._write(key, {'op': 'delete', 'ids': ids})
+                return
+
+            self._apply(record)
+            order = record['order'] if op == 'create' else self._by_id.get(record['id'])
+            if order is not None:
+                self._write(self._partition_key(order), record)
+
+    def flush(self):
+        """Faz fsync das partições com gravações pendentes"""
+        for key in self._unsynced:
+            f = self._files.get(key)
+            if f is not None:
+                f.flush()
+                os.fsync(f.fileno())
+        self._unsynced = set()
+        self._pending_writes = 0
+
+    def save(self):
+        """As alterações já são gravadas a cada operação"""
+        self.flush()
+        self._write_seq()
+
+    def replace_all(self, orders):
+        """Substitui todas as partições pelos pedidos informados"""
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+            for name in os.listdir(self.partition_dir):
+                if name.endswith('.jsonl'):
+                    os.remove(os.path.join(self.partition_dir, name))
+
+            self._set_orders(orders)
+            by_partition = {}
+            for order in orders:
+                by_partition.setdefault(self._partition_key(order), []).append(order)
+            for key, partition_orders in by_partition.items():
+                with open(self._partition_path(key), 'w', encoding='utf-8') as f:
+                    for order in partition_orders:
+                        f.write(json.dumps({'op': 'create', 'order': order}, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._write_seq()
+            self._offsets = self._partition_sizes()
+            self._stamp = self._disk_stamp()
+
+    def remove_created_before(self, cutoff):
+        """Arquiva as partições antigas inteiras e remove o restante pedido a pedido"""
+        with self.locked():
+            cutoff_key = cutoff.isoformat()[:self.key_length]
+            old_orders = self.find_created_before(cutoff)
+            whole = [order['id'] for order in old_orders if self._partition_key(order) < cutoff_key]
+            partial = [order['id'] for order in old_orders if self._partition_key(order) >= cutoff_key]
+
+            # O contador de IDs não pode depender das partições que vão sair
+            self.save()
+            self._apply({'op': 'delete', 'ids': whole})
+            for name in sorted(os.listdir(self.partition_dir)):
+                key = name[:-len('.jsonl')]
+                if name.endswith('.jsonl') and key < cutoff_key:
+                    f = self._files.pop(key, None)
+                    if f is not None:
+                        f.close()
+                    path = os.path.join(self.partition_dir, name)
+                    os.replace(path, path + '.archiving')
+                    self._offsets.pop(path, None)
+                    self._archive_async(path + '.archiving')
+
+            self.remove(partial)
+            self._stamp = self._disk_stamp()
+        return len(old_orders)
+
+    def _archive_async(self, path):
+        """Enfileira uma partição para compressão e arquivamento em segundo plano"""
+        if self._archiver is None:
+            self._archive_queue = queue.Queue()
+            self._archiver = threading.Thread(target=self._archive_worker, daemon=True)
+            self._archiver.start()
+        self._archive_queue.put(path)
+
+    def _archive_worker(self):
+        while True:
+            path = self._archive_queue.get()
+            if path is None:
+                break
+            try:
+                # Sob a trava: outro processo pode ter retomado o mesmo arquivamento
+                with self._lock:
+                    if not os.path.exists(path):
+                        continue
+                    os.makedirs(self.archive_dir, exist_ok=True)
+                    name = os.path.basename(path)[:-len('.archiving')]
+                    # Modo 'ab': um novo membro gzip se a partição já tiver sido arquivada antes
+                    with open(path, 'rb') as src, gzip.open(os.path.join(self.archive_dir, name + '.gz'), 'ab') as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.remove(path)
+            except Exception as e:
+                print(f"❌ Erro ao arquivar partição {path}: {e}")
+
+    def read_archived(self, since, until):
+        """Lê do arquivo morto os pedidos criados entre duas datas (inclusivas)"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        first_key, last_key = since.isoformat()[:self.key_length], until.isoformat()[:self.key_length]
+        orders = {}
+        for name in sorted(os.listdir(self.archive_dir)):
+            key = name.split('.')[0]
+            if not name.endswith('.jsonl.gz') or not first_key <= key <= last_key:
+                continue
+            for record in self._read_partition(os.path.join(self.archive_dir, name), opener=gzip.open):
+                if record['op'] == 'create':
+                    orders[record['order']['id']] = record['order']
+                elif record['op'] == 'update' and record['id'] in orders:
+                    orders[record['id']].update(record['fields'])
+                elif record['op'] == 'delete':
+                    for order_id in record['ids']:
+                        orders.pop(order_id, None)
+        first_day, last_day = since.isoformat(), until.isoformat()
+        return [order for order in orders.values() if first_day <= order['created_at'][:10] <= last_day]
+
+    def find_between(self, since, until):
+        """Retorna os pedidos criados entre duas datas, incluindo partições arquivadas"""
+        orders = super().find_between(since, until)
+        live_ids = {order['id'] for order in orders}
+        archived = [order for order in self.read_archived(since, until) if order['id'] not in live_ids]
+        return sorted(archived, key=lambda order: order['id']) + orders
+
+    def close(self):
+        """Faz o fsync final, fecha as partições e aguarda o arquivamento"""
+        atexit.unregister(self.close)
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        if self._archiver is not None:
+            self._archive_queue.put(None)
+            self._archiver.join()
+            self._archiver = None
+
+
+class SQLiteOrderStorage(OrderStorage):
+    """
+    Armazena os pedidos num banco SQLite (modo WAL).
+
+    O pedido completo fica serializado na coluna `data`; id, telefone, status e
+    data de criação ficam em colunas próprias e indexadas, de modo que as
+    consultas do OrderManager viram buscas por índice em vez de varreduras.
+
+    Cada gravação também entra na tabela `changes` (com o pedido anterior), e
+    o `refresh` dos outros processos aplica só as alterações novas, como o
+    log do LogOrderStorage. Ficam guardadas as últimas `change_log_size`;
+    quem ficou para trás recarrega tudo.
+    """
+
+    in_memory = False
+
+    def __init__(self, db_file=None, change_log_size=None):
+        super().__init__()
+        self.orders_file = db_file or ORDERS_CONFIG['sqlite_file']
+        self.change_log_size = change_log_size or ORDERS_CONFIG['sqlite_change_log_size']
+        self._source = uuid.uuid4().hex  # identifica as alterações desta conexão
+        self.conn = sqlite3.connect(self.orders_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._tx_lock = threading.RLock()
+        self._tx_depth = 0
+        self._undo = []  # notificações feitas dentro da transação aberta
+        self._commits = 0
+        self._create_schema()
+        self._data_version = self._read_data_version()
+        (self._change_seq,) = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()
+
+    def _create_schema(self):
+        """Cria a tabela e os índices, se ainda não existirem"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS orders (
+                    id INTEGER PRIMARY KEY,
+                    phone TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_phone ON orders(phone)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) "
+                "SELECT 'next_id', COALESCE(MAX(id), 0) + 1 FROM orders"
+            )
+            # order_id NULL: todos os pedidos foram substituídos (restauração, importação)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT NOT NULL,
+                    order_id INTEGER,
+                    old_data TEXT
+                )
+            """)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Transação de escrita; as aninhadas fazem parte da mais externa, que
+        faz um único commit (ou rollback, se algo falhar).
+        """
+        with self._tx_lock:
+            if not self._tx_depth:
+                # IMMEDIATE já reserva a escrita: outro processo espera em vez de falhar no meio
+                self.conn.execute("BEGIN IMMEDIATE")
+            self._tx_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._tx_depth -= 1
+                if not self._tx_depth:
+                    self.conn.rollback()
+                    self._undo_notifications()
+                raise
+            self._tx_depth -= 1
+            if not self._tx_depth:
+                self._undo = []
+                self._commits += 1
+                if self._commits % 100 == 0:
+                    self._prune_changes()
+                if self._read_data_version() == self._data_version:
+                    # Ninguém mais gravou desde o último refresh: as alterações novas são todas nossas
+                    (self._change_seq,) = self.conn.execute(
+                        "SELECT COALESCE(MAX(seq), 0) FROM changes"
+                    ).fetchone()
+                self.conn.commit()
+
+    def _notify(self, old_order, new_order):
+        if self._tx_depth:
+            self._undo.append((old_order, new_order))
+        super()._notify(old_order, new_order)
+
+    def _notify_reload(self):
+        if self._tx_depth:
+            self._undo.append(None)
+        super()._notify_reload()
+
+    def _undo_notifications(self):
+        """Os ouvintes já viram as alterações desfeitas: avisa o contrário, da última para a primeira"""
+        undo, self._undo = self._undo, []
+        if None in undo:
+            self._notify_reload()
+            return
+        for old_order, new_order in reversed(undo):
+            self._notify(new_order, old_order)
+
+    def _record_changes(self, changes):
+        """Registra (id, pedido anterior) na tabela `changes`, na transação aberta"""
+        self.conn.executemany(
+            "INSERT INTO changes (source, order_id, old_data) VALUES (?, ?, ?)",
+            [(self._source, order_id, None if old_order is None else json.dumps(old_order, ensure_ascii=False))
+             for order_id, old_order in changes]
+        )
+
+    def _prune_changes(self):
+        """Mantém só as últimas `change_log_size` alterações"""
+        self.conn.execute(
+            "DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?", (self.change_log_size,)
+        )
+
+    def locked(self):
+        """Agrupa as operações numa transação (reserva de ID e gravação, lotes do bot)"""
+        return self._transaction()
+
+    def _read_data_version(self):
+        """Contador do SQLite que muda quando outra conexão altera o banco"""
+        (version,) = self.conn.execute("PRAGMA data_version").fetchone()
+        return version
+
+    def refresh(self):
+        """
+        As consultas já leem o banco; aqui só avisamos os ouvintes (agregados
+        do OrderManager) das alterações feitas por outros processos.
+        """
+        with self._tx_lock:
+            if self._tx_depth:
+                return False
+            version = self._read_data_version()
+            if version == self._data_version:
+                return False
+            self._data_version = version
+            # Alterações e pedidos atuais lidos na mesma transação (mesmo instante do banco)
+            self.conn.execute("BEGIN")
+            try:
+                changes = self.conn.execute(
+                    "SELECT seq, source, order_id, old_data FROM changes WHERE seq > ? ORDER BY seq",
+                    (self._change_seq,)
+                ).fetchall()
+                current = {order['id']: order for order in self._select(
+                    "WHERE id IN (SELECT order_id FROM changes WHERE seq > ?)", (self._change_seq,)
+                )}
+            finally:
+                self.conn.commit()
+            if not changes:
+                return False
+            missed = changes[0][0] > self._change_seq + 1  # já removidas pelo limite do log
+            self._change_seq = changes[-1][0]
+
+            if missed or any(order_id is None and source != self._source
+                             for _, source, order_id, _ in changes):
+                self._notify_reload()
+                return True
+
+            # O estado depois de cada alteração é o anterior da seguinte (ou o atual)
+            deltas = []
+            after = dict(current)
+            for _, source, order_id, old_data in reversed(changes):
+                old_order = None if old_data is None else json.loads(old_data)
+                new_order = after.get(order_id)
+                if source != self._source and (old_order is not None or new_order is not None):
+                    deltas.append((old_order, new_order))
+                after[order_id] = old_order
+            for old_order, new_order in reversed(deltas):
+                self._notify(old_order, new_order)
+            return bool(deltas)
+
+    def _select(self, where="", params=()):
+        """Executa um SELECT e desserializa os pedidos"""
+        rows = self.conn.execute(f"SELECT data FROM orders {where} ORDER BY id", params)
+        return [json.loads(data) for (data,) in rows]
+
+    @property
+    def orders(self):
+        """Todos os pedidos, em ordem de ID"""
+        return self._select()
+
+    def count(self):
+        """Quantidade de pedidos, sem ler os pedidos"""
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM orders").fetchone()
+        return count
+
+    def exists(self):
+        """True se há algum pedido (para no primeiro encontrado)"""
+        (found,) = self.conn.execute("SELECT EXISTS (SELECT 1 FROM orders)").fetchone()
+        return bool(found)
+
+    def load(self):
+        """Retorna os pedidos armazenados"""
+        return self.orders
+
+    def read_orders(self):
+        with self._tx_lock:
+            if self._tx_depth:
+                return self._select()
+            # Transação só de leitura: no modo WAL ela não bloqueia quem grava
+            self.conn.execute("BEGIN")
+            try:
+                rows = self.conn.execute("SELECT data FROM orders ORDER BY id").fetchall()
+            finally:
+                self.conn.commit()
+        return [json.loads(data) for (data,) in rows]
+
+    def save(self):
+        """As alterações já são gravadas a cada operação"""
+
+    def _row(self, order):
+        """Converte um pedido nos parâmetros da tabela"""
+        return (order['id'], order['phone'], order['status'], order['created_at'],
+                json.dumps(order, ensure_ascii=False))
+
+    def next_id(self):
+        """Reserva um novo ID de pedido (nunca reutilizado, mesmo após limpezas)"""
+        with self._transaction():
+            self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'next_id'")
+            (value,) = self.conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        return value - 1
+
+    def add(self, order):
+        """Adiciona um novo pedido"""
+        with self._transaction():
+            self.conn.execute(
+                "INSERT INTO orders (id, phone, status, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                self._row(order)
+            )
+            self._record_changes([(order['id'], None)])
+        self._notify(None, order)
+
+    def add_many(self, orders):
+        """Adiciona vários pedidos numa única transação"""
+        with self._transaction():
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO orders (id, phone, status, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                [self._row(order) for order in orders]
+            )
+            self.conn.execute(
+                "UPDATE meta SET value = MAX(value, (SELECT COALESCE(MAX(id), 0) + 1 FROM orders)) "
+                "WHERE key = 'next_id'"
+            )
+            self._record_changes([(None, None)])
+        self._notify_reload()
+
+    def replace_all(self, orders):
+        """Substitui todos os pedidos (usado na restauração de backups)"""
+        with self._transaction():
+            self.conn.execute("DELETE FROM orders")
+            self.add_many(orders)
+
+    def update(self, order_id, fields):
+        """Atualiza campos de um pedido existente"""
+        order = self.get(order_id)
+        if order is None:
+            return
+        old_order = dict(order)
+        order.update(fields)
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE orders SET phone = ?, status = ?, created_at = ?, data = ? WHERE id = ?",
+                self._row(order)[1:] + (order_id,)
+            )
+            self._record_changes([(order_id, old_order)])
+        self._notify(old_order, order)
+
+    def remove(self, order_ids):
+        """Remove pedidos pelos IDs"""
+        removed = [order for order in map(self.get, order_ids) if order is not None]
+        with self._transaction():
+            self.conn.executemany("DELETE FROM orders WHERE id = ?", [(order['id'],) for order in removed])
+            self._record_changes([(order['id'], order) for order in removed])
+        for order in removed:
+            self._notify(order, None)
+
+    def get(self, order_id):
+        """Busca um pedido pelo ID"""
+        orders = self._select("WHERE id = ?", (order_id,))
+        return orders[0] if orders else None
+
+    def find_by_phone(self, phone):
+        """Retorna os pedidos de um telefone"""
+        return self._select("WHERE phone = ?", (phone,))
+
+    def find_by_status(self, status):
+        """Retorna os pedidos com um determinado status"""
+        return self._select("WHERE status = ?", (status,))
+
+    def find_by_date(self, day):
+        """Retorna os pedidos criados numa data (datetime.date)"""
+        next_day = day + timedelta(days=1)
+        return self._select(
+            "WHERE created_at >= ? AND created_at < ?",
+            (day.isoformat(), next_day.isoformat())
+        )
+
+    def find_between(self, since, until):
+        """Retorna os pedidos criados entre duas datas (inclusivas)"""
+        return self._select(
+            "WHERE created_at >= ? AND created_at < ?",
+            (since.isoformat(), (until + timedelta(days=1)).isoformat())
+        )
+
+    def find_created_before(self, cutoff):
+        """Retorna os pedidos criados até o instante `cutoff` (datetime)"""
+        return self._select("WHERE created_at <= ?", (cutoff.isoformat(),))
+
+    def _created_range(self, since, until):
+        """Condição e parâmetros para datas de criação entre `since` e `until` (inclusivas, opcionais)"""
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append((until + timedelta(days=1)).isoformat())
+        return " AND ".join(conditions) or "1", params
+
+    def count_between(self, since=None, until=None):
+        """Quantidade de pedidos criados entre duas datas (inclusivas, opcionais)"""
+        condition, params = self._created_range(since, until)
+        (count,) = self.conn.execute(f"SELECT COUNT(*) FROM orders WHERE {condition}", params).fetchone()
+        return count
+
+    def iter_between(self, since=None, until=None, batch_size=1000):
+        """
+        Gera os pedidos criados entre duas datas (inclusivas, opcionais) em
+        lotes de `batch_size`, por data de criação: cada lote é uma consulta
+        pelo índice de created_at, continuando de onde o anterior parou.
+        """
+        condition, params = self._created_range(since, until)
+        last = ("", 0)
+        while True:
+            rows = self.conn.execute(
+                f"SELECT created_at, id, data FROM orders WHERE {condition} AND (created_at, id) > (?, ?) "
+                "ORDER BY created_at, id LIMIT ?",
+                params + [*last, batch_size]
+            ).fetchall()
+            if not rows:
+                return
+            yield [json.loads(data) for _, _, data in rows]
+            last = rows[-1][:2]
+
+    def flush(self):
+        """Garante que as alterações pendentes estejam em disco (fora de uma transação aberta)"""
+        with self._tx_lock:
+            if not self._tx_depth:
+                self.conn.commit()
+
+    def close(self):
+        """Fecha a conexão com o banco"""
+        self.conn.close()
+
+
+STORAGE_BACKENDS = {
+    'json': JSONOrderStorage,
+    'log': LogOrderStorage,
+    'partitioned': PartitionedOrderStorage,
+    'sqlite': SQLiteOrderStorage
+}
+
+
+def create_storage(kind=None, **kwargs):
+    """Cria o backend de armazenamento configurado em ORDERS_CONFIG"""
+    kind = kind or ORDERS_CONFIG['storage']
+    if kind not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend de armazenamento desconhecido: {kind}")
+    return STORAGE_BACKENDS[kind](**kwargs)
+
+
+def migrate_json_to_sqlite(orders_file=None, db_file=None):
+    """Importa um orders.json existente (e seu log, se houver) para o SQLite"""
+    orders_file = orders_file or ORDERS_CONFIG['orders_file']
+    if not os.path.exists(orders_file):
+        print(f"❌ Arquivo {orders_file} não encontrado!")
+        return 0
+
+    # O log fica ao lado do snapshot (orders.json -> orders.log.jsonl)
+    log_file = os.path.splitext(orders_file)[0] + '.log.jsonl'
+    if os.path.exists(log_file):
+        source = LogOrderStorage(orders_file=orders_file, log_file=log_file)
+    else:
+        source = JSONOrderStorage(orders_file=orders_file)
+    orders = source.load()
+    source.close()
+
+    target = SQLiteOrderStorage(db_file=db_file)
+    target.add_many(orders)
+    target.close()
+
+    print(f"✅ {len(orders)} pedidos importados de {orders_file} para {target.orders_file}")
+    return len(orders)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        migrate_json_to_sqlite(*sys.argv[2:4])
+    else:
+        print("🍽️ Armazenamento de pedidos - Opções:")
+        print("  python order_storage.py migrate [orders.json] [orders.db]  # Importa JSON para SQLite")
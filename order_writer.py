@@ -0,0 +1,100 @@
+"""
+Fila de gravação dos pedidos confirmados pelo bot (group commit em segundo plano)
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from config import ORDERS_CONFIG
+
+_STOP = object()
+
+
+class OrderWriteQueue:
+    """
+    Grava os pedidos confirmados numa thread própria, em lotes.
+
+    `submit()` só enfileira e retorna um Future, então a resposta ao cliente
+    não espera o disco. A thread pega o primeiro pedido da fila, espera até
+    `group_commit_wait_seconds` por outros (até `group_commit_size`) e grava o
+    lote com OrderManager.create_orders: uma trava e um único flush por lote.
+
+    Garantias:
+    - Ordem: uma única fila FIFO e um único gravador, então os pedidos são
+      gravados (e recebem IDs crescentes) na ordem em que foram submetidos.
+    - Durabilidade: o Future de um pedido é resolvido com o pedido gravado só
+      depois do flush do seu lote (fsync no log/partições, commit no SQLite).
+      Pedidos ainda na fila se perdem se o processo morrer; `close()` grava
+      o que estiver pendente antes de encerrar.
+    - Falhas: se a gravação do lote falhar, os Futures recebem a exceção
+      (não há nova tentativa, que poderia duplicar pedidos já gravados).
+    """
+
+    def __init__(self, manager=None, batch_size=None, max_wait=None, storage_options=None):
+        self.manager = manager
+        self.storage_options = storage_options  # create_storage(**opções) quando não há manager
+        self.batch_size = batch_size or ORDERS_CONFIG['group_commit_size']
+        self.max_wait = ORDERS_CONFIG['group_commit_wait_seconds'] if max_wait is None else max_wait
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, phone, items, total, estimated_time):
+        """Enfileira um pedido; o Future é resolvido com o pedido gravado"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put(((phone, items, total, estimated_time), future))
+        return future
+
+    def close(self, timeout=None):
+        """Grava os pedidos pendentes e encerra a thread"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='order-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            if self.manager is None:
+                # Criado na thread para não atrasar a inicialização do bot
+                from order_manager import OrderManager
+                from order_storage import create_storage
+                self.manager = OrderManager(storage=create_storage(**(self.storage_options or {})))
+            orders = self.manager.create_orders([entry for entry, _ in batch])
+        except Exception as e:
+            print(f"❌ Erro ao gravar {len(batch)} pedido(s): {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        for (_, future), order in zip(batch, orders):
+            future.set_result(order)
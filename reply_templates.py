@@ -0,0 +1,187 @@
+"""
+Textos das respostas do bot e dos cartões de pedido a partir de config.MENSAGENS
+"""
+
+import time
+from datetime import datetime
+from functools import lru_cache
+from string import Formatter
+
+from config import MENSAGENS, RESTAURANTE_TELEFONE
+
+
+class Template:
+    """
+    Template de `str.format` analisado uma única vez.
+
+    Os trechos fixos e os campos ({nome:formato}) ficam numa lista e a
+    renderização é um único join. Campo desconhecido no texto é erro ao
+    compilar, não na primeira mensagem de um cliente.
+    """
+
+    __slots__ = ('text', 'fields', '_parts')
+
+    def __init__(self, text):
+        self.text = text
+        self._parts = []
+        fields = []
+        for literal, field, spec, conversion in Formatter().parse(text):
+            if field is not None and (not field.isidentifier() or conversion or '{' in spec):
+                raise ValueError(f"Campo não suportado no template: {{{field}}}")
+            self._parts.append((literal, field, spec))
+            if field is not None:
+                fields.append(field)
+        self.fields = tuple(fields)
+
+    def render(self, **values):
+        out = []
+        for literal, field, spec in self._parts:
+            out.append(literal)
+            if field is not None:
+                out.append(format(values[field], spec))
+        return "".join(out)
+
+
+def format_item_line(menu, number, quantity, price_cents):
+    """Linha de um item do carrinho: '• [qx ]#n - nome - R$ valor'"""
+    menu_item = menu.get(number)
+    if quantity == 1 and menu_item is not None and round(menu_item.preco * 100) == price_cents:
+        return menu_item.line
+    name = menu_item.nome if menu_item is not None else f"Item {number}"
+    prefix = f"{quantity}x " if quantity != 1 else ""
+    return f"• {prefix}#{number} - {name} - R$ {quantity * price_cents / 100:.2f}\n"
+
+
+@lru_cache(maxsize=4096)
+def order_item_line(numero, nome, preco, quantidade=1):
+    """Linha de um item gravado num pedido"""
+    prefix = f"{quantidade}x " if quantidade != 1 else ""
+    return f"• {prefix}#{numero} - {nome} - R$ {quantidade * preco:.2f}\n"
+
+
+@lru_cache(maxsize=4096)
+def display_datetime(value):
+    """Data ISO gravada nos pedidos no formato de exibição (dd/mm/aaaa hh:mm)"""
+    return datetime.fromisoformat(value).strftime("%d/%m/%Y %H:%M")
+
+
+def format_order_card(order):
+    """Cartão de um pedido gravado (OrderManager.format_order_for_display)"""
+    return TEMPLATES['pedido_detalhes'].render(
+        id=order['id'],
+        phone=order['phone'],
+        criado_em=display_datetime(order['created_at']),
+        tempo=order['estimated_time'],
+        entrega=display_datetime(order['estimated_delivery']),
+        status=order['status'].upper(),
+        itens="".join([order_item_line(item['numero'], item['nome'], item['preco'], item.get('quantidade', 1))
+                       for item in order['items']]),
+        total=order['total']
+    )
+
+
+TEMPLATES = {name: Template(text) for name, text in MENSAGENS.items()}
+
+
+class ReplyRenderer:
+    """
+    Respostas do bot para um cardápio.
+
+    As linhas dos itens do carrinho ficam em cache por (item, quantidade,
+    preço) e o cache é descartado quando `menu.version` muda (cardápio
+    recarregado). A data do pedido confirmado é formatada uma vez por minuto.
+    """
+
+    max_cached_lines = 4096
+
+    def __init__(self, menu, templates=None):
+        self.menu = menu
+        self.templates = templates or TEMPLATES
+        self._lines = {}
+        self._version = None
+        self._minute = None
+        self._now_text = None
+
+    def text(self, name, **values):
+        """Renderiza um template de config.MENSAGENS"""
+        return self.templates[name].render(**values)
+
+    def cart_lines(self, cart):
+        version = getattr(self.menu, 'version', None)
+        if version != self._version or len(self._lines) > self.max_cached_lines:
+            self._lines = {}
+            self._version = version
+        lines = self._lines
+        out = []
+        for number, (quantity, price_cents, _) in cart.items.items():
+            key = (number, quantity, price_cents)
+            line = lines.get(key)
+            if line is None:
+                line = lines[key] = format_item_line(self.menu, number, quantity, price_cents)
+            out.append(line)
+        # Cada linha termina em "\n"; nos templates, {itens} é seguido de linha em branco
+        return "".join(out)
+
+    def cart_summary(self, cart):
+        """Resumo do carrinho em andamento"""
+        return self.text('pedido_parcial', itens=self.cart_lines(cart)[:-1], total=cart.total)
+
+    def confirmation(self, cart):
+        """Confirmação do pedido enviado"""
+        return self.text('pedido_confirmado', itens=self.cart_lines(cart)[:-1], total=cart.total,
+                         tempo=cart.max_time, telefone=RESTAURANTE_TELEFONE,
+                         data_hora=self._now())
+
+    def _now(self):
+        minute = int(time.time() // 60)
+        if minute != self._minute:
+            self._minute = minute
+            self._now_text = datetime.now().strftime("%d/%m/%Y %H:%M")
+        return self._now_text
+
+
+def benchmark(items=50, renders=2000):
+    """Mede o tempo de renderização das respostas para carrinhos de `items` itens"""
+    from cart import Cart
+    from menu_index import get_menu_catalog
+
+    menu = get_menu_catalog()
+    numbers = [item.numero for item in menu]
+    cart = Cart()
+    for number in numbers[:items]:
+        cart.add(menu.get(number))
+    # Completa com itens fora do cardápio atual se ele tiver menos de `items`
+    for i in range(len(cart.items), items):
+        cart._add(1000 + i, 1, 990, 10)
+    renderer = ReplyRenderer(menu)
+
+    def concat():
+        summary = "🍽️ **Seu pedido:**\n"
+        summary += cart.format_lines(menu)
+        summary += f"\n**Total: R$ {cart.total:.2f}**\n\n"
+        summary += "Digite mais números para adicionar itens ou envie 'ENVIAR' para finalizar."
+        return summary
+
+    for name, render in (("Concatenação (+=)", concat),
+                         ("Resumo (template)", lambda: renderer.cart_summary(cart)),
+                         ("Confirmação (template)", lambda: renderer.confirmation(cart))):
+        started = time.perf_counter()
+        for _ in range(renders):
+            render()
+        elapsed = time.perf_counter() - started
+        print(f"📝 {name}: {elapsed / renders * 1e6:.1f}µs por resposta ({len(cart.items)} itens)")
+
+    order = {
+        'id': 1, 'phone': '11999999999', 'status': 'pending', 'estimated_time': 20,
+        'created_at': datetime.now().isoformat(), 'estimated_delivery': datetime.now().isoformat(),
+        'items': cart.order_items(menu), 'total': cart.total
+    }
+    started = time.perf_counter()
+    for _ in range(renders):
+        format_order_card(order)
+    elapsed = time.perf_counter() - started
+    print(f"🧾 Cartão do pedido: {elapsed / renders * 1e6:.1f}µs ({len(order['items'])} itens)")
+
+
+if __name__ == "__main__":
+    benchmark()
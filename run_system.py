@@ -58,22 +58,42 @@ def run_streamlit_app(port, app_file):
         print(f"❌ Erro ao iniciar {app_file}: {e}")
         return None
 
-def run_whatsapp_bot():
-    """Executa o bot do WhatsApp em uma thread separada"""
+def run_whatsapp_bot(workers=None):
+    """Executa o bot do WhatsApp em uma thread separada (ou N workers, ver bot_workers.py)"""
+    from config import BOT_WORKERS_CONFIG
+
+    workers = workers or BOT_WORKERS_CONFIG['workers']
     try:
-        # Tenta usar a versão Windows primeiro
-        bot_file = "whatsapp_bot_windows.py"
-        if not Path(bot_file).exists():
-            bot_file = "whatsapp_bot.py"
-        
-        cmd = [sys.executable, bot_file]
+        # O perfil do driver vem de DRIVER_CONFIG ('auto' escolhe pelo sistema)
+        if workers > 1:
+            cmd = [sys.executable, "bot_workers.py", "--workers", str(workers)]
+        else:
+            cmd = [sys.executable, "whatsapp_bot.py"]
         process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        print(f"🤖 Bot do WhatsApp iniciado ({bot_file})")
+        if workers > 1:
+            print(f"🤖 Bot do WhatsApp iniciado com {workers} workers (bot_workers.py)")
+        else:
+            print("🤖 Bot do WhatsApp iniciado (whatsapp_bot.py)")
         return process
     except Exception as e:
         print(f"❌ Erro ao iniciar bot do WhatsApp: {e}")
         return None
 
+def run_backup_scheduler():
+    """Executa os backups periódicos de pedidos em um processo separado"""
+    from config import BACKUP_CONFIG
+
+    if not BACKUP_CONFIG['auto_backup']:
+        return None
+    try:
+        cmd = [sys.executable, "order_backup.py", "run"]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        print(f"💾 Backup automático a cada {BACKUP_CONFIG['backup_interval_hours']}h")
+        return process
+    except Exception as e:
+        print(f"❌ Erro ao iniciar backups: {e}")
+        return None
+
 def main():
     """Função principal"""
     print("🍽️ Sistema de Restaurante via WhatsApp")
@@ -114,6 +134,10 @@ def main():
         if bot_process:
             processes.append(("Bot WhatsApp", bot_process))
         
+        backup_process = run_backup_scheduler()
+        if backup_process:
+            processes.append(("Backups", backup_process))
+        
         print("\n✅ Sistema iniciado com sucesso!")
         print("\n🌐 Acesse:")
         print("   • Cardápio: http://localhost:8501")
@@ -171,10 +195,10 @@ def run_dashboard_only():
     except KeyboardInterrupt:
         print("\n✅ Dashboard parado!")
 
-def run_bot_only():
+def run_bot_only(workers=None):
     """Executa apenas o bot do WhatsApp"""
     print("🤖 Iniciando apenas o bot do WhatsApp...")
-    bot_process = run_whatsapp_bot()
+    bot_process = run_whatsapp_bot(workers)
     print("📱 Escaneie o QR Code quando aparecer")
     print("🛑 Pressione Ctrl+C para parar")
     
@@ -195,13 +219,14 @@ if __name__ == "__main__":
         elif option == "dashboard":
             run_dashboard_only()
         elif option == "bot":
-            run_bot_only()
+            run_bot_only(int(sys.argv[2]) if len(sys.argv) > 2 else None)
         elif option == "help":
             print("🍽️ Sistema de Restaurante - Opções:")
             print("  python run_system.py          # Sistema completo")
             print("  python run_system.py cardapio # Apenas cardápio")
             print("  python run_system.py dashboard # Apenas dashboard")
             print("  python run_system.py bot      # Apenas bot WhatsApp")
+            print("  python run_system.py bot 4    # Apenas bot, com 4 workers")
             print("  python run_system.py help     # Esta ajuda")
         else:
             print(f"❌ Opção inválida: {option}")
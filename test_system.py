@@ -151,6 +151,802 @@ def test_order_manager():
         print(f"❌ Erro ao testar OrderManager: {e}")
         return False
 
+def test_order_log_storage():
+    """Testa o armazenamento de pedidos em log append-only"""
+    print("\n📝 Testando log de pedidos...")
+    
+    try:
+        import tempfile
+        from order_manager import OrderManager
+        from order_storage import LogOrderStorage
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            def new_storage():
+                return LogOrderStorage(
+                    orders_file=os.path.join(tmp_dir, 'orders.json'),
+                    log_file=os.path.join(tmp_dir, 'orders.log.jsonl'),
+                    compact_every=5
+                )
+            
+            test_items = [{'numero': 1, 'nome': 'X-Burger', 'preco': 25.90, 'tempo_estimado_minutos': 15}]
+            
+            manager = OrderManager(storage=new_storage())
+            for _ in range(7):
+                manager.create_order("11999999999", test_items, 25.90, 15)
+            manager.update_order_status(7, 'preparing')
+            manager.storage.close()
+            
+            # Reabre e reaplica snapshot + log
+            reopened = OrderManager(storage=new_storage())
+            if len(reopened.orders) != 7:
+                print(f"❌ Esperados 7 pedidos após replay, encontrados {len(reopened.orders)}")
+                return False
+            
+            if reopened.get_order(7)['status'] != 'preparing':
+                print("❌ Atualização de status não foi reaplicada")
+                return False
+            
+            # Linha truncada no fim do log deve ser ignorada
+            reopened.storage.close()
+            with open(os.path.join(tmp_dir, 'orders.log.jsonl'), 'a', encoding='utf-8') as f:
+                f.write('{"op": "create", "order": {"id": 8')
+            
+            recovered = OrderManager(storage=new_storage())
+            recovered.create_order("11999999999", test_items, 25.90, 15)
+            recovered.storage.close()
+            
+            if len(OrderManager(storage=new_storage()).orders) != 8:
+                print("❌ Log truncado não foi recuperado corretamente")
+                return False
+            
+            # O fsync por intervalo acontece mesmo sem um próximo pedido
+            import time
+            idle = LogOrderStorage(orders_file=os.path.join(tmp_dir, 'idle.json'),
+                                   log_file=os.path.join(tmp_dir, 'idle.log.jsonl'),
+                                   fsync_batch_size=1000, fsync_interval=0.2)
+            OrderManager(storage=idle).create_order("11999999999", test_items, 25.90, 15)
+            pending = idle._unsynced
+            time.sleep(0.6)
+            synced = idle._unsynced == 0
+            idle.close()
+            if pending != 1 or not synced:
+                print("❌ Registros pendentes sem fsync após o intervalo")
+                return False
+        
+        print("✅ Log de pedidos reaplicado e compactado corretamente")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar log de pedidos: {e}")
+        return False
+
+def test_sqlite_storage():
+    """Testa o backend SQLite e a migração do orders.json"""
+    print("\n🗄️ Testando armazenamento SQLite...")
+    
+    try:
+        import tempfile
+        from order_manager import OrderManager
+        from order_storage import JSONOrderStorage, SQLiteOrderStorage, migrate_json_to_sqlite
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_file = os.path.join(tmp_dir, 'orders.json')
+            db_file = os.path.join(tmp_dir, 'orders.db')
+            test_items = [{'numero': 1, 'nome': 'X-Burger', 'preco': 25.90, 'tempo_estimado_minutos': 15}]
+            
+            json_manager = OrderManager(storage=JSONOrderStorage(orders_file=json_file))
+            json_manager.create_order("11999999999", test_items, 25.90, 15)
+            json_manager.create_order("11888888888", test_items, 25.90, 15)
+            
+            if migrate_json_to_sqlite(json_file, db_file) != 2:
+                print("❌ Migração não importou todos os pedidos")
+                return False
+            
+            manager = OrderManager(storage=SQLiteOrderStorage(db_file=db_file))
+            manager.update_order_status(1, 'preparing')
+            
+            # Lote do bot numa única transação: uma falha no meio desfaz o lote inteiro
+            try:
+                manager.create_orders([("11777777777", test_items, 25.90, 15), ("11777777777", test_items, 25.90, None)])
+            except TypeError:
+                pass
+            batch = manager.create_orders([("11666666666", test_items, 25.90, 15)] * 3)
+            
+            checks = [
+                manager.count_orders() == 5 and manager.has_orders(),
+                not manager.get_orders_by_phone("11777777777"),
+                [order['id'] for order in batch] == [3, 4, 5],
+                manager.get_order_summary()['total_orders'] == 5,
+                manager.get_order(1)['status'] == 'preparing',
+                len(manager.get_orders_by_phone("11888888888")) == 1,
+                [order['id'] for order in manager.get_pending_orders()] == [2, 3, 4, 5],
+                len(manager.get_today_orders()) == 5
+            ]
+            
+            # Outro processo (dashboard) aplica só as alterações novas, sem recarregar tudo
+            dashboard = OrderManager(storage=SQLiteOrderStorage(db_file=db_file))
+            rebuilds = []
+            dashboard.stats.rebuild = lambda orders: rebuilds.append(len(orders))
+            manager.create_order("11555555555", test_items, 25.90, 15)
+            manager.update_order_status(2, 'completed')
+            manager.update_order_status(2, 'cancelled')
+            manager.storage.remove([3])
+            checks += [
+                dashboard.refresh(),
+                not dashboard.refresh(),
+                not rebuilds,
+                dashboard.verify_statistics(),
+                dashboard.get_order_summary() == manager.get_order_summary()
+            ]
+            
+            # Quem ficou para trás do log de alterações recarrega tudo
+            manager.storage.change_log_size = 1
+            manager.update_order_status(4, 'completed')
+            manager.update_order_status(5, 'completed')
+            for _ in range(100):
+                with manager.storage.locked():
+                    pass
+            del dashboard.stats.rebuild
+            reloads = []
+            dashboard.storage.subscribe_reload(lambda: reloads.append(True))
+            checks += [dashboard.refresh(), reloads == [True], dashboard.verify_statistics()]
+            manager.storage.close()
+            dashboard.storage.close()
+            
+            if not all(checks):
+                print(f"❌ Consultas no SQLite retornaram resultados incorretos: {checks}")
+                return False
+        
+        print("✅ Backend SQLite e migração funcionando")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar SQLite: {e}")
+        return False
+
+def test_order_ids():
+    """Testa se os IDs continuam únicos após a remoção de pedidos"""
+    print("\n🔢 Testando alocação de IDs...")
+    
+    try:
+        import tempfile
+        from order_manager import OrderManager
+        from order_storage import JSONOrderStorage, LogOrderStorage, SQLiteOrderStorage
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backends = {
+                'json': lambda: JSONOrderStorage(orders_file=os.path.join(tmp_dir, 'json_orders.json')),
+                'log': lambda: LogOrderStorage(
+                    orders_file=os.path.join(tmp_dir, 'log_orders.json'),
+                    log_file=os.path.join(tmp_dir, 'log_orders.log.jsonl'),
+                    compact_every=2
+                ),
+                'sqlite': lambda: SQLiteOrderStorage(db_file=os.path.join(tmp_dir, 'orders.db'))
+            }
+            test_items = [{'numero': 1, 'nome': 'X-Burger', 'preco': 25.90, 'tempo_estimado_minutos': 15}]
+            
+            for name, new_storage in backends.items():
+                manager = OrderManager(storage=new_storage())
+                for _ in range(3):
+                    manager.create_order("11999999999", test_items, 25.90, 15)
+                manager.storage.remove([2, 3])
+                
+                order = manager.create_order("11999999999", test_items, 25.90, 15)
+                manager.storage.close()
+                
+                reopened = OrderManager(storage=new_storage())
+                next_order = reopened.create_order("11999999999", test_items, 25.90, 15)
+                reopened.storage.close()
+                
+                if (order['id'], next_order['id']) != (4, 5):
+                    print(f"❌ IDs reutilizados no backend {name}: {order['id']}, {next_order['id']}")
+                    return False
+        
+        print("✅ IDs monotônicos em todos os backends")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar IDs: {e}")
+        return False
+
+def test_order_indexes():
+    """Testa as buscas por telefone, status e data contra uma varredura completa"""
+    print("\n🗂️ Testando índices de pedidos...")
+    
+    try:
+        import contextlib
+        import io
+        import random
+        import tempfile
+        from datetime import timedelta
+        from order_manager import OrderManager
+        from order_storage import JSONOrderStorage, LogOrderStorage, PartitionedOrderStorage, SQLiteOrderStorage
+        
+        def lookups_match(manager, days):
+            """Compara cada busca indexada com o filtro ingênuo sobre todos os pedidos"""
+            orders = manager.orders
+            def ids(found):
+                return sorted(order['id'] for order in found)
+            for phone in {order['phone'] for order in orders} | {"11000000000"}:
+                if ids(manager.get_orders_by_phone(phone)) != ids(o for o in orders if o['phone'] == phone):
+                    return f"telefone {phone}"
+            for status in ('pending', 'preparing', 'completed', 'cancelled'):
+                found = manager.get_orders_by_status(status)
+                if [o['id'] for o in found] != ids(o for o in orders if o['status'] == status):
+                    return f"status {status}"
+            for day in days:
+                if ids(manager.get_orders_by_date(day)) != ids(o for o in orders if o['created_at'][:10] == day.isoformat()):
+                    return f"data {day}"
+            return None
+        
+        rng = random.Random(7)
+        today = datetime.now().replace(microsecond=0)
+        days = [(today - timedelta(days=offset)).date() for offset in (0, 1, 2, 40, 45)]
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backends = {
+                'json': lambda: JSONOrderStorage(orders_file=os.path.join(tmp_dir, 'orders.json')),
+                'log': lambda: LogOrderStorage(orders_file=os.path.join(tmp_dir, 'log.json'),
+                                               log_file=os.path.join(tmp_dir, 'log.log.jsonl'), compact_every=7),
+                'partitioned': lambda: PartitionedOrderStorage(partition_dir=os.path.join(tmp_dir, 'partitions'),
+                                                               archive_dir=os.path.join(tmp_dir, 'archive')),
+                'sqlite': lambda: SQLiteOrderStorage(db_file=os.path.join(tmp_dir, 'orders.db'))
+            }
+            
+            for name, new_storage in backends.items():
+                manager = OrderManager(storage=new_storage())
+                other = OrderManager(storage=new_storage())  # outro processo (dashboard)
+                for _ in range(60):
+                    created = datetime.combine(rng.choice(days), today.time())
+                    with manager.storage.locked():
+                        manager.storage.add({
+                            'id': manager.storage.next_id(), 'phone': f"119000000{rng.randint(0, 5):02d}",
+                            'items': [], 'total': 10.0, 'estimated_time': 15, 'status': 'pending',
+                            'created_at': created.isoformat(), 'estimated_delivery': created.isoformat(),
+                            'address': None, 'notes': None
+                        })
+                ids = [order['id'] for order in manager.orders]
+                for order_id in rng.sample(ids, 25):
+                    manager.update_order_status(order_id, rng.choice(['preparing', 'completed', 'cancelled']))
+                for order_id in rng.sample(ids, 10):
+                    # Cancelar de novo e voltar para pendente (o pedido muda de balde duas vezes)
+                    manager.update_order_status(order_id, 'cancelled')
+                    manager.update_order_status(order_id, 'pending')
+                manager.storage.remove(rng.sample(ids, 5))
+                
+                problem = lookups_match(manager, days)
+                other.refresh()
+                problem = problem or lookups_match(other, days)
+                if problem:
+                    print(f"❌ Índice divergente no backend {name}: {problem}")
+                    return False
+                
+                # Limpeza dos pedidos antigos (40 e 45 dias): os índices não guardam pedidos removidos
+                with contextlib.redirect_stdout(io.StringIO()):
+                    removed = manager.cleanup_old_orders(days=30)
+                other.refresh()
+                if not removed or any(manager.get_orders_by_date(day) for day in days[3:]) or \
+                        lookups_match(manager, days) or lookups_match(other, days):
+                    print(f"❌ Índices inconsistentes após a limpeza no backend {name}")
+                    return False
+                manager.storage.close()
+                other.storage.close()
+        
+        print("✅ Buscas indexadas iguais à varredura completa em todos os backends")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar índices: {e}")
+        return False
+
+def test_order_statistics():
+    """Testa se os agregados incrementais batem com um recálculo completo"""
+    print("\n📈 Testando agregados de pedidos...")
+    
+    try:
+        import random
+        import tempfile
+        from order_manager import OrderManager
+        from order_storage import LogOrderStorage, SQLiteOrderStorage
+        
+        menu = pd.read_csv('cardapio.csv').to_dict('records')
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backends = [
+                LogOrderStorage(
+                    orders_file=os.path.join(tmp_dir, 'orders.json'),
+                    log_file=os.path.join(tmp_dir, 'orders.log.jsonl')
+                ),
+                SQLiteOrderStorage(db_file=os.path.join(tmp_dir, 'orders.db'))
+            ]
+            
+            for storage in backends:
+                manager = OrderManager(storage=storage)
+                for _ in range(50):
+                    items = random.sample(menu, random.randint(1, 4))
+                    order = manager.create_order(
+                        phone=f"1199999{random.randint(0, 9):04d}",
+                        items=items,
+                        total=sum(item['preco'] for item in items),
+                        estimated_time=max(item['tempo_estimado_minutos'] for item in items)
+                    )
+                    if random.random() < 0.3:
+                        manager.update_order_status(order['id'], random.choice(['preparing', 'completed', 'cancelled']))
+                
+                storage.remove(random.sample([order['id'] for order in manager.orders], 10))
+                
+                if not manager.verify_statistics():
+                    print("❌ Agregados divergem do recálculo completo")
+                    return False
+                
+                summary = manager.get_order_summary()
+                expected_revenue = sum(order['total'] for order in manager.orders)
+                if summary['total_orders'] != 40 or abs(summary['total_revenue'] - expected_revenue) > 0.005:
+                    print(f"❌ Resumo incorreto: {summary}")
+                    return False
+                
+                storage.close()
+        
+        print("✅ Agregados consistentes com o recálculo completo")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar agregados: {e}")
+        return False
+
+def test_order_columns():
+    """Testa a visão colunar incremental contra um recálculo ingênuo"""
+    print("\n🧮 Testando visão colunar dos pedidos...")
+    
+    try:
+        import contextlib
+        import io
+        import random
+        import tempfile
+        from collections import Counter, defaultdict
+        from datetime import timedelta
+        from order_manager import OrderManager
+        from order_storage import LogOrderStorage
+        
+        def naive_problem(manager):
+            """Compara contagens, receita diária e frames com o cálculo direto sobre os pedidos"""
+            orders = manager.orders
+            if manager.get_status_counts() != dict(Counter(order['status'] for order in orders)):
+                return f"status {manager.get_status_counts()}"
+            end = datetime.now().date()
+            revenue = defaultdict(float)
+            for order in orders:
+                revenue[order['created_at'][:10]] += order['total']
+            series = manager.get_daily_revenue(days=7)
+            expected = [revenue[(end - timedelta(days=offset)).isoformat()] for offset in range(6, -1, -1)]
+            if list(series.index) != [end - timedelta(days=offset) for offset in range(6, -1, -1)] or \
+                    any(abs(a - b) > 1e-6 for a, b in zip(series.values, expected)):
+                return f"receita {list(series.values)} != {expected}"
+            if list(manager.get_orders_frame()['id']) != [order['id'] for order in orders]:
+                return "pedidos do DataFrame"
+            items = manager.get_items_frame()
+            quantities = sum(item.get('quantidade', 1) for order in orders for item in order['items'])
+            if len(items) != sum(len(order['items']) for order in orders) or items['item_quantity'].sum() != quantities:
+                return "itens do DataFrame"
+            return None
+        
+        rng = random.Random(11)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            def new_manager():
+                return OrderManager(storage=LogOrderStorage(orders_file=os.path.join(tmp_dir, 'orders.json'),
+                                                            log_file=os.path.join(tmp_dir, 'orders.log.jsonl')))
+            manager = new_manager()
+            other = new_manager()
+            manager.get_status_counts()  # colunas montadas: daqui em diante só atualizações incrementais
+            
+            def create(count):
+                for _ in range(count):
+                    quantity = rng.randint(1, 3)
+                    items = [{'numero': 1, 'nome': 'X-Burger', 'preco': 25.90, 'quantidade': quantity,
+                              'tempo_estimado_minutos': 15}]
+                    order = manager.create_order(f"1190000{rng.randint(0, 9):04d}", items, 25.90 * quantity, 15)
+                    # Parte dos pedidos em dias anteriores (dentro e fora da janela de 7 dias)
+                    offset = rng.choice([0, 0, 1, 3, 6, 7, 12])
+                    if offset:
+                        manager.storage.update(order['id'], {'created_at': (datetime.now() - timedelta(days=offset)).isoformat()})
+            
+            checkpoints = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                create(40)
+                checkpoints.append(naive_problem(manager))
+                ids = [order['id'] for order in manager.orders]
+                for order_id in rng.sample(ids, 15):
+                    manager.update_order_status(order_id, rng.choice(['preparing', 'completed', 'cancelled']))
+                checkpoints.append(naive_problem(manager))
+                # Mais da metade das linhas removida: a visão é reconstruída
+                manager.storage.remove(rng.sample(ids, 25))
+                checkpoints.append(naive_problem(manager))
+                create(10)
+                checkpoints.append(naive_problem(manager))
+                other.refresh()
+                checkpoints.append(naive_problem(other))
+            
+            manager.storage.close()
+            other.storage.close()
+        
+        problems = [problem for problem in checkpoints if problem]
+        if problems:
+            print(f"❌ Visão colunar divergente do recálculo: {problems[0]}")
+            return False
+        
+        print("✅ Contagens por status e receita diária iguais ao recálculo")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar visão colunar: {e}")
+        return False
+
+def test_order_export():
+    """Testa a exportação em blocos dos pedidos"""
+    print("\n📤 Testando exportação de pedidos...")
+    
+    try:
+        import tempfile
+        from datetime import timedelta
+        from order_manager import OrderManager
+        from order_storage import JSONOrderStorage, SQLiteOrderStorage
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backends = {
+                'json': lambda: JSONOrderStorage(orders_file=os.path.join(tmp_dir, 'orders.json')),
+                'sqlite': lambda: SQLiteOrderStorage(db_file=os.path.join(tmp_dir, 'orders.db'))
+            }
+            # Em memória o progresso conta itens; no SQLite, que lê o banco em blocos, conta pedidos
+            expected_progress = {'json': [3, 6, 9, 10], 'sqlite': [2, 4, 5]}
+            test_items = [
+                {'numero': 1, 'nome': 'X-Burger', 'preco': 25.90, 'tempo_estimado_minutos': 15},
+                {'numero': 15, 'nome': 'Refrigerante', 'preco': 6.50, 'tempo_estimado_minutos': 2}
+            ]
+            exports = {}
+            
+            for name, new_storage in backends.items():
+                manager = OrderManager(storage=new_storage())
+                for _ in range(5):
+                    manager.create_order("11999999999", test_items, 32.40, 15)
+                manager.storage.update(1, {'created_at': (datetime.now() - timedelta(days=10)).isoformat()})
+                
+                progress = []
+                csv_file = os.path.join(tmp_dir, f'{name}.csv.gz')
+                manager.export_orders(csv_file, chunk_size=3, progress=lambda done, total: progress.append(done))
+                exported = pd.read_csv(csv_file)
+                exports[name] = exported.drop(columns='created_at').sort_values(['order_id', 'item_number']).reset_index(drop=True)
+                
+                if len(exported) != 10 or progress != expected_progress[name]:
+                    print(f"❌ Exportação CSV incorreta ({name}): {len(exported)} linhas, progresso {progress}")
+                    return False
+                
+                jsonl_file = os.path.join(tmp_dir, f'{name}.jsonl')
+                manager.export_orders(jsonl_file, since=datetime.now().date())
+                with open(jsonl_file, encoding='utf-8') as f:
+                    records = [json.loads(line) for line in f]
+                
+                if len(records) != 8 or any(record['order_id'] == 1 for record in records):
+                    print(f"❌ Filtro por data incorreto ({name}): {len(records)} itens")
+                    return False
+                
+                if name == 'sqlite' and manager.columns._built:
+                    print("❌ Exportação no SQLite montou as colunas de todos os pedidos")
+                    return False
+                manager.storage.close()
+            
+            if not exports['json'].equals(exports['sqlite']):
+                print("❌ Exportação do SQLite difere da exportação em memória")
+                return False
+        
+        print("✅ Exportação em blocos funcionando")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar exportação: {e}")
+        return False
+
+def test_partitioned_storage():
+    """Testa as partições diárias de pedidos e o arquivamento das antigas"""
+    print("\n🗂️ Testando partições de pedidos...")
+    
+    try:
+        import tempfile
+        from datetime import timedelta
+        from order_manager import OrderManager
+        from order_storage import PartitionedOrderStorage
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            def new_storage():
+                return PartitionedOrderStorage(
+                    partition_dir=os.path.join(tmp_dir, 'orders_partitions'),
+                    archive_dir=os.path.join(tmp_dir, 'backups')
+                )
+            
+            storage = new_storage()
+            manager = OrderManager(storage=storage)
+            for days_ago in (0, 1, 40, 41):
+                created_at = (datetime.now() - timedelta(days=days_ago)).isoformat()
+                storage.add({
+                    'id': storage.next_id(), 'phone': "11999999999", 'items': [], 'total': 10.0,
+                    'estimated_time': 15, 'status': 'pending', 'created_at': created_at,
+                    'estimated_delivery': created_at, 'address': None, 'notes': None
+                })
+            
+            removed = manager.cleanup_old_orders(days=30)
+            storage.close()
+            
+            archived = sorted(os.listdir(os.path.join(tmp_dir, 'backups')))
+            if removed != 2 or len(archived) != 2 or not all(name.endswith('.jsonl.gz') for name in archived):
+                print(f"❌ Arquivamento incorreto: {removed} removidos, arquivos {archived}")
+                return False
+            
+            reopened = OrderManager(storage=new_storage())
+            old_orders = reopened.get_orders_between(
+                (datetime.now() - timedelta(days=45)).date(),
+                (datetime.now() - timedelta(days=35)).date()
+            )
+            if len(reopened.orders) != 2 or len(old_orders) != 2:
+                print("❌ Partições ativas ou arquivadas não foram lidas corretamente")
+                return False
+            reopened.storage.close()
+        
+        print("✅ Partições arquivadas e consultadas corretamente")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar partições: {e}")
+        return False
+
+def test_shared_storage():
+    """Testa dois gerenciadores (como bot e dashboard) usando os mesmos arquivos"""
+    print("\n🔒 Testando pedidos compartilhados entre processos...")
+    
+    try:
+        import tempfile
+        from order_manager import OrderManager
+        from order_storage import LogOrderStorage
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            def new_manager():
+                return OrderManager(storage=LogOrderStorage(
+                    orders_file=os.path.join(tmp_dir, 'orders.json'),
+                    log_file=os.path.join(tmp_dir, 'orders.log.jsonl')
+                ))
+            
+            bot = new_manager()
+            dashboard = new_manager()
+            first = bot.create_order("11999999999", [], 10.0, 15)
+            if not dashboard.refresh() or dashboard.get_order(first['id']) is None:
+                print("❌ Pedido do outro processo não foi aplicado")
+                return False
+            if dashboard.refresh():
+                print("❌ refresh() sem alterações deveria retornar False")
+                return False
+            
+            second = dashboard.create_order("11888888888", [], 20.0, 15)
+            dashboard.update_order_status(first['id'], 'completed')
+            bot.storage.compact()
+            third = bot.create_order("11999999999", [], 5.0, 15)
+            dashboard.refresh()
+            
+            if len({first['id'], second['id'], third['id']}) != 3:
+                print("❌ IDs repetidos entre processos")
+                return False
+            if dashboard.get_order_summary()['total_revenue'] != 35.0 or \
+                    bot.get_order(first['id'])['status'] != 'completed':
+                print("❌ Pedidos divergentes entre os processos")
+                return False
+            
+            # Sessões do Streamlit compartilhando o mesmo OrderManager enquanto o bot grava
+            import contextlib
+            import io
+            import threading
+            errors = []
+            writing = threading.Event()
+            writing.set()
+            def session():
+                try:
+                    while writing.is_set():
+                        dashboard.refresh()
+                        dashboard.get_order_summary()
+                        dashboard.get_status_counts()
+                        dashboard.get_daily_revenue(days=7)
+                        dashboard.get_orders_by_date(datetime.now().date())
+                except Exception as e:
+                    errors.append(e)
+            sessions = [threading.Thread(target=session) for _ in range(3)]
+            with contextlib.redirect_stdout(io.StringIO()):
+                for thread in sessions:
+                    thread.start()
+                for _ in range(100):
+                    bot.create_order("11777777777", [], 1.0, 10)
+                writing.clear()
+                for thread in sessions:
+                    thread.join()
+            dashboard.refresh()
+            if errors or dashboard.get_status_counts().get('pending') != 102 or not dashboard.verify_statistics():
+                print(f"❌ Leituras concorrentes inconsistentes: {errors[:1]}")
+                return False
+            bot.storage.close()
+            dashboard.storage.close()
+        
+        print("✅ Pedidos sincronizados entre processos")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar pedidos compartilhados: {e}")
+        return False
+
+def test_order_backup():
+    """Testa backup completo, incremental e restauração dos pedidos"""
+    print("\n💾 Testando backups de pedidos...")
+    
+    try:
+        import gc
+        import tempfile
+        import weakref
+        from order_backup import OrderBackup
+        from order_storage import JSONOrderStorage, LogOrderStorage
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            now = datetime.now().isoformat()
+            orders = [{
+                'id': order_id, 'phone': "11999999999", 'items': [], 'total': 10.0,
+                'estimated_time': 15, 'status': 'pending', 'created_at': now,
+                'estimated_delivery': now, 'address': None, 'notes': None
+            } for order_id in (1, 2, 3)]
+            
+            backup = OrderBackup(backup_folder=os.path.join(tmp_dir, 'backups'))
+            backup.backup_now(orders)
+            changed = [dict(orders[0], status='completed'), orders[2]]
+            backup.backup_now(changed)
+            
+            kinds = [kind for _, kind, _ in backup.list_backups()]
+            if kinds != ['full', 'incr']:
+                print(f"❌ Tipos de backup incorretos: {kinds}")
+                return False
+            
+            storage = JSONOrderStorage(orders_file=os.path.join(tmp_dir, 'orders.json'))
+            backup.restore(storage=storage)
+            restored = JSONOrderStorage(orders_file=os.path.join(tmp_dir, 'orders.json')).load()
+            if restored != changed:
+                print("❌ Pedidos restaurados diferem do último backup")
+                return False
+            
+            # Backups agendados não acumulam um backend (e uma cópia dos pedidos) por execução
+            opened = []
+            def storage_factory():
+                storage = LogOrderStorage(orders_file=os.path.join(tmp_dir, 'orders.json'),
+                                          log_file=os.path.join(tmp_dir, 'orders.log.jsonl'))
+                opened.append(weakref.ref(storage))
+                return storage
+            scheduled = OrderBackup(backup_folder=os.path.join(tmp_dir, 'scheduled'), storage_factory=storage_factory)
+            for _ in range(3):
+                scheduled.backup_now()
+            gc.collect()
+            if len(opened) != 3 or any(ref() is not None for ref in opened):
+                print("❌ Backends lidos pelos backups continuam em memória")
+                return False
+            
+            # Pedidos continuam sendo criados enquanto um backup lê (devagar) os arquivos
+            import threading
+            from order_manager import OrderManager
+            manager = OrderManager(storage=storage_factory())
+            for _ in range(5):
+                manager.create_order("11999999999", [], 10.0, 15)
+            before = manager.count_orders()
+            reading, release = threading.Event(), threading.Event()
+            def slow_storage():
+                storage = storage_factory()
+                set_orders = storage._set_orders
+                def slow_set_orders(orders):
+                    reading.set()
+                    release.wait(5)
+                    return set_orders(orders)
+                storage._set_orders = slow_set_orders
+                return storage
+            concurrent = OrderBackup(backup_folder=os.path.join(tmp_dir, 'concurrent'), storage_factory=slow_storage)
+            runner = threading.Thread(target=concurrent.backup_now)
+            runner.start()
+            reading.wait(5)
+            creator = threading.Thread(target=manager.create_order, args=("11888888888", [], 20.0, 15))
+            creator.start()
+            creator.join(2)
+            created_during_backup = not creator.is_alive()
+            release.set()
+            runner.join()
+            creator.join()
+            manager.storage.close()
+            if not created_during_backup:
+                print("❌ Criação de pedido bloqueada pelo backup em andamento")
+                return False
+            if len(concurrent.load_backup()) != before:
+                print("❌ Backup não reflete o estado do momento em que começou")
+                return False
+        
+        print("✅ Backup e restauração funcionando")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar backups: {e}")
+        return False
+
+def test_menu_index():
+    """Testa o índice compilado do cardápio contra o CSV"""
+    print("\n📋 Testando índice do cardápio...")
+    
+    try:
+        from menu_index import MenuIndex
+        
+        df = pd.read_csv('cardapio.csv')
+        index = MenuIndex.from_csv('cardapio.csv')
+        if len(index) != len(df):
+            print(f"❌ Índice com {len(index)} itens, CSV com {len(df)}")
+            return False
+        
+        for row in df.to_dict('records'):
+            if index.get(row['numero']).to_dict() != row:
+                print(f"❌ Item #{row['numero']} diferente do CSV")
+                return False
+        
+        if index.get(len(df) + 1) is not None:
+            print("❌ Número inexistente deveria retornar None")
+            return False
+        
+        try:
+            index.get(1).preco = 0
+            print("❌ Itens do índice deveriam ser imutáveis")
+            return False
+        except AttributeError:
+            pass
+        
+        print("✅ Índice do cardápio confere com o CSV")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar índice do cardápio: {e}")
+        return False
+
+def test_menu_catalog():
+    """Testa a recarga do cardápio quando o CSV é alterado"""
+    print("\n🔄 Testando recarga do cardápio...")
+    
+    try:
+        import tempfile
+        from menu_index import MenuCatalog
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'cardapio.csv')
+            header = "numero,nome,descricao,preco,tempo_estimado_minutos\n"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(header + "1,X-Burger,Hambúrguer,25.90,15\n")
+            
+            catalog = MenuCatalog(path, check_interval=0)
+            if catalog.version != 1 or catalog.get(1).preco != 25.90:
+                print("❌ Cardápio inicial incorreto")
+                return False
+            
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(header + "1,X-Burger,Hambúrguer,27.50,15\n2,X-Salada,Salada,28.50,18\n")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+            if catalog.get(1).preco != 27.50 or len(catalog) != 2 or catalog.version != 2:
+                print("❌ Alteração de preço não foi recarregada")
+                return False
+            
+            # Arquivo inválido (ex.: gravado pela metade) mantém a versão anterior
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(header + "3,Pizza,Pizza,abc")
+            if catalog.get(2) is None or catalog.version != 2:
+                print("❌ Cardápio inválido não deveria substituir o anterior")
+                return False
+        
+        print("✅ Cardápio recarregado sem reiniciar")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar recarga do cardápio: {e}")
+        return False
+
 def test_config():
     """Testa o arquivo de configuração"""
     print("\n⚙️ Testando configurações...")
@@ -197,6 +993,27 @@ def test_streamlit_apps():
         print(f"❌ Erro ao testar apps Streamlit: {e}")
         return False
 
+def isolated_bot(tmp_dir, **kwargs):
+    """WhatsAppBot com pedidos e carrinhos numa pasta temporária (não grava nos arquivos do sistema)"""
+    import whatsapp_bot
+    from conversation_store import MemoryConversationStore
+    from order_manager import OrderManager
+    from order_storage import LogOrderStorage
+    from order_writer import OrderWriteQueue
+    
+    kwargs.setdefault('active_orders', MemoryConversationStore(snapshot_file=''))
+    bot = whatsapp_bot.WhatsAppBot(**kwargs)
+    bot.order_queue = OrderWriteQueue(manager=OrderManager(storage=LogOrderStorage(
+        orders_file=os.path.join(tmp_dir, 'orders.json'),
+        log_file=os.path.join(tmp_dir, 'orders.log.jsonl')
+    )))
+    return bot
+
+def close_bot(bot):
+    """Grava os pedidos pendentes do bot e fecha o armazenamento temporário"""
+    bot.order_queue.close()
+    bot.order_queue.manager.storage.close()
+
 def test_whatsapp_bot():
     """Testa se o bot do WhatsApp pode ser importado"""
     print("\n🤖 Testando bot do WhatsApp...")
@@ -206,7 +1023,8 @@ def test_whatsapp_bot():
         print("✅ whatsapp_bot.py importado com sucesso")
         
         # Testa criação da classe
-        bot = whatsapp_bot.WhatsAppBot()
+        from conversation_store import MemoryConversationStore
+        bot = whatsapp_bot.WhatsAppBot(active_orders=MemoryConversationStore(snapshot_file=''))
         print("✅ WhatsAppBot criado com sucesso")
         
         return True
@@ -215,6 +1033,778 @@ def test_whatsapp_bot():
         print(f"❌ Erro ao testar bot do WhatsApp: {e}")
         return False
 
+def test_driver_profiles():
+    """Testa a escolha do perfil de driver do bot (sem abrir o navegador)"""
+    print("\n🧭 Testando perfis do driver...")
+    
+    try:
+        import whatsapp_bot
+        import whatsapp_bot_windows
+        from driver_profiles import DRIVER_PROFILES, get_driver_profile
+        
+        headless = get_driver_profile('headless').chrome_options().arguments
+        if "--headless=new" not in headless or "--no-sandbox" not in headless:
+            print(f"❌ Opções do perfil headless incorretas: {headless}")
+            return False
+        
+        production = get_driver_profile('headless').chrome_options()
+        if not any(arg.startswith("--user-data-dir=") for arg in production.arguments):
+            print("❌ Perfil headless sem sessão persistente")
+            return False
+        if production.experimental_options['prefs'].get('profile.managed_default_content_settings.images') != 2:
+            print("❌ Perfil headless carregando imagens")
+            return False
+        if any(arg.startswith("--user-data-dir=") for arg in get_driver_profile('remote').chrome_options().arguments):
+            print("❌ Perfil remoto não deveria usar diretório de sessão local")
+            return False
+        
+        if get_driver_profile('auto').name != ('windows' if os.name == 'nt' else 'desktop'):
+            print("❌ Perfil automático não corresponde ao sistema")
+            return False
+        
+        try:
+            get_driver_profile('firefox')
+            print("❌ Perfil desconhecido deveria ser rejeitado")
+            return False
+        except ValueError:
+            pass
+        
+        # Uma única implementação do bot, com qualquer perfil
+        if whatsapp_bot_windows.WhatsAppBot is not whatsapp_bot.WhatsAppBot:
+            print("❌ whatsapp_bot_windows.py não usa o bot unificado")
+            return False
+        from conversation_store import MemoryConversationStore
+        bot = whatsapp_bot.WhatsAppBot(profile='remote', active_orders=MemoryConversationStore(snapshot_file=''))
+        if bot.profile.name != 'remote' or "Seu pedido" not in bot.process_message("11999999999", "1"):
+            print("❌ Bot não funcionou com o perfil remoto")
+            return False
+        
+        # Relatório de inicialização: tempo e memória do processo do navegador
+        import subprocess
+        from types import SimpleNamespace
+        from bot_transports import SeleniumTransport
+        
+        browser = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(5)"])
+        try:
+            fake_bot = SimpleNamespace(
+                driver=SimpleNamespace(service=SimpleNamespace(process=browser)),
+                setup_driver=lambda: True,
+                connect_whatsapp=lambda: True
+            )
+            transport = SeleniumTransport(fake_bot)
+            transport.start()
+        finally:
+            browser.kill()
+            browser.wait()
+        if transport.startup['total_seconds'] < 0:
+            print("❌ Tempo de inicialização não medido")
+            return False
+        if os.path.isdir('/proc') and not transport.startup['browser_rss_mb']:
+            print("❌ Memória do navegador não medida")
+            return False
+        
+        print(f"✅ Perfis disponíveis: {', '.join(DRIVER_PROFILES)}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar perfis do driver: {e}")
+        return False
+
+def test_bot_transports():
+    """Testa o bot sem navegador: replay local e webhook HTTP"""
+    print("\n🔌 Testando transportes do bot...")
+    
+    try:
+        import tempfile
+        import threading
+        import time
+        import requests
+        from bot_transports import ReplayTransport, WebhookTransport
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = isolated_bot(tmp_dir)
+            replay = ReplayTransport([("11999999999", "1, 3"), ("11999999999", "ENVIAR")])
+            bot.run(replay)
+            if len(replay.sent) != 2 or "Pedido confirmado" not in replay.sent[1][1]:
+                print(f"❌ Respostas do replay incorretas: {replay.sent}")
+                return False
+            
+            webhook = WebhookTransport(port=0)
+            thread = threading.Thread(target=bot.run, args=(webhook,), daemon=True)
+            thread.start()
+            while webhook._server is None:
+                time.sleep(0.01)
+            url = f"http://{webhook.host}:{webhook.port}/messages"
+            reply = requests.post(url, json={'phone': "11888888888", 'message': "2"}, timeout=10)
+            invalid = requests.post(url, json={'message': "2"}, timeout=10)
+            webhook.stop()
+            thread.join(timeout=5)
+            close_bot(bot)
+        
+        if reply.status_code != 200 or "X-Salada" not in reply.json()['reply'] or invalid.status_code != 400:
+            print("❌ Webhook não respondeu como esperado")
+            return False
+        
+        print("✅ Bot respondendo por replay e webhook")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar transportes: {e}")
+        return False
+
+def test_conversation_engine():
+    """Testa as filas por cliente e o limite de envios simultâneos"""
+    print("\n🧵 Testando motor de conversas...")
+    
+    try:
+        import tempfile
+        import threading
+        import time
+        from bot_engine import ConversationEngine
+        from bot_transports import ReplayTransport
+        
+        class SlowTransport(ReplayTransport):
+            """Envio lento para o cliente 1; registra os envios simultâneos"""
+            def __init__(self, messages):
+                super().__init__(messages)
+                self.lock = threading.Lock()
+                self.in_flight = self.max_in_flight = 0
+            
+            def send(self, phone, message):
+                with self.lock:
+                    self.in_flight += 1
+                    self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                time.sleep(0.2 if phone == "1" else 0.01)
+                with self.lock:
+                    self.in_flight -= 1
+                return super().send(phone, message)
+        
+        messages = [("1", "1"), ("1", "2"), ("1", "ENVIAR")]
+        messages += [(str(phone), "3") for phone in range(2, 12)]
+        transport = SlowTransport(messages)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = isolated_bot(tmp_dir)
+            ConversationEngine(bot, transport, max_senders=3).run()
+            close_bot(bot)
+        
+        replies = [message for phone, message in transport.sent if phone == "1"]
+        if len(transport.sent) != len(messages) or "Pedido confirmado" not in replies[-1]:
+            print(f"❌ Respostas fora de ordem ou faltando: {transport.sent}")
+            return False
+        if transport.sent[-1][0] != "1":
+            print("❌ Envio lento de um cliente atrasou os demais")
+            return False
+        if not 1 < transport.max_in_flight <= 3:
+            print(f"❌ Envios simultâneos fora do limite: {transport.max_in_flight}")
+            return False
+        
+        print("✅ Respostas em ordem por cliente e envios em paralelo limitados")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar motor de conversas: {e}")
+        return False
+
+def test_whatsapp_sender():
+    """Testa o reaproveitamento da conversa aberta e o agrupamento de respostas"""
+    print("\n✉️ Testando envio de respostas...")
+    
+    try:
+        import tempfile
+        from selenium.common.exceptions import StaleElementReferenceException
+        from selenium.webdriver.common.keys import Keys
+        from bot_engine import ConversationEngine
+        from bot_transports import ReplayTransport
+        from whatsapp_sender import WhatsAppSender, percentiles
+        
+        class FakeElement:
+            def __init__(self, page, text=""):
+                self.page, self.text, self.typed = page, text, []
+            def clear(self):
+                if self.page.stale:
+                    self.page.stale = False
+                    raise StaleElementReferenceException("re-renderizado")
+            def send_keys(self, keys):
+                self.typed.append(keys)
+        
+        class FakeDriver:
+            """Página mínima: cabeçalho da conversa e caixa de mensagem"""
+            def __init__(self):
+                self.urls, self.stale = [], False
+                self.header, self.box = FakeElement(self, "Cliente"), FakeElement(self)
+            def get(self, url):
+                self.urls.append(url)
+                self.header, self.box = FakeElement(self, "Maria"), FakeElement(self)
+            def find_elements(self, by, xpath):
+                return [self.header] if 'chat-title' in xpath else []
+            def find_element(self, by, xpath):
+                return self.box
+        
+        import whatsapp_sender
+        wait_message_sent = whatsapp_sender.wait_message_sent
+        whatsapp_sender.wait_message_sent = lambda driver: None
+        try:
+            driver = FakeDriver()
+            sender = WhatsAppSender(driver)
+            sender.send("Cliente", "oi")            # conversa já aberta
+            sender.send("11977777777", "pedido")    # abre pela URL
+            driver.stale = True
+            sender.send("11977777777", "de novo")   # mesma conversa, elemento obsoleto
+        finally:
+            whatsapp_sender.wait_message_sent = wait_message_sent
+        
+        if len(driver.urls) != 1 or sender.reused != 2 or driver.box.typed[-2] != "de novo":
+            print(f"❌ Conversa aberta não foi reaproveitada: {driver.urls}, {sender.reused}")
+            return False
+        
+        # Resposta com várias linhas: Shift+Enter entre as linhas e um único Enter no fim
+        whatsapp_sender.wait_message_sent = lambda driver: None
+        try:
+            sender.send("11977777777", "linha 1\nlinha 2\r\n\nfim")
+        finally:
+            whatsapp_sender.wait_message_sent = wait_message_sent
+        keys = "".join(driver.box.typed[-2:])
+        line_break = Keys.SHIFT + Keys.ENTER + Keys.NULL
+        if "\n" in keys or keys != f"linha 1{line_break}linha 2{line_break}{line_break}fim{Keys.ENTER}":
+            print(f"❌ Quebras de linha enviariam a resposta em partes: {driver.box.typed[-2:]}")
+            return False
+        if percentiles(range(1, 101)) != {'p50': 51, 'p95': 95, 'p99': 99}:
+            print("❌ Percentis calculados incorretamente")
+            return False
+        
+        class CoalescingTransport(ReplayTransport):
+            coalesce_replies = True
+        
+        transport = CoalescingTransport([("1", "1"), ("1", "2"), ("1", "ENVIAR"), ("2", "3")])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bot = isolated_bot(tmp_dir)
+            ConversationEngine(bot, transport).run()
+            close_bot(bot)
+        replies = dict(transport.sent)
+        if len(transport.sent) > 3 or "Pedido confirmado" not in replies["1"] or "2" not in replies:
+            print(f"❌ Respostas não foram agrupadas: {transport.sent}")
+            return False
+        
+        print("✅ Conversa aberta reaproveitada e respostas agrupadas")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar envio: {e}")
+        return False
+
+def test_whatsapp_events():
+    """Testa a espera por eventos do observer e a leitura das mensagens novas (sem navegador)"""
+    print("\n👀 Testando eventos do WhatsApp Web...")
+    
+    try:
+        import whatsapp_events
+        from config import BOT_CONFIG
+        from whatsapp_events import ReadCursors, WhatsAppEvents
+        
+        class FakeDriver:
+            """Registra os scripts executados e devolve respostas programadas"""
+            def __init__(self):
+                self.calls, self.waits, self.installs, self.reads = [], [], [], []
+            def set_script_timeout(self, timeout):
+                self.script_timeout = timeout
+            def execute_async_script(self, script, *args):
+                self.calls.append((script, args))
+                return self.waits.pop(0)
+            def execute_script(self, script, *args):
+                self.calls.append((script, args))
+                if script is whatsapp_events.INSTALL_SCRIPT:
+                    return self.installs.pop(0)
+                return self.reads.pop(0)
+        
+        driver = FakeDriver()
+        events = WhatsAppEvents(driver, timeout=2, cursors=ReadCursors(''))
+        
+        # Eventos empurrados pelo observer: uma única chamada, com o tempo limite em ms
+        driver.waits = [[{'type': 'unread', 'chat': "Maria"}]]
+        if events.wait() != [{'type': 'unread', 'chat': "Maria"}] or \
+                driver.calls[-1] != (whatsapp_events.WAIT_SCRIPT, (2000,)):
+            print(f"❌ Espera por eventos incorreta: {driver.calls}")
+            return False
+        
+        # Página recarregada (observer perdido): reinstala quando a lista carrega e lê a varredura inicial
+        driver.calls = []
+        driver.waits = [None, [{'type': 'message', 'chat': "Maria", 'id': "a"}]]
+        driver.installs = [False, True]
+        received = events.wait(timeout=1)
+        scripts = [script for script, _ in driver.calls]
+        if received != [{'type': 'message', 'chat': "Maria", 'id': "a"}] or scripts != [
+                whatsapp_events.WAIT_SCRIPT, whatsapp_events.INSTALL_SCRIPT,
+                whatsapp_events.INSTALL_SCRIPT, whatsapp_events.WAIT_SCRIPT] or driver.calls[-1][1] != (0,):
+            print(f"❌ Observer não reinstalado após recarregar: {scripts}")
+            return False
+        
+        # Primeira leitura da conversa (nenhuma mensagem conhecida na tela): só as `expected` mais recentes
+        driver.calls = []
+        driver.reads = [{'found': False, 'messages': [
+            {'id': "h1", 'text': "histórico"}, {'id': "a", 'text': "1"}, {'id': "b", 'text': ""}]}]
+        if events.new_messages("Maria", expected=2) != [("a", "1")]:
+            print("❌ Histórico lido como mensagem nova (ou mídia respondida)")
+            return False
+        if driver.calls[-1] != (whatsapp_events.READ_NEW_SCRIPT, ([], BOT_CONFIG['max_messages_per_read'], "Maria")):
+            print(f"❌ Argumentos do READ_NEW_SCRIPT incorretos: {driver.calls[-1][1]}")
+            return False
+        
+        # Leituras seguintes partem do cursor (a mídia sem texto também avançou o cursor)
+        driver.reads = [{'found': True, 'messages': [{'id': "c", 'text': "ENVIAR"}]}, None]
+        if events.new_messages("Maria") != [("c", "ENVIAR")] or driver.calls[-1][1][0] != ["a", "b"]:
+            print(f"❌ Cursor não usado na leitura: {driver.calls[-1][1]}")
+            return False
+        if events.new_messages("Maria") != [] or events.cursors.known("Maria") != ["a", "b", "c"]:
+            print("❌ Conversa fechada deveria retornar nenhuma mensagem")
+            return False
+        
+        print("✅ Eventos do observer e leitura das mensagens novas")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar eventos do WhatsApp: {e}")
+        return False
+
+def test_conversation_store():
+    """Testa expiração, limite e persistência dos carrinhos do bot"""
+    print("\n🛒 Testando estado das conversas...")
+    
+    try:
+        import tempfile
+        import time
+        import whatsapp_bot
+        from conversation_store import MemoryConversationStore, SQLiteConversationStore
+        from order_manager import OrderManager
+        from order_storage import JSONOrderStorage
+        from order_writer import OrderWriteQueue
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot_file = os.path.join(tmp_dir, 'conversations.json')
+            
+            # Carrinho sobrevive ao reinício do bot
+            bot = whatsapp_bot.WhatsAppBot(active_orders=MemoryConversationStore(snapshot_file=snapshot_file))
+            bot.process_message("11999999999", "1, 3")
+            bot.active_orders.close()
+            
+            restarted = whatsapp_bot.WhatsAppBot(active_orders=MemoryConversationStore(snapshot_file=snapshot_file))
+            restarted.order_queue = OrderWriteQueue(manager=OrderManager(storage=JSONOrderStorage(
+                orders_file=os.path.join(tmp_dir, 'orders.json'))))
+            confirmation = restarted.process_message("11999999999", "ENVIAR")
+            restarted.order_queue.close()
+            if "Pedido confirmado" not in confirmation:
+                print("❌ Carrinho perdido após reiniciar o bot")
+                return False
+            
+            # O snapshot é gravado pela thread do store, nunca por quem altera a conversa
+            background_file = os.path.join(tmp_dir, 'background.json')
+            background = MemoryConversationStore(snapshot_file=background_file, snapshot_interval=0.2)
+            background["11999999999"] = {'items': {}, 'total_cents': 0, 'max_time': 0}
+            written_inline = os.path.exists(background_file)
+            time.sleep(0.6)
+            if written_inline or not os.path.exists(background_file):
+                print("❌ Snapshot das conversas gravado na thread de quem alterou (ou não gravado)")
+                return False
+            background["11888888888"] = {'items': {}, 'total_cents': 0, 'max_time': 0}
+            background.close()
+            if len(MemoryConversationStore(snapshot_file=background_file)) != 2:
+                print("❌ Alteração pendente não gravada ao fechar")
+                return False
+            
+            # Limite de memória (LRU) e expiração por inatividade
+            store = MemoryConversationStore(snapshot_file='', ttl_minutes=0.002, max_conversations=3)
+            for phone in "12345":
+                store[phone] = {'items': [], 'total': 0}
+            if len(store) != 3 or "1" in store or "5" not in store:
+                print("❌ Limite de conversas não respeitado")
+                return False
+            time.sleep(0.2)
+            if "5" in store or len(store) != 0:
+                print("❌ Conversas expiradas não foram descartadas")
+                return False
+            
+            # Dois workers compartilhando o mesmo banco
+            db_file = os.path.join(tmp_dir, 'conversations.db')
+            worker_a = SQLiteConversationStore(db_file=db_file)
+            worker_b = SQLiteConversationStore(db_file=db_file)
+            worker_a["11999999999"] = {'items': [{'numero': 1}], 'total': 25.9}
+            if worker_b.get("11999999999", {}).get('total') != 25.9:
+                print("❌ Carrinho não compartilhado entre workers")
+                return False
+            del worker_b["11999999999"]
+            if "11999999999" in worker_a:
+                print("❌ Remoção não vista pelo outro worker")
+                return False
+            worker_a.close()
+            worker_b.close()
+        
+        print("✅ Carrinhos com expiração, limite e persistência")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar estado das conversas: {e}")
+        return False
+
+def test_order_writer():
+    """Testa a gravação em lote dos pedidos confirmados pelo bot"""
+    print("\n🧾 Testando gravação dos pedidos do bot...")
+    
+    try:
+        import tempfile
+        import whatsapp_bot
+        from conversation_store import MemoryConversationStore
+        from order_manager import OrderManager
+        from order_storage import LogOrderStorage
+        from order_writer import OrderWriteQueue
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            def new_storage():
+                return LogOrderStorage(
+                    orders_file=os.path.join(tmp_dir, 'orders.json'),
+                    log_file=os.path.join(tmp_dir, 'orders.log.jsonl')
+                )
+            
+            bot = whatsapp_bot.WhatsAppBot(active_orders=MemoryConversationStore(snapshot_file=''))
+            bot.order_queue = OrderWriteQueue(manager=OrderManager(storage=new_storage()), max_wait=0.05)
+            phones = [f"1190000000{i}" for i in range(10)]
+            for phone in phones:
+                bot.process_message(phone, "1, 15")
+                bot.process_message(phone, "ENVIAR")
+            bot.order_queue.close()
+            bot.order_queue.manager.storage.close()
+            
+            # Relido do disco: todos os pedidos, na ordem de confirmação
+            orders = OrderManager(storage=new_storage()).orders
+            if [order['phone'] for order in orders] != phones:
+                print(f"❌ Pedidos do bot não gravados em ordem: {[o['phone'] for o in orders]}")
+                return False
+            if orders[0]['total'] != 32.40 or orders[0]['status'] != 'pending':
+                print("❌ Pedido gravado com dados incorretos")
+                return False
+            if bot.order_queue.batches >= len(phones):
+                print("❌ Pedidos não foram agrupados em lotes")
+                return False
+        
+        print(f"✅ {len(phones)} pedidos do bot gravados em {bot.order_queue.batches} lote(s)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar gravação dos pedidos do bot: {e}")
+        return False
+
+def test_cart():
+    """Testa o carrinho por quantidade e a leitura das mensagens de pedido"""
+    print("\n🛒 Testando carrinho do bot...")
+    
+    try:
+        from cart import Cart, CartLimitError, parse_order_message
+        from menu_index import get_menu_catalog
+        
+        changes = parse_order_message("2X1, 1*3, 5, -15 REMOVER 3")
+        if changes != [(1, 2), (1, 3), (5, 1), (15, -1), (3, -1)]:
+            print(f"❌ Mensagem lida incorretamente: {changes}")
+            return False
+        # Hífen entre números separa a lista, não retira itens
+        for message in ("1 - 2", "1-2"):
+            if parse_order_message(message) != [(1, 1), (2, 1)]:
+                print(f"❌ '{message}' lido como remoção: {parse_order_message(message)}")
+                return False
+        if parse_order_message("-2") != [(2, -1)]:
+            print("❌ '-2' no início da mensagem deveria remover o item")
+            return False
+        
+        menu = get_menu_catalog()
+        cart = Cart()
+        cart.apply(parse_order_message("1, 1, 1, 1, 5"), menu)
+        if list(cart.items) != [1, 5] or cart.items[1][0] != 4 or cart.total_cents != 14210:
+            print(f"❌ Carrinho com itens repetidos incorreto: {cart.items}")
+            return False
+        
+        # Retirar o item mais demorado recalcula o tempo estimado
+        cart.apply(parse_order_message("remover 5"), menu)
+        if cart.max_time != 15 or cart.total_cents != 10360:
+            print(f"❌ Remoção não atualizou total/tempo: {cart.total_cents} {cart.max_time}")
+            return False
+        items = cart.order_items(menu)
+        if "4x #1" not in cart.format_lines(menu) or len(items) != 1 or items[0]['quantidade'] != 4:
+            print("❌ Resumo/itens do pedido sem a quantidade")
+            return False
+        
+        # Quantidades acima dos limites são recusadas sem alterar o carrinho
+        for message in ("100000000X1", "9" * 5000 + "X1", f"{Cart.max_quantity}X1"):
+            try:
+                cart.apply(parse_order_message(message), menu)
+                print(f"❌ Quantidade acima do limite aceita: {message[:20]}")
+                return False
+            except CartLimitError:
+                pass
+        if cart.items[1][0] != 4 or cart.units != 4:
+            print("❌ Carrinho alterado por uma mensagem recusada")
+            return False
+        
+        # Ida e volta pelo armazenamento de conversas (JSON) e formato antigo
+        restored = Cart.from_dict(json.loads(json.dumps(cart.to_dict())))
+        legacy = Cart.from_dict({'items': [menu.get(1).to_dict()] * 2, 'total': 51.8, 'state': 'ordering'})
+        if restored.items != cart.items or legacy.items != {1: [2, 2590, 15]}:
+            print("❌ Carrinho não restaurado corretamente")
+            return False
+        
+        print("✅ Quantidades, remoções e totais do carrinho corretos")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar carrinho: {e}")
+        return False
+
+def test_reply_templates():
+    """Testa os templates das respostas e o cache das linhas dos itens"""
+    print("\n📝 Testando templates das respostas...")
+    
+    try:
+        import tempfile
+        from cart import Cart
+        from config import MENSAGENS
+        from menu_index import MenuCatalog
+        from reply_templates import ReplyRenderer, Template, format_order_card
+        
+        values = {'itens': "• #1 - X-Burger - R$ 25.90", 'total': 25.9, 'tempo': 15,
+                  'telefone': "(11) 99999-9999", 'data_hora': "18/10/2026 12:00"}
+        if Template(MENSAGENS['pedido_confirmado']).render(**values) != MENSAGENS['pedido_confirmado'].format(**values):
+            print("❌ Template compilado difere de str.format")
+            return False
+        try:
+            Template("Pedido {pedido.id}")
+            print("❌ Campo não suportado deveria falhar ao compilar")
+            return False
+        except ValueError:
+            pass
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'cardapio.csv')
+            header = "numero,nome,descricao,preco,tempo_estimado_minutos\n"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(header + "1,X-Burger,Hambúrguer,25.90,15\n")
+            catalog = MenuCatalog(path, check_interval=0)
+            renderer = ReplyRenderer(catalog)
+            
+            cart = Cart()
+            cart.add(catalog.get(1), 2)
+            if "• 2x #1 - X-Burger - R$ 51.80\n\n**Total: R$ 51.80**" not in renderer.cart_summary(cart):
+                print(f"❌ Resumo do carrinho incorreto: {renderer.cart_summary(cart)!r}")
+                return False
+            
+            # Cardápio recarregado: a linha em cache não vale mais
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(header + "1,X-Burger Duplo,Hambúrguer,25.90,15\n")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+            catalog.get(1)
+            if "X-Burger Duplo" not in renderer.confirmation(cart):
+                print("❌ Cache das linhas não acompanhou a versão do cardápio")
+                return False
+        
+        card = format_order_card({
+            'id': 7, 'phone': '11999999999', 'status': 'pending', 'estimated_time': 15,
+            'created_at': '2026-10-18T12:00:00', 'estimated_delivery': '2026-10-18T12:15:00',
+            'items': [{'numero': 1, 'nome': 'X-Burger', 'preco': 25.9}] * 2, 'total': 51.8
+        })
+        if ("**Pedido #7**" not in card or "18/10/2026 12:15" not in card
+                or card.count("• #1 - X-Burger - R$ 25.90") != 2 or "PENDING" not in card):
+            print(f"❌ Cartão do pedido incorreto: {card!r}")
+            return False
+        
+        print("✅ Respostas renderizadas a partir de config.MENSAGENS")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar templates das respostas: {e}")
+        return False
+
+def test_bot_workers():
+    """Testa o roteamento dos clientes entre workers e os pedidos compartilhados"""
+    print("\n👷 Testando workers do bot...")
+    
+    try:
+        import tempfile
+        import urllib.request
+        from bot_workers import BotWorkerPool, HashRing
+        from order_manager import OrderManager
+        from order_storage import LogOrderStorage
+        
+        # Hash consistente: distribuição equilibrada e poucos clientes mudam com um worker a mais
+        phones = [f"1197{i:07d}" for i in range(4000)]
+        three, four = HashRing(range(3)), HashRing(range(4))
+        counts = [sum(three.node_for(phone) == node for phone in phones) for node in range(3)]
+        moved = sum(three.node_for(phone) != four.node_for(phone) for phone in phones)
+        if min(counts) < len(phones) * 0.2 or moved > len(phones) * 0.4:
+            print(f"❌ Anel de hash desequilibrado: {counts}, {moved} clientes mudaram")
+            return False
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            storage_options = {'kind': 'log', 'orders_file': os.path.join(tmp_dir, 'orders.json'),
+                               'log_file': os.path.join(tmp_dir, 'orders.log.jsonl')}
+            pool = BotWorkerPool(workers=2, transport='webhook', port=0,
+                                 conversation_options={'snapshot_file': ''}, storage_options=storage_options)
+            pool.start()
+            try:
+                def post(phone, message):
+                    request = urllib.request.Request(
+                        f"http://127.0.0.1:{pool.router.port}/messages",
+                        data=json.dumps({'phone': phone, 'message': message}).encode('utf-8'),
+                        headers={'Content-Type': 'application/json'}
+                    )
+                    with urllib.request.urlopen(request, timeout=60) as response:
+                        return json.loads(response.read())['reply']
+            
+                # O carrinho só acumula se as duas mensagens caírem no mesmo worker
+                test_phones = [f"1196{i:07d}" for i in range(6)]
+                for phone in test_phones:
+                    post(phone, "1")
+                    if "2x #1" not in post(phone, "1"):
+                        print(f"❌ Mensagens de {phone} foram para workers diferentes")
+                        return False
+                    post(phone, "ENVIAR")
+            finally:
+                pool.stop()
+        
+            if {HashRing(range(2)).node_for(phone) for phone in test_phones} != {0, 1}:
+                print("❌ Telefones de teste não cobriram os dois workers")
+                return False
+            storage = LogOrderStorage(orders_file=storage_options['orders_file'], log_file=storage_options['log_file'])
+            stored = {order['phone'] for order in OrderManager(storage=storage).orders}
+            storage.close()
+            if not set(test_phones) <= stored:
+                print("❌ Pedidos dos workers não chegaram ao armazenamento compartilhado")
+                return False
+        if sorted(pool.reports) != [0, 1] or sum(r['replied'] for r in pool.reports.values()) != 18:
+            print(f"❌ Relatórios de vazão incompletos: {pool.reports}")
+            return False
+        
+        print("✅ Clientes roteados por hash consistente e pedidos gravados pelos 2 workers")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar workers do bot: {e}")
+        return False
+
+def test_read_cursors():
+    """Testa a leitura incremental das conversas (cursor por data-id)"""
+    print("\n📖 Testando cursores de leitura...")
+    
+    try:
+        import tempfile
+        import whatsapp_events
+        from bot_transports import SeleniumTransport
+        from whatsapp_events import WhatsAppEvents
+        
+        class FakeElement:
+            def __init__(self, driver, text=""):
+                self.driver, self.text = driver, text
+            def click(self):
+                self.driver.open = self.driver.unread_chat
+        
+        class FakeDriver:
+            """Conversas como listas de (data-id, texto); os scripts são emulados"""
+            def __init__(self):
+                self.chats = {"Maria": [("h1", "pedido antigo"), ("a", "1"), ("b", "2x3"), ("c", "ENVIAR")]}
+                self.open, self.unread_chat, self.events, self.fetched = "Cliente", "Maria", [], 0
+            def set_script_timeout(self, timeout):
+                pass
+            def execute_async_script(self, script, *args):
+                events, self.events = self.events, []
+                return events
+            def execute_script(self, script, *args):
+                if script is whatsapp_events.FIND_UNREAD_SCRIPT:
+                    return FakeElement(self, "3")
+                known, limit, chat = args
+                if chat != self.open:
+                    return None
+                new = []
+                for message_id, text in reversed(self.chats.get(chat, [])):
+                    if message_id in known:
+                        break
+                    new.insert(0, {'id': message_id, 'text': text})
+                self.fetched += len(new)
+                return {'found': len(new) < len(self.chats.get(chat, [])), 'messages': new[-limit:]}
+            def find_element(self, by, value):
+                return FakeElement(self, self.open)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cursor_file = os.path.join(tmp_dir, 'read_cursors.json')
+            driver = FakeDriver()
+            transport = SeleniumTransport(None, cursor_file=cursor_file)
+            events = WhatsAppEvents(driver, cursors=transport.cursors)
+            
+            # Três mensagens chegaram antes da leitura: todas, em ordem (o histórico fica de fora)
+            driver.events = [{'type': 'unread', 'chat': "Maria"}]
+            burst = transport._read_events(events)
+            if burst != [("Maria", "1"), ("Maria", "2x3"), ("Maria", "ENVIAR")]:
+                print(f"❌ Rajada de mensagens lida incorretamente: {burst}")
+                return False
+            
+            # Evento repetido de uma mensagem já lida e uma nova: só a nova é lida
+            driver.chats["Maria"].append(("d", "oi"))
+            driver.fetched = 0
+            driver.events = [{'type': 'message', 'chat': "Maria", 'id': "c"},
+                             {'type': 'message', 'chat': "Maria", 'id': "d"}]
+            if transport._read_events(events) != [("Maria", "oi")] or driver.fetched != 1:
+                print("❌ Mensagens repetidas ou histórico trafegando a cada leitura")
+                return False
+            transport.cursors.close()
+            
+            # Reinício: o cursor salvo evita reler a conversa
+            restarted = SeleniumTransport(None, cursor_file=cursor_file)
+            driver.events = [{'type': 'message', 'chat': "Maria", 'id': "d"}]
+            if restarted._read_events(WhatsAppEvents(driver, cursors=restarted.cursors)):
+                print("❌ Mensagens relidas após reiniciar")
+                return False
+        
+        print("✅ Mensagens lidas em ordem, sem perdas nem repetições")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar cursores de leitura: {e}")
+        return False
+
+def test_load_generator():
+    """Testa o gerador de carga (tráfego simulado e conversas gravadas)"""
+    print("\n🧪 Testando gerador de carga...")
+    
+    try:
+        import tempfile
+        from bot_transports import RecordingTransport, ReplayTransport
+        from load_test import recorded_traffic, run_load, synthetic_traffic
+        
+        traffic = synthetic_traffic(customers=50, seed=1)
+        if sum(message == "ENVIAR" for _, _, message in traffic) != 50 or traffic[0][2] == "ENVIAR":
+            print("❌ Tráfego simulado sem um pedido por cliente")
+            return False
+        
+        result = run_load(traffic, storage='log')
+        stages = result['stages']
+        if result['replies'] != len(traffic) or result['orders'] != 50:
+            print(f"❌ Mensagens ou pedidos perdidos: {result['replies']}/{len(traffic)}, {result['orders']}")
+            return False
+        if stages['process']['count'] != len(traffic) or stages['order_write']['count'] != 50:
+            print("❌ Etapas medidas incompletas")
+            return False
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'conversas.jsonl')
+            recorder = RecordingTransport(ReplayTransport([("11900000001", "1"), ("11900000001", "ENVIAR")]), path)
+            for phone, message in recorder.receive():
+                recorder.send(phone, "ok")
+            replay = recorded_traffic(path, speed=0)
+        if [(phone, message) for _, phone, message in replay] != [("11900000001", "1"), ("11900000001", "ENVIAR")]:
+            print(f"❌ Conversa gravada não foi reproduzida: {replay}")
+            return False
+        
+        print(f"✅ {len(traffic)} mensagens simuladas a {result['messages_per_second']:.0f}/s "
+              f"(p99 da resposta: {stages['reply']['p99']:.1f} ms)")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Erro ao testar gerador de carga: {e}")
+        return False
+
 def run_all_tests():
     """Executa todos os testes"""
     print("🧪 Iniciando testes do sistema...")
@@ -224,10 +1814,34 @@ def run_all_tests():
         ("Importações", test_imports),
         ("Arquivos", test_files),
         ("Cardápio CSV", test_cardapio_csv),
+        ("Índice do Cardápio", test_menu_index),
+        ("Recarga do Cardápio", test_menu_catalog),
         ("Configurações", test_config),
         ("Order Manager", test_order_manager),
+        ("Log de Pedidos", test_order_log_storage),
+        ("SQLite", test_sqlite_storage),
+        ("IDs de Pedidos", test_order_ids),
+        ("Índices", test_order_indexes),
+        ("Agregados", test_order_statistics),
+        ("Visão Colunar", test_order_columns),
+        ("Exportação", test_order_export),
+        ("Partições", test_partitioned_storage),
+        ("Backups", test_order_backup),
+        ("Multiprocesso", test_shared_storage),
         ("Apps Streamlit", test_streamlit_apps),
-        ("Bot WhatsApp", test_whatsapp_bot)
+        ("Bot WhatsApp", test_whatsapp_bot),
+        ("Perfis do Driver", test_driver_profiles),
+        ("Transportes do Bot", test_bot_transports),
+        ("Motor de Conversas", test_conversation_engine),
+        ("Envio de Respostas", test_whatsapp_sender),
+        ("Eventos do WhatsApp", test_whatsapp_events),
+        ("Estado das Conversas", test_conversation_store),
+        ("Pedidos do Bot", test_order_writer),
+        ("Carrinho", test_cart),
+        ("Respostas do Bot", test_reply_templates),
+        ("Workers do Bot", test_bot_workers),
+        ("Cursores de Leitura", test_read_cursors),
+        ("Teste de Carga", test_load_generator)
     ]
     
     results = []
@@ -1,60 +1,64 @@
 import time
-import pandas as pd
-import re
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-import json
-import os
-from datetime import datetime
+from selenium.common.exceptions import TimeoutException
+import argparse
+from menu_index import get_menu_catalog
+from cart import Cart, CartLimitError, parse_order_message
+from reply_templates import ReplyRenderer
+from driver_profiles import DRIVER_PROFILES, DriverProfile, get_driver_profile
+from whatsapp_events import wait_for_page
+from whatsapp_sender import WhatsAppSender
+from bot_transports import RecordingTransport, SeleniumTransport, WebhookTransport
+from bot_engine import ConversationEngine
+from conversation_store import create_conversation_store
+from order_writer import OrderWriteQueue
+
+QR_SCREENSHOT = "whatsapp_page.png"
 
 class WhatsAppBot:
-    def __init__(self):
+    def __init__(self, profile=None, active_orders=None):
+        # Nome do perfil (ou None para o de DRIVER_CONFIG) ou um DriverProfile já configurado
+        self.profile = profile if isinstance(profile, DriverProfile) else get_driver_profile(profile)
         self.driver = None
-        self.menu_df = None
-        self.active_orders = {}  # {phone: {'items': [], 'total': 0, 'state': 'ordering'}}
+        self.sender = None
+        self.menu = None
+        self.qr_screenshot = QR_SCREENSHOT
+        self.order_queue = OrderWriteQueue()  # Grava os pedidos confirmados em segundo plano
+        # {phone: Cart.to_dict()}
+        self.active_orders = create_conversation_store() if active_orders is None else active_orders
+        self.replies = None
         self.load_menu()
         
     def load_menu(self):
         """Carrega o cardápio do arquivo CSV"""
         try:
-            self.menu_df = pd.read_csv('cardapio.csv')
+            self.menu = get_menu_catalog()
+            self.replies = ReplyRenderer(self.menu)
             print("✅ Cardápio carregado com sucesso!")
         except FileNotFoundError:
             print("❌ Erro: Arquivo cardapio.csv não encontrado!")
             return None
     
     def setup_driver(self):
-        """Configura o driver do Chrome para WhatsApp Web"""
-        chrome_options = Options()
-        
-        # Configurações para Windows
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # Configurações para garantir que o QR code apareça
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--allow-running-insecure-content")
-        chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        
+        """Configura o driver do Chrome para WhatsApp Web conforme o perfil escolhido"""
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            print(f"🔧 Configurando Chrome (perfil {self.profile.name}: {self.profile.description})...")
+            self.driver = self.profile.create_driver()
+            
+            # Remove propriedades de automação
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            
             print("✅ Driver do Chrome configurado com sucesso!")
+            return True
+            
         except Exception as e:
             print(f"❌ Erro ao configurar driver: {e}")
-            raise
+            print("💡 Soluções possíveis:")
+            for number, tip in enumerate(self.profile.tips, 1):
+                print(f"   {number}. {tip}")
+            return False
         
     def connect_whatsapp(self):
         """Conecta ao WhatsApp Web"""
@@ -63,31 +67,76 @@ class WhatsAppBot:
             self.driver.get("https://web.whatsapp.com/")
             
             print("⏳ Aguardando carregamento da página...")
-            time.sleep(5)
+            wait_for_page(self.driver)
             
-            # Verifica se o QR code está presente
-            try:
-                qr_code = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, '//canvas[@aria-label="Scan me!"]'))
-                )
-                print("✅ QR Code detectado! Escaneie com seu WhatsApp...")
-            except:
-                print("⚠️ QR Code não detectado imediatamente. Verificando...")
-                # Tenta outros seletores para o QR code
+            # Sessão salva no perfil do Chrome: já entra na lista de conversas
+            if self.driver.find_elements(By.ID, "side"):
+                print("✅ Sessão do WhatsApp Web restaurada, sem QR code")
+                return True
+            
+            # Verifica se a página carregou
+            print("🔍 Verificando elementos da página...")
+            
+            # Tenta encontrar o QR code com diferentes seletores
+            qr_found = False
+            qr_selectors = [
+                '//canvas[@aria-label="Scan me!"]',
+                '//div[@data-testid="qrcode"]',
+                '//img[contains(@src, "qrcode")]',
+                '//canvas[contains(@class, "landing-wrapper")]',
+                '//div[contains(@class, "landing-wrapper")]//canvas',
+                '//div[contains(@class, "landing-wrapper")]//img'
+            ]
+            
+            for selector in qr_selectors:
                 try:
-                    qr_code = self.driver.find_element(By.XPATH, '//div[@data-testid="qrcode"]')
-                    print("✅ QR Code encontrado! Escaneie com seu WhatsApp...")
+                    qr_element = self.driver.find_element(By.XPATH, selector)
+                    print(f"✅ QR Code encontrado! ({selector})")
+                    qr_found = True
+                    break
                 except:
-                    print("⚠️ Tentando localizar QR Code...")
+                    continue
             
-            print("📱 Aguardando conexão (60 segundos)...")
+            if not qr_found:
+                print("⚠️ QR Code não encontrado pelos seletores padrão")
+                print("📸 Verifique se há uma imagem de QR code na tela")
+                
+                # Verifica se há texto sobre QR code
+                page_text = self.driver.page_source.lower()
+                if "qr" in page_text or "scan" in page_text or "whatsapp" in page_text:
+                    print("✅ Página do WhatsApp carregada corretamente")
+                
+                # Tenta capturar screenshot para debug
+                try:
+                    screenshot_path = self.qr_screenshot
+                    self.driver.save_screenshot(screenshot_path)
+                    print(f"📸 Screenshot salvo como: {screenshot_path}")
+                except:
+                    pass
+            
+            print("\n📱 INSTRUÇÕES:")
+            if self.profile.headless:
+                print(f"1. Chrome sem janela: o QR code é salvo em {self.qr_screenshot}")
+                print("2. Abra a imagem (ela é atualizada a cada 5 segundos)")
+            else:
+                print("1. Verifique se há uma janela do Chrome aberta")
+                print("2. Procure por um QR code na tela")
+            print("3. Abra o WhatsApp no seu celular")
+            print("4. Vá em Configurações > Aparelhos conectados")
+            print("5. Escaneie o QR code")
+            print("\n⏳ Aguardando conexão (60 segundos)...")
             
             # Aguarda a conexão
-            WebDriverWait(self.driver, 60).until(
-                EC.presence_of_element_located((By.ID, "side"))
-            )
-            print("✅ WhatsApp Web conectado com sucesso!")
-            return True
+            try:
+                self.wait_for_login(60)
+                print("✅ WhatsApp Web conectado com sucesso!")
+                return True
+            except:
+                print("⏰ Tempo esgotado. Verifique se:")
+                print("   - O QR code foi escaneado corretamente")
+                print("   - O WhatsApp está conectado à internet")
+                print("   - Não há outras sessões do WhatsApp Web ativas")
+                return False
             
         except Exception as e:
             print(f"❌ Erro ao conectar ao WhatsApp: {e}")
@@ -95,131 +144,82 @@ class WhatsAppBot:
             print("   - Certifique-se de que o Chrome está instalado")
             print("   - Verifique se há uma janela do Chrome aberta")
             print("   - Tente escanear o QR code novamente")
+            print("   - Verifique se não há outras sessões do WhatsApp Web ativas")
             return False
     
+    def wait_for_login(self, timeout):
+        """Aguarda o QR code ser escaneado; sem janela, salva o QR atual em imagem"""
+        if not self.profile.headless:
+            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((By.ID, "side")))
+            return
+        # O QR code muda a cada ~20 s: a imagem é atualizada enquanto se espera
+        deadline = time.monotonic() + timeout
+        while True:
+            self.driver.save_screenshot(self.qr_screenshot)
+            try:
+                WebDriverWait(self.driver, 5).until(EC.presence_of_element_located((By.ID, "side")))
+                return
+            except TimeoutException:
+                if time.monotonic() >= deadline:
+                    raise
+    
     def get_menu_item(self, number):
         """Busca um item no cardápio pelo número"""
-        item = self.menu_df[self.menu_df['numero'] == number]
-        if not item.empty:
-            return item.iloc[0]
-        return None
+        return self.menu.get(number)
     
-    def format_order_summary(self, items, total):
+    def format_order_summary(self, cart):
         """Formata o resumo do pedido"""
-        summary = "🍽️ **Seu pedido:**\n"
-        for item in items:
-            summary += f"• #{item['numero']} - {item['nome']} - R$ {item['preco']:.2f}\n"
-        summary += f"\n**Total: R$ {total:.2f}**\n\n"
-        summary += "Digite mais números para adicionar itens ou envie 'ENVIAR' para finalizar."
-        return summary
-    
-    def calculate_estimated_time(self, items):
-        """Calcula o tempo estimado baseado no item mais demorado"""
-        if not items:
-            return 0
-        
-        max_time = max(item['tempo_estimado_minutos'] for item in items)
-        return max_time
+        return self.replies.cart_summary(cart)
     
     def process_message(self, phone, message):
         """Processa a mensagem recebida"""
         message = message.strip().upper()
         
-        # Se é a primeira mensagem ou pedido finalizado
-        if phone not in self.active_orders:
-            self.active_orders[phone] = {
-                'items': [],
-                'total': 0,
-                'state': 'ordering'
-            }
+        # Carrinho vazio se é a primeira mensagem ou pedido finalizado (ou o carrinho expirou)
+        cart = Cart.from_dict(self.active_orders.get(phone))
         
         # Comando para finalizar pedido
         if message == "ENVIAR":
-            if not self.active_orders[phone]['items']:
-                return "❌ Nenhum item no pedido. Digite os números dos pratos desejados."
+            if not cart:
+                return self.replies.text('pedido_vazio')
             
-            estimated_time = self.calculate_estimated_time(self.active_orders[phone]['items'])
-            total = self.active_orders[phone]['total']
-            
-            response = f"""✅ **Pedido confirmado!**
-
-🍽️ **Itens do pedido:**
-"""
-            for item in self.active_orders[phone]['items']:
-                response += f"• #{item['numero']} - {item['nome']} - R$ {item['preco']:.2f}\n"
-            
-            response += f"""
-💰 **Total: R$ {total:.2f}**
-⏱️ **Tempo estimado:** {estimated_time} minutos
-📍 **Endereço de entrega:** [será solicitado]
-
-📞 **Para dúvidas:** (11) 99999-9999
-🕒 **Pedido realizado em:** {datetime.now().strftime("%d/%m/%Y %H:%M")}
-
-Obrigado por escolher nosso restaurante! 🍽️"""
+            response = self.replies.confirmation(cart)
             
-            # Limpa o pedido ativo
-            del self.active_orders[phone]
+            # Registra o pedido (a gravação não atrasa a resposta) e limpa o carrinho
+            self.order_queue.submit(phone, cart.order_items(self.menu), cart.total, cart.max_time)
+            self.active_orders.pop(phone)
             return response
         
-        # Processa números de itens
-        numbers = re.findall(r'\d+', message)
-        if not numbers:
-            return """🍽️ **Bem-vindo ao nosso restaurante!**
-
-Para fazer seu pedido, digite os números dos pratos desejados.
-Exemplo: 1, 3, 15
-
-Para ver o cardápio completo, acesse: [link do Streamlit]
-
-Digite 'ENVIAR' quando terminar seu pedido."""
+        # Processa números de itens (e quantidades/remoções)
+        changes = parse_order_message(message)
+        if not changes:
+            return self.replies.text('boas_vindas')
         
-        # Adiciona itens ao pedido
-        added_items = []
-        for num in numbers:
-            item_num = int(num)
-            item = self.get_menu_item(item_num)
-            if item is not None:
-                item_dict = item.to_dict()
-                self.active_orders[phone]['items'].append(item_dict)
-                self.active_orders[phone]['total'] += item_dict['preco']
-                added_items.append(item_dict)
+        # Adiciona/retira itens do pedido
+        try:
+            applied = cart.apply(changes, self.menu)
+        except CartLimitError:
+            return self.replies.text('limite_quantidade', maximo_item=cart.max_quantity,
+                                     maximo_pedido=cart.max_units)
+        if not applied:
+            return self.replies.text('item_invalido')
         
-        if not added_items:
-            return "❌ Nenhum item válido encontrado. Verifique os números e tente novamente."
+        # Grava o carrinho (persistido e renovando a expiração)
+        if cart:
+            self.active_orders[phone] = cart.to_dict()
+        else:
+            self.active_orders.pop(phone)
         
         # Retorna resumo do pedido
-        return self.format_order_summary(
-            self.active_orders[phone]['items'], 
-            self.active_orders[phone]['total']
-        )
+        return self.format_order_summary(cart)
     
     def send_message(self, phone, message):
         """Envia mensagem para um número específico"""
         try:
-            # Formata o número do telefone
-            if not phone.startswith('55'):
-                phone = '55' + phone.replace('+', '').replace('-', '').replace(' ', '')
-            
-            # URL do WhatsApp com o número
-            url = f"https://web.whatsapp.com/send?phone={phone}"
-            self.driver.get(url)
-            
-            # Aguarda carregar a conversa
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.XPATH, '//div[@contenteditable="true"][@data-tab="10"]'))
-            )
-            
-            # Encontra o campo de mensagem
-            message_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="10"]')
-            message_box.clear()
-            message_box.send_keys(message)
-            
-            # Envia a mensagem
-            send_button = self.driver.find_element(By.XPATH, '//span[@data-icon="send"]')
-            send_button.click()
-            
-            time.sleep(2)
+            # Reaproveita a conversa aberta quando a resposta é para ela
+            if self.sender is None or self.sender.driver is not self.driver:
+                self.sender = WhatsAppSender(self.driver)
+            self.sender.send(phone, message)
             print(f"✅ Mensagem enviada para {phone}")
             return True
             
@@ -227,75 +227,53 @@ Digite 'ENVIAR' quando terminar seu pedido."""
             print(f"❌ Erro ao enviar mensagem para {phone}: {e}")
             return False
     
-    def monitor_messages(self):
-        """Monitora mensagens recebidas"""
+    def monitor_messages(self, transport):
+        """Processa as mensagens recebidas pelo transporte e envia as respostas"""
         print("🔍 Monitorando mensagens...")
         
-        while True:
-            try:
-                # Procura por mensagens não lidas
-                unread_messages = self.driver.find_elements(
-                    By.XPATH, '//span[@data-icon="unread-count"]'
-                )
-                
-                for unread in unread_messages:
-                    try:
-                        # Clica na conversa não lida
-                        unread.click()
-                        time.sleep(2)
-                        
-                        # Obtém o número do telefone
-                        phone_element = self.driver.find_element(
-                            By.XPATH, '//span[@data-testid="conversation-info-header-chat-title"]'
-                        )
-                        phone = phone_element.text
-                        
-                        # Obtém a última mensagem
-                        messages = self.driver.find_elements(
-                            By.XPATH, '//div[contains(@class, "message-in")]//span[@dir="ltr"]'
-                        )
-                        
-                        if messages:
-                            last_message = messages[-1].text
-                            print(f"📱 Nova mensagem de {phone}: {last_message}")
-                            
-                            # Processa a mensagem
-                            response = self.process_message(phone, last_message)
-                            
-                            # Envia resposta
-                            self.send_message(phone, response)
-                            
-                    except Exception as e:
-                        print(f"❌ Erro ao processar mensagem: {e}")
-                        continue
-                
-                time.sleep(5)  # Verifica a cada 5 segundos
-                
-            except KeyboardInterrupt:
-                print("\n🛑 Bot interrompido pelo usuário")
-                break
-            except Exception as e:
-                print(f"❌ Erro no monitoramento: {e}")
-                time.sleep(10)
+        try:
+            # Uma fila por cliente; clientes diferentes são atendidos em paralelo
+            ConversationEngine(self, transport).run()
+        except KeyboardInterrupt:
+            print("\n🛑 Bot interrompido pelo usuário")
     
-    def run(self):
-        """Executa o bot"""
+    def run(self, transport=None):
+        """Executa o bot (pelo WhatsApp Web, a menos que outro transporte seja informado)"""
+        transport = transport or SeleniumTransport(self)
         try:
-            self.setup_driver()
-            
-            if self.connect_whatsapp():
+            if transport.start():
                 print("🤖 Bot iniciado com sucesso!")
                 print("📱 Monitorando mensagens...")
-                self.monitor_messages()
-            else:
-                print("❌ Falha ao conectar ao WhatsApp")
+                self.monitor_messages(transport)
                 
         except Exception as e:
             print(f"❌ Erro ao executar bot: {e}")
         finally:
-            if self.driver:
-                self.driver.quit()
+            transport.stop()
+            self.active_orders.close()
+            self.order_queue.close()
+
+def main(default_profile=None):
+    """Linha de comando: python whatsapp_bot.py [selenium|webhook] [--profile PERFIL] [--record ARQUIVO]"""
+    parser = argparse.ArgumentParser(description="Bot de pedidos do restaurante via WhatsApp")
+    parser.add_argument('transport', nargs='?', choices=['selenium', 'webhook'], default='selenium',
+                        help="selenium (WhatsApp Web, padrão) ou webhook (POST /messages, sem navegador)")
+    parser.add_argument('--profile', default=default_profile,
+                        choices=['auto'] + list(DRIVER_PROFILES),
+                        help="perfil do driver (padrão: DRIVER_CONFIG['profile'])")
+    parser.add_argument('--record', metavar='ARQUIVO',
+                        help="grava as mensagens recebidas em JSONL (para python load_test.py replay)")
+    args = parser.parse_args()
+    
+    bot = WhatsAppBot(profile=args.profile)
+    if args.transport == "webhook":
+        # Sem navegador: mensagens chegam por POST /messages
+        transport = WebhookTransport()
+    else:
+        transport = SeleniumTransport(bot)
+    if args.record:
+        transport = RecordingTransport(transport, args.record)
+    bot.run(transport)
 
 if __name__ == "__main__":
-    bot = WhatsAppBot()
-    bot.run() 
\ No newline at end of file
+    main()
@@ -0,0 +1,277 @@
+"""
+Recepção de mensagens do WhatsApp Web por eventos (MutationObserver)
+"""
+
+import json
+import os
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from config import BOT_CONFIG
+from order_storage import atomic_write_json
+
+
+CHAT_TITLE_XPATH = '//span[@data-testid="conversation-info-header-chat-title"]'
+INCOMING_XPATH = '//div[contains(@class, "message-in")]//span[@dir="ltr"]'
+SEND_ICON_XPATH = '//span[@data-icon="send"]'
+
+# Observa a página inteira e, no máximo a cada 50 ms, procura:
+# - conversas com contador de não lidas que ainda não foram avisadas;
+# - mensagens recebidas novas (data-id inédito) na conversa aberta.
+# Mensagens exibidas no primeiro segundo após trocar de conversa são o
+# histórico sendo renderizado e só entram no conjunto de vistas. O evento
+# só avisa; o texto é lido depois com READ_NEW_SCRIPT, a partir do cursor.
+INSTALL_SCRIPT = """
+if (window.__botEvents) { return true; }
+if (!document.querySelector('#pane-side')) { return false; }
+
+var events = window.__botEvents = [];
+var seen = new Set();
+var unreadShown = new Set();
+var state = {chat: null, baselineUntil: 0, scheduled: false};
+
+function push(event) {
+    events.push(event);
+    if (window.__botWake) { window.__botWake(); }
+}
+
+function scanUnread() {
+    var current = new Set();
+    document.querySelectorAll('#pane-side span[data-icon="unread-count"]').forEach(function (badge) {
+        var row = badge.closest('[role="listitem"]') || badge.closest('[tabindex]');
+        var title = row && row.querySelector('span[title]');
+        if (!title) { return; }
+        var chat = title.getAttribute('title');
+        current.add(chat);
+        if (!unreadShown.has(chat)) { push({type: 'unread', chat: chat}); }
+    });
+    unreadShown = current;
+}
+
+function scanConversation() {
+    var header = document.querySelector('[data-testid="conversation-info-header-chat-title"]');
+    if (!header) { return; }
+    var chat = header.textContent;
+    var now = Date.now();
+    if (chat !== state.chat) {
+        state.chat = chat;
+        state.baselineUntil = now + 1000;
+    }
+    document.querySelectorAll('#main [class*="message-in"]').forEach(function (row) {
+        var holder = row.closest('[data-id]');
+        var id = holder && holder.getAttribute('data-id');
+        if (!id || seen.has(id)) { return; }
+        seen.add(id);
+        if (now >= state.baselineUntil) {
+            push({type: 'message', chat: chat, id: id});
+        }
+    });
+}
+
+function scan() {
+    state.scheduled = false;
+    scanUnread();
+    scanConversation();
+}
+
+new MutationObserver(function () {
+    if (!state.scheduled) {
+        state.scheduled = true;
+        setTimeout(scan, 50);
+    }
+}).observe(document.body, {childList: true, subtree: true});
+scan();
+return true;
+"""
+
+# Espera assíncrona: devolve os eventos acumulados assim que houver algum,
+# ou uma lista vazia ao fim do tempo; null se a página foi recarregada
+WAIT_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var events = window.__botEvents;
+if (!events) { done(null); return; }
+if (events.length) { done(events.splice(0)); return; }
+var timer = setTimeout(function () {
+    window.__botWake = null;
+    done([]);
+}, arguments[0]);
+window.__botWake = function () {
+    clearTimeout(timer);
+    window.__botWake = null;
+    done(events.splice(0));
+};
+"""
+
+# Mensagens recebidas na conversa aberta depois das já lidas: percorre da
+# mais recente para trás até achar um data-id conhecido (arguments[0]) e
+# devolve só as novas, em ordem. null se a conversa aberta não é arguments[2].
+READ_NEW_SCRIPT = """
+var header = document.querySelector('[data-testid="conversation-info-header-chat-title"]');
+if (!header || header.textContent !== arguments[2]) { return null; }
+var known = new Set(arguments[0]);
+var rows = document.querySelectorAll('#main [class*="message-in"]');
+var found = false, messages = [];
+for (var i = rows.length - 1; i >= 0 && messages.length < arguments[1]; i--) {
+    var holder = rows[i].closest('[data-id]');
+    var id = holder && holder.getAttribute('data-id');
+    if (!id) { continue; }
+    if (known.has(id)) { found = true; break; }
+    var text = rows[i].querySelector('span[dir="ltr"]');
+    messages.push({id: id, text: text ? text.innerText : ''});
+}
+return {found: found, messages: messages.reverse()};
+"""
+
+FIND_UNREAD_SCRIPT = """
+var badges = document.querySelectorAll('#pane-side span[data-icon="unread-count"]');
+for (var i = 0; i < badges.length; i++) {
+    var row = badges[i].closest('[role="listitem"]') || badges[i].closest('[tabindex]');
+    var title = row && row.querySelector('span[title]');
+    if (title && title.getAttribute('title') === arguments[0]) { return badges[i]; }
+}
+return null;
+"""
+
+
+def wait_for_page(driver, timeout=30):
+    """Aguarda o WhatsApp Web exibir o QR code ou a lista de conversas"""
+    WebDriverWait(driver, timeout).until(EC.any_of(
+        EC.presence_of_element_located((By.XPATH, '//canvas[@aria-label="Scan me!"]')),
+        EC.presence_of_element_located((By.XPATH, '//div[@data-testid="qrcode"]')),
+        EC.presence_of_element_located((By.ID, "side"))
+    ))
+
+
+def wait_message_sent(driver, timeout=10):
+    """Aguarda o botão de enviar sumir (a caixa de mensagem foi esvaziada)"""
+    WebDriverWait(driver, timeout).until(
+        EC.invisibility_of_element_located((By.XPATH, SEND_ICON_XPATH))
+    )
+
+
+class ReadCursors:
+    """
+    Até onde cada conversa já foi lida, pelos data-id das mensagens.
+
+    Cada conversa guarda os `keep` data-ids mais recentes já processados: a
+    leitura seguinte só traz o que veio depois deles (e nunca os repete). O
+    arquivo é regravado (atômico) no máximo a cada `save_interval` segundos
+    e ao fechar, então um reinício não relê nem perde mensagens. Com `path`
+    vazio, os cursores ficam só em memória.
+    """
+
+    def __init__(self, path=None, keep=None, save_interval=None):
+        self.path = BOT_CONFIG['read_cursor_file'] if path is None else path
+        self.keep = keep or BOT_CONFIG['read_cursor_ids']
+        self.save_interval = (BOT_CONFIG['read_cursor_save_seconds']
+                              if save_interval is None else save_interval)
+        self._chats = {}  # conversa -> data-ids mais recentes já lidos
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._load()
+
+    def known(self, chat):
+        return self._chats.get(chat, [])
+
+    def advance(self, chat, message_ids):
+        """Marca as mensagens como lidas (em ordem)"""
+        self._chats[chat] = (self.known(chat) + list(message_ids))[-self.keep:]
+        self._dirty = True
+        if self.path and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self):
+        self._last_save = time.monotonic()
+        if not self.path or not self._dirty:
+            return
+        atomic_write_json(self.path, self._chats)
+        self._dirty = False
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._chats = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cursores de leitura ignorados: {e}")
+
+    def close(self):
+        self.save()
+
+
+class WhatsAppEvents:
+    """
+    Fila de eventos do WhatsApp Web alimentada por um MutationObserver.
+
+    O observer injetado via execute_script acumula os eventos no navegador;
+    `wait()` usa execute_async_script para bloquear até o primeiro evento
+    chegar, então não há intervalo fixo de varredura. Navegações (como a
+    abertura de conversa em send_message) descartam o observer, que é
+    reinstalado na espera seguinte. O que já foi lido de cada conversa fica
+    em `cursors` (ReadCursors).
+    """
+
+    def __init__(self, driver, timeout=30, cursors=None):
+        self.driver = driver
+        self.timeout = timeout
+        self.cursors = ReadCursors('') if cursors is None else cursors
+        self.driver.set_script_timeout(timeout + 5)
+
+    def install(self):
+        """Injeta o observer; False se a lista de conversas ainda não carregou"""
+        return bool(self.driver.execute_script(INSTALL_SCRIPT))
+
+    def wait(self, timeout=None):
+        """Bloqueia até chegarem eventos (ou o tempo acabar) e os retorna"""
+        timeout = self.timeout if timeout is None else timeout
+        events = self.driver.execute_async_script(WAIT_SCRIPT, int(timeout * 1000))
+        if events is None:
+            # Página recarregada: reinstala e aguarda a varredura inicial
+            WebDriverWait(self.driver, timeout).until(lambda driver: self.install())
+            events = self.driver.execute_async_script(WAIT_SCRIPT, 0)
+        return events or []
+
+    def open_chat(self, chat, timeout=10):
+        """
+        Abre a conversa não lida; retorna (título exibido no cabeçalho,
+        quantidade de mensagens não lidas) ou (None, 0) se ela já foi lida
+        """
+        # A página pode estar recarregando após o envio da resposta anterior
+        WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((By.ID, "pane-side")))
+        badge = self.driver.execute_script(FIND_UNREAD_SCRIPT, chat)
+        if badge is None:
+            return None, 0
+        count = badge.text.strip()
+        unread = int(count) if count.isdigit() else 1
+        badge.click()
+        WebDriverWait(self.driver, timeout).until(
+            EC.text_to_be_present_in_element((By.XPATH, CHAT_TITLE_XPATH), chat)
+        )
+        WebDriverWait(self.driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, INCOMING_XPATH))
+        )
+        return self.driver.find_element(By.XPATH, CHAT_TITLE_XPATH).text, unread
+
+    def new_messages(self, chat, expected=1):
+        """
+        Mensagens recebidas na conversa aberta que ainda não foram lidas, em
+        ordem: lista de (data-id, texto). Só as novas trafegam pelo WebDriver.
+        Se nenhuma mensagem já lida está na tela (primeira leitura da
+        conversa), considera novas as `expected` mais recentes.
+        """
+        result = self.driver.execute_script(
+            READ_NEW_SCRIPT, self.cursors.known(chat), BOT_CONFIG['max_messages_per_read'], chat
+        )
+        if result is None:
+            return []
+        messages = result['messages']
+        if not result['found']:
+            messages = messages[-expected:] if expected else []
+        if messages:
+            self.cursors.advance(chat, [message['id'] for message in messages])
+        # Mensagens sem texto (mídia) só avançam o cursor
+        return [(message['id'], message['text']) for message in messages if message['text']]
@@ -0,0 +1,111 @@
+"""
+Envio de respostas pelo WhatsApp Web reaproveitando a conversa aberta
+"""
+
+import time
+from collections import deque
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from whatsapp_events import CHAT_TITLE_XPATH, wait_message_sent
+
+MESSAGE_BOX_XPATH = '//div[@contenteditable="true"][@data-tab="10"]'
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Percentis (método do valor mais próximo) de uma lista de amostras"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f'p{point}': 0.0 for point in points}
+    last = len(ordered) - 1
+    return {f'p{point}': ordered[min(last, round(point / 100 * last))] for point in points}
+
+
+# Shift+Enter quebra a linha na caixa de mensagem (Enter sozinho envia); NULL solta o Shift
+LINE_BREAK_KEYS = Keys.SHIFT + Keys.ENTER + Keys.NULL
+
+
+def typed_text(message):
+    """Teclas que digitam a mensagem inteira, com as quebras de linha, sem enviá-la"""
+    return LINE_BREAK_KEYS.join(message.replace('\r\n', '\n').split('\n'))
+
+
+class WhatsAppSender:
+    """
+    Envia mensagens pelo driver guardando os elementos da conversa atual.
+
+    Se a conversa aberta já é a do destinatário (caso comum: a resposta vai
+    para quem acabou de escrever), digita direto na caixa de mensagem, sem
+    recarregar a página com /send?phone=. A caixa e o cabeçalho ficam em
+    cache e são procurados de novo quando o WhatsApp re-renderiza a página.
+    """
+
+    def __init__(self, driver, timeout=30, history=1000):
+        self.driver = driver
+        self.timeout = timeout
+        self.latencies = deque(maxlen=history)  # segundos por envio
+        self.reused = 0
+        self.navigated = 0
+        self._titles = {}  # destinatário -> título exibido no cabeçalho
+        self._header = None
+        self._box = None
+
+    def send(self, phone, message):
+        """Envia a mensagem; exceções do Selenium são repassadas"""
+        started = time.perf_counter()
+        try:
+            reused = self._send(phone, message)
+        except StaleElementReferenceException:
+            # A página foi re-renderizada entre a leitura e a digitação
+            self._header = self._box = None
+            reused = self._send(phone, message)
+        self.latencies.append(time.perf_counter() - started)
+        if reused:
+            self.reused += 1
+        else:
+            self.navigated += 1
+
+    def latency_percentiles(self):
+        """p50/p95/p99 dos últimos envios, em milissegundos"""
+        return {name: value * 1000 for name, value in percentiles(self.latencies).items()}
+
+    def _send(self, phone, message):
+        """Digita e envia; retorna True se usou a conversa que já estava aberta"""
+        reused = self._current_title() == self._titles.get(phone, phone)
+        if not reused:
+            self._navigate(phone)
+        box = self._message_box()
+        box.clear()
+        box.send_keys(typed_text(message))
+        box.send_keys(Keys.ENTER)
+        wait_message_sent(self.driver)
+        return reused
+
+    def _current_title(self):
+        if self._header is None:
+            headers = self.driver.find_elements(By.XPATH, CHAT_TITLE_XPATH)
+            if not headers:
+                return None
+            self._header = headers[0]
+        return self._header.text
+
+    def _message_box(self):
+        if self._box is None:
+            self._box = self.driver.find_element(By.XPATH, MESSAGE_BOX_XPATH)
+        return self._box
+
+    def _navigate(self, phone):
+        number = phone
+        if not number.startswith('55'):
+            number = '55' + number.replace('+', '').replace('-', '').replace(' ', '')
+        self.driver.get(f"https://web.whatsapp.com/send?phone={number}")
+        self._header = None
+        self._box = WebDriverWait(self.driver, self.timeout).until(
+            EC.presence_of_element_located((By.XPATH, MESSAGE_BOX_XPATH))
+        )
+        # Nas próximas respostas, reconhece a conversa pelo título exibido
+        self._titles[phone] = self._current_title()